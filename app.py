@@ -9,12 +9,23 @@
 
 import streamlit as st
 import pandas as pd
-import random
 import re
+import os
+import numpy as np
 from PIL import Image
 
+from catalog_store import store_version
+from fit_filter import FitIndex, parse_footprint
+from keyword_index import KeywordIndex, scan_match
+from result_cache import ResultCache, query_key
+from shared_catalog import active_store_path, index_paths, load_catalog_frame
+from scoring import caps_for, diverse_top_k, get_engine
+from seeding import GENERATOR_VERSION, cached_frame, seeded_rng
+from similarity_index import SimilarityIndex
+from thumbnails import ThumbnailCache
+from tracing import span, trace_rerun, traced
+
 # ==================== CONFIG ====================
-st.set_page_config(page_title="AI Home Decor", layout="wide")
 ROOM_OPTIONS = ["Bedroom", "Kitchen", "Living Room", "Bathroom", "Dining Room", "Balcony", "Office", "Hallway"]
 STYLE_OPTIONS = ["All Styles", "Minimalist", "Modern", "Boho"]
 COLOR_OPTIONS = ["All Colors", "White", "Black", "Gray", "Wood", "Beige", "Blue", "Green"]
@@ -139,15 +150,15 @@ COLOR_KEYWORDS = {
     "White": ["white", "ivory", "snow", "cream"],
     "Black": ["black", "ebony", "charcoal"],
     "Gray": ["gray", "grey", "silver", "ash"],
-    "Wood": ["wood", "oak", "walnut", "teak", "birch"],
+    "Wood": ["wood", "wooden", "oak", "walnut", "teak", "birch"],
     "Beige": ["beige", "tan", "sand", "khaki"],
     "Blue": ["blue", "navy", "teal", "aqua"],
     "Green": ["green", "sage", "olive", "emerald", "mint"]
 }
 
 STYLE_KEYWORDS = {
-    "Minimalist": ["minimal", "simple", "clean", "scandi", "zen"],
-    "Modern": ["modern", "contemporary", "chrome", "glass", "metal"],
+    "Minimalist": ["minimal", "minimalist", "minimalistic", "simple", "clean", "scandi", "zen"],
+    "Modern": ["modern", "contemporary", "chrome", "glass", "metal", "metallic"],
     "Boho": ["boho", "rattan", "wicker", "macrame", "jute"]
 }
 
@@ -182,7 +193,7 @@ def parse_user_prompt(prompt: str):
     return room_type, wall_color, dimensions
 
 # ==================== FIXED SMART AI COLOR SUGGESTION ====================
-def suggest_furniture_colors(wall_color: str):
+def suggest_furniture_colors(wall_color: str, rng=None):
     wall = wall_color.lower().strip()
 
     # Normalize wall color with better matching
@@ -229,7 +240,9 @@ def suggest_furniture_colors(wall_color: str):
     }
 
     options = harmony.get(wall_key, harmony["white"])
-    return random.sample(options, 2)
+    # same wall colour → same suggestions in every session and worker
+    rng = rng or seeded_rng("palette", wall_key)
+    return rng.sample(options, 2)
 
 def extract_colors(suggestions):
     color_map = {
@@ -243,10 +256,11 @@ def extract_colors(suggestions):
         for word in s.lower().split():
             if word in color_map:
                 colors.add(color_map[word])
-    return list(colors) or ["Gray", "Wood"]
+    return sorted(colors) or ["Gray", "Wood"]
 
 # ==================== CATALOG GENERATOR ====================
-def generate_catalog(room_type: str, suggested_colors=None):
+def generate_catalog(room_type: str, suggested_colors=None, rng=None):
+    rng = rng or seeded_rng("catalog", room_type, *sorted(suggested_colors or []))
     base = [p for src in PRODUCT_DB.values() for p in src if p[4] == room_type]
     if not base:
         base = [p for src in PRODUCT_DB.values() for p in src][:20]  # Fallback
@@ -262,22 +276,22 @@ def generate_catalog(room_type: str, suggested_colors=None):
         "Hallway": ["Cabinet", "Shelf", "Bench", "Table"]
     }.get(room_type, ["Table", "Chair", "Shelf"])
 
-    colors = suggested_colors or COLOR_OPTIONS[1:]
+    colors = sorted(suggested_colors or COLOR_OPTIONS[1:])
     styles = [s for s in STYLE_OPTIONS if s != "All Styles"]
     sources = list(PRODUCT_DB.keys())
 
     catalog = []
     for _ in range(50):
-        base_item = random.choice(base)
+        base_item = rng.choice(base)
         title, price, url, img, _, cat, color, style = base_item
-        new_color = random.choice(colors)
-        new_style = random.choice(styles)
-        new_cat = random.choice(categories)
-        new_price = round(price * random.uniform(0.7, 1.5), 2)
-        new_source = random.choice(sources)
+        new_color = rng.choice(colors)
+        new_style = rng.choice(styles)
+        new_cat = rng.choice(categories)
+        new_price = round(price * rng.uniform(0.7, 1.5), 2)
+        new_source = rng.choice(sources)
 
         catalog.append({
-            "title": f"{new_style} {new_color} {new_cat} - Matches {random.choice(suggested_colors or ['Neutral'])} Palette",
+            "title": f"{new_style} {new_color} {new_cat} - Matches {rng.choice(colors if suggested_colors else ['Neutral'])} Palette",
             "price": new_price,
             "url": url,
             "img_url": img,
@@ -289,61 +303,211 @@ def generate_catalog(room_type: str, suggested_colors=None):
         })
     return catalog
 
-@st.cache_data
-def load_catalog(room_type: str, suggested_colors=None):
-    df = pd.DataFrame(generate_catalog(room_type, suggested_colors))
+def build_catalog(room_type: str, suggested_colors=None):
+    palette = sorted(suggested_colors or [])
+    rng = seeded_rng("catalog", room_type, *palette)
+    df = pd.DataFrame(generate_catalog(room_type, palette, rng))
     if df.empty:
         return df
-    df["num_reviews"] = [random.randint(800, 3000) for _ in range(len(df))]
-    df["num_purchases"] = [random.randint(1500, 8000) for _ in range(len(df))]
-    df["rating"] = [round(random.uniform(4.5, 4.9), 1) for _ in range(len(df))]
-    df["score"] = [round(random.uniform(0.7, 0.95), 3) for _ in range(len(df))]
+    df["num_reviews"] = [rng.randint(800, 3000) for _ in range(len(df))]
+    df["num_purchases"] = [rng.randint(1500, 8000) for _ in range(len(df))]
+    df["rating"] = [round(rng.uniform(4.5, 4.9), 1) for _ in range(len(df))]
     return df.drop_duplicates("title").reset_index(drop=True)
 
+# Deterministic per (room, palette): generated once on disk, then shared
+@st.cache_data
+def load_catalog(room_type: str, suggested_colors=None):
+    palette = sorted(suggested_colors or [])
+    return cached_frame("catalog", [room_type, *palette], lambda: build_catalog(room_type, palette))
+
+# Real IKEA/Amazon/Flipkart rows: the live version from `python
+# catalog_versions.py update` (or `python catalog_store.py`'s store),
+# memory-mapped once per process and shared by every session – or, with
+# $HOME_DECOR_SHARED_CATALOG set, attached from the catalog that
+# `python shared_catalog.py publish` put in shared memory.
+# `store` is resolved once per rerun and keys every loader below, so a
+# new version is picked up by the next rerun without a restart; the
+# previous one stays cached for reruns still using it.
+@st.cache_resource(max_entries=2)
+def load_store(store):
+    return load_catalog_frame(store)
+
+@st.cache_resource(max_entries=2)
+def load_keyword_index(store):
+    path = index_paths(store)[0]
+    return KeywordIndex.load(path) if os.path.exists(path) else None
+
+# Store rows: embedding index built with the store, memory-mapped once.
+# Generated catalogs are a few dozen rows – an exact index is built per call.
+@st.cache_resource(max_entries=2)
+def load_similarity_index(store):
+    path = index_paths(store)[1]
+    return SimilarityIndex.load(path) if os.path.exists(path) else None
+
+def similarity_source(df, store):
+    """(index, frame its rows refer to, index row of each df row)."""
+    index = load_similarity_index(store) if store else None
+    if index is not None:
+        return index, load_store(store), df.index.to_numpy()
+    return SimilarityIndex.build(df, nlist=0), df, np.arange(len(df))
+
+def query_text(room_type, style, color, suggested_colors):
+    parts = [room_type]
+    if style != "All Styles":
+        parts.append(style)
+    if color != "All Colors":
+        parts.append(color)
+    return " ".join(parts + list(suggested_colors or []))
+
+# Trained by `python ml_recommender.py`; loaded once, shared by every session.
+@st.cache_resource
+def load_model_server():
+    from ml_recommender import ModelServer, model_exists
+    if not model_exists():
+        return None
+    try:
+        return ModelServer.load()
+    except ImportError:         # xgboost is imported on first use
+        return None
+
+# Top SHAP contributions per row; the explainer itself is built once per model version
+def explain_rows(model, df):
+    if model is None or df.empty:
+        return [None] * len(df)
+    from ml_recommender import explainer_for
+    try:
+        return explainer_for(model).top_reasons(df)
+    except ImportError:         # shap not installed
+        return [None] * len(df)
+
+@st.cache_resource(max_entries=2)
+def load_fit_index(store):
+    return FitIndex.from_frame(load_store(store))
+
+# Products whose width × depth can't fit the room footprint (either way round)
+@traced()
+def fit_products(df, dimensions, store):
+    footprint = parse_footprint(dimensions)
+    if footprint is None or df.empty:
+        return df
+    if store:
+        return df[load_fit_index(store).fits(footprint)[df.index.to_numpy()]]
+    return df[FitIndex.from_frame(df).fits(footprint)]
+
+def load_store_room(room_type: str, store):
+    rows = load_store(store)
+    return rows[rows["room_type"] == room_type].drop_duplicates("title")
+
 # ==================== FILTER & RANK ====================
-def filter_products(df, style, color, suggested_colors=None):
-    f = df.copy()
+# Keyword groups a title must hit (one per active filter, AND-ed)
+def keyword_groups(style, color, suggested_colors=None):
+    include = []
     if style != "All Styles":
-        pat = "|".join(STYLE_KEYWORDS.get(style, []))
-        f = f[f["title"].str.contains(pat, case=False, na=False)]
+        include.append(STYLE_KEYWORDS.get(style, []))
     if color != "All Colors":
-        pat = "|".join(COLOR_KEYWORDS.get(color, []))
-        f = f[f["title"].str.contains(pat, case=False, na=False)]
+        include.append(COLOR_KEYWORDS.get(color, []))
     if suggested_colors:
-        pats = [ "|".join(COLOR_KEYWORDS.get(c, [])) for c in suggested_colors ]
-        f = f[f["title"].str.contains("|".join(pats), case=False, na=False)]
-    avoid = "|".join(AVOID_KEYWORDS)
-    f = f[~f["title"].str.contains(avoid, case=False, na=False)]
-    return f
+        include.append([w for c in suggested_colors for w in COLOR_KEYWORDS.get(c, [])])
+    return include
 
-def rank_by_budget(df, budget):
-    sub = df[df["price"] <= budget].copy()
-    if sub.empty:
-        return sub
-    sub["score"] = (
-        0.3 * (sub["price"].max() - sub["price"]) / (sub["price"].max() - sub["price"].min() + 1e-6) +
-        0.2 * (sub["rating"] / 5) +
-        0.3 * (sub["num_purchases"] / sub["num_purchases"].max()) +
-        0.2 * sub["score"]
-    )
-    return sub.sort_values("score", ascending=False)
+@traced()
+def filter_products(df, style, color, suggested_colors=None, index=None):
+    # Store rows carry their store position as index label → bitmap lookup
+    if index is not None:
+        mask = index.match(keyword_groups(style, color, suggested_colors), AVOID_KEYWORDS)
+        return df[mask[df.index.to_numpy()]]
 
+    return df[scan_match(df["title"], keyword_groups(style, color, suggested_colors), AVOID_KEYWORDS)]
+
+# Under-budget rows with a fresh `score`, unsorted – select_top_20 and the
+# compare view take top-k directly instead of sorting the whole frame.
+@traced()
+def rank_by_budget(df, budget):
+    idx, score = get_engine().weigh(
+        df["price"].to_numpy(), df["rating"].to_numpy(),
+        df["num_purchases"].to_numpy(), df["score"].to_numpy(), budget,
+        purchase_eps=0.0)
+    if len(idx) == 0:
+        return df.iloc[0:0]
+    return df.iloc[idx].assign(score=score)
+
+SOURCES = ["IKEA", "Amazon", "Flipkart"]
+SOURCE_CAP, CATEGORY_CAP = 7, 3
+
+@traced()
 def select_top_20(df):
-    selected = []
-    src_count = {"IKEA": 0, "Amazon": 0, "Flipkart": 0}
-    cat_count = {}
-    for _, row in df.iterrows():
-        if len(selected) >= 20:
-            break
-        if src_count[row["source"]] >= 7 or cat_count.get(row["category"], 0) >= 3:
-            continue
-        selected.append(row)
-        src_count[row["source"]] += 1
-        cat_count[row["category"]] = cat_count.get(row["category"], 0) + 1
-    return pd.DataFrame(selected)
+    if df.empty:
+        return df
+    src_codes = pd.Categorical(df["source"], categories=SOURCES).codes.astype("int64")
+    cat_codes, cats = pd.factorize(df["category"])
+    pos = diverse_top_k(
+        df["score"].to_numpy(),
+        [(src_codes, caps_for(SOURCES, {}, default=SOURCE_CAP)),
+         (cat_codes, caps_for(cats, {}, default=CATEGORY_CAP))],
+        k=20)
+    return df.iloc[pos]
+
+# Card thumbnails from the local disk cache; missing ones are fetched in the background
+@st.cache_resource
+def load_thumbnail_cache():
+    return ThumbnailCache()
+
+# Results of recent queries as row ids; shared by every session of the process.
+@st.cache_resource
+def load_result_cache():
+    return ResultCache()
+
+# Cache/version key of the rows being ranked: catalog build + model version
+def catalog_version(store, model):
+    version = store_version(store) if store else f"generated-{GENERATOR_VERSION}"
+    return version + (f"+{model.version}" if model is not None else "")
+
+NO_MATCH_NOTE = "No exact matches. Showing similar items."
+NO_FIT_NOTE = "Nothing fits a {} room exactly. Showing all sizes."
+
+# keyword filter → fit, given each row's similarity to the query.
+# Returns the candidate rows and any notices to show the user.
+def candidates(df, sim, style, color_filter, suggested_colors, dimensions, store):
+    notes = []
+    df = df.assign(similarity=sim, score=np.clip(sim, 0, 1))
+
+    filtered = filter_products(df, style, color_filter, suggested_colors,
+                               index=load_keyword_index(store) if store else None)
+    if filtered.empty:
+        notes.append(NO_MATCH_NOTE)
+        filtered = df
+
+    fitting = fit_products(filtered, dimensions, store)
+    if fitting.empty:
+        notes.append(NO_FIT_NOTE.format(dimensions))
+    else:
+        filtered = fitting
+    return filtered, notes
+
+def rank_candidates(filtered, budget):
+    ranked = rank_by_budget(filtered, budget)
+    if ranked.empty:
+        ranked = rank_by_budget(filtered, 999999)
+    return ranked
+
+# similarity → keyword filter → fit → model score → budget rank.
+# Returns the ranked rows and any notices to show the user.
+def recommend(df, sim_index, query, style, color_filter, suggested_colors, dimensions,
+              budget, store, model):
+    with span("similarity_scores"):
+        sim = sim_index.scores(query, df["sim_row"].to_numpy())
+    filtered, notes = candidates(df, sim, style, color_filter, suggested_colors, dimensions, store)
+
+    # Model match probability replaces the similarity score when a model is saved
+    if model is not None:
+        with span("model_score"):
+            filtered = filtered.assign(score=model.predict_many(filtered))
+    return rank_candidates(filtered, budget), notes
 
 # ==================== MAIN APP ====================
+@trace_rerun("app")
 def main():
+    st.set_page_config(page_title="AI Home Decor", layout="wide")
     st.title("🧠 AI Home Decor Advisor")
     st.markdown("**Describe your room → Get smart AI color suggestions + similar product recommendations**")
 
@@ -355,10 +519,10 @@ def main():
     )
 
     ai_mode = bool(prompt.strip())
-    room_type = wall_color = suggested_colors = None
+    room_type = wall_color = suggested_colors = dimensions = None
 
     if ai_mode:
-        with st.spinner("🤖 AI analyzing your room..."):
+        with st.spinner("🤖 AI analyzing your room..."), span("parse_prompt"):
             room_type, wall_color, dimensions = parse_user_prompt(prompt)
             suggestions = suggest_furniture_colors(wall_color)
             suggested_colors = extract_colors(suggestions)
@@ -382,62 +546,111 @@ def main():
     # --- Upload Photo ---
     uploaded = st.file_uploader("Upload Room Photo", type=["jpg", "jpeg", "png"])
     if uploaded:
-        img = Image.open(uploaded)
-        st.image(img, caption="Your Room", use_container_width=True)
+        with span("photo"):
+            img = Image.open(uploaded)
+            st.image(img, caption="Your Room", use_container_width=True)
     else:
         st.info("📸 Upload a photo to visualize better.")
         # Remove st.stop() to allow demo without upload; images now load from valid URLs
 
     # --- Load & Show Recommendations ---
-    with st.spinner(f"🔍 Generating similar recommendations for **{room_type}**..."):
-        df = load_catalog(room_type, suggested_colors)
+    with st.spinner(f"🔍 Generating similar recommendations for **{room_type}**..."), span("load_data"):
+        store = active_store_path()
+        if store:
+            df = load_store_room(room_type, store)
+        else:
+            df = load_catalog(room_type, suggested_colors)
     
     if df.empty:
         st.error("No products found for this room. Try another room type!")
         st.stop()
 
-    filtered = filter_products(df, style, color_filter, suggested_colors)
-    if filtered.empty:
-        st.warning("No exact matches. Showing similar items.")
-        filtered = df
-
-    ranked = rank_by_budget(filtered, budget)
-    if ranked.empty:
-        ranked = rank_by_budget(filtered, 999999)
+    with span("similarity_index"):
+        sim_index, sim_frame, sim_rows = similarity_source(df, store)
+        query = sim_index.embed_text(query_text(room_type, style, color_filter, suggested_colors))
+        df = df.assign(sim_row=sim_rows)
+    with span("load_model"):
+        model = load_model_server()
+
+    # Repeated queries skip filter → fit → score → rank → diversify entirely
+    cache = load_result_cache()
+    version = catalog_version(store, model)
+    cache.use_version(version)
+    key = query_key(version, room_type, style, color_filter, budget, suggested_colors,
+                    str(parse_footprint(dimensions)))
+    hit = cache.get(key)
+    ranked = None
+    if hit is None:
+        with span("rank"):
+            ranked, notes = recommend(df, sim_index, query, style, color_filter, suggested_colors,
+                                      dimensions, budget, store, model)
+            top20 = select_top_20(ranked)
+        cache.put(key, {"ids": top20.index.to_numpy(), "scores": top20["score"].to_numpy(),
+                        "notes": notes})
+    else:
+        notes = hit["notes"]
+        top20 = df.loc[hit["ids"]].assign(score=hit["scores"])
+        top20 = top20.assign(similarity=sim_index.scores(query, top20["sim_row"].to_numpy()))
+    for note in notes:
+        st.warning(note)
+    stats = cache.stats()
+    st.sidebar.caption(f"Result cache: {stats['hits']} hits · {stats['misses']} misses · {stats['entries']} entries")
 
-    top20 = select_top_20(ranked)
     records = top20.to_dict("records")
+    with span("explain"):
+        reasons = explain_rows(model, top20)
 
     st.subheader(f"✨ Top 20 Similar Recommendations – Budget ${budget}")
     counts = {s: sum(1 for r in records if r["source"] == s) for s in ["IKEA", "Amazon", "Flipkart"]}
     st.write(f"**IKEA:** {counts['IKEA']} | **Amazon:** {counts['Amazon']} | **Flipkart:** {counts['Flipkart']} | Based on: {', '.join(suggested_colors)}")
 
-    for r in records:
-        c1, c2 = st.columns([3, 1])
-        with c1:
-            st.markdown(
-                f'<a href="{r["url"]}" target="_blank">'
-                f'<img src="{r["img_url"]}" style="width:100%; border-radius:12px; box-shadow:0 4px 12px rgba(0,0,0,0.1);">'
-                f'</a>', unsafe_allow_html=True
-            )
-            st.markdown(f"**{r['title']}**")
-            st.caption(f"**{r['source']}** • `{r['category']}` • `${r['price']:.2f}` • {r['num_reviews']:,} reviews | Matches: {r['color']}")
-        with c2:
-            st.progress(r.get("score", 0.5))
-            st.caption(f"Similarity Score: {r.get('score', 0):.3f}")
+    with span("thumbnails"):
+        thumbs = load_thumbnail_cache().thumbnails([r["img_url"] for r in records])
+    with span("render_cards"):
+        for r, why, thumb in zip(records, reasons, thumbs):
+            c1, c2 = st.columns([3, 1])
+            with c1:
+                st.image(thumb, use_container_width=True)
+                st.markdown(f"**[{r['title']}]({r['url']})**" if r["url"] else f"**{r['title']}**")
+                st.caption(f"**{r['source']}** • `{r['category']}` • `${r['price']:.2f}` • {r['num_reviews']:,} reviews | Matches: {r['color']}")
+            with c2:
+                st.progress(min(max(float(r.get("score", 0.5)), 0.0), 1.0))
+                st.caption(f"Similarity Score: {r.get('similarity', 0):.3f}")
+                if why:
+                    with st.expander("Why this item?"):
+                        for name, v in why:
+                            st.caption(f"{'▲' if v > 0 else '▼'} {name} ({v:+.3f})")
+
+    # --- Similar items ---
+    with span("similar_items"):
+        if records:
+            titles = [r["title"] for r in records]
+            pick = st.selectbox("🔗 Show items similar to", titles)
+            row = records[titles.index(pick)]["sim_row"]
+            nb, nb_sim = sim_index.neighbours(row, k=5)
+            with st.expander(f"Items similar to **{pick[:60]}**", expanded=True):
+                for (_, item), s in zip(sim_frame.iloc[nb].iterrows(), nb_sim):
+                    name = item["title"][:70]
+                    link = f"[{name}]({item['url']})" if item["url"] else name
+                    st.markdown(f"{link} · **{item['source']}** · ${item['price']:.2f} · similarity {s:.3f}")
 
     # --- Compare ---
     if st.button("⚖️ Compare Stores for Similar Items"):
-        for src in ["IKEA", "Amazon", "Flipkart"]:
-            top = ranked[ranked["source"] == src].head(3)
-            with st.expander(f"**{src}** – Top Similar Picks (Based on {suggested_colors})"):
-                for _, row in top.iterrows():
-                    col_img, col_info = st.columns([1, 2])
-                    with col_img:
-                        st.image(row["img_url"], width=150)
-                    with col_info:
-                        st.write(f"**{row['title'][:50]}...**")
-                        st.caption(f"${row['price']:.2f} | {row['category']} | Score: {row['score']:.3f}")
+        with span("compare"):
+            if ranked is None:
+                ranked, _ = recommend(df, sim_index, query, style, color_filter, suggested_colors,
+                                      dimensions, budget, store, model)
+            for src in ["IKEA", "Amazon", "Flipkart"]:
+                top = ranked[ranked["source"] == src].nlargest(3, "score")
+                top_thumbs = load_thumbnail_cache().thumbnails(top["img_url"].tolist())
+                with st.expander(f"**{src}** – Top Similar Picks (Based on {suggested_colors})"):
+                    for (_, row), thumb in zip(top.iterrows(), top_thumbs):
+                        col_img, col_info = st.columns([1, 2])
+                        with col_img:
+                            st.image(thumb, width=150)
+                        with col_info:
+                            st.write(f"**{row['title'][:50]}...**")
+                            st.caption(f"${row['price']:.2f} | {row['category']} | Score: {row['score']:.3f}")
 
     # Best Pick
     if records:
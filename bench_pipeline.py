@@ -0,0 +1,291 @@
+# --------------------------------------------------------------
+# bench_pipeline.py
+# Stage-by-stage benchmark of the recommendation pipeline.
+#
+#  * catalogs of 1k / 100k / 1M / 10M rows with the load_data() schema,
+#    resampled from the seeded demo catalog (same seed → same rows) and
+#    written once under BENCH_DIR
+#  * every stage is timed on its own: p50 / p95 / p99 latency,
+#    throughput, and peak RSS while that stage ran
+#  * results go to a JSON file named after the git commit; --compare
+#    checks them against an older file and exits 1 on a regression
+#
+#   python bench_pipeline.py --sizes 1k,100k
+#   python bench_pipeline.py --compare data/bench/pipeline-<old>.json
+# --------------------------------------------------------------
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import home_decor_app as hd
+from keyword_index import KeywordIndex
+from seeding import cached_frame, stable_seed
+
+BENCH_DIR = "data/bench"
+DEFAULT_SIZES = "1k,100k,1M,10M"
+REPEAT = 20
+MIN_RUNS = 3
+STAGE_BUDGET = 10.0         # seconds per stage before it stops repeating
+SENTIMENT_MAX_ROWS = 1_000_000
+TOLERANCE = 0.20            # --compare: p50 slower by more than this fails
+NOISE_FLOOR_MS = 1.0        # ... unless the difference is below this
+
+QUERY = {"room": "Living Room", "style": "Modern", "color": "White", "budget": 1000}
+PROMPTS = ["living room, wall color light blue, 12x14",
+           "Bedroom, wall color sage green",
+           "kitchen 10x12, wall color off-white"]
+WALL_COLORS = ["White", "Light Blue", "Sage Green", "Charcoal", "Walnut", "Terracotta"]
+SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+# ------------------- catalogs -------------------
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    mult = SUFFIXES.get(text[-1:], 1)
+    return int(float(text[:-1] if mult > 1 else text) * mult)
+
+
+def scaled_catalog(n: int) -> pd.DataFrame:
+    """n rows drawn from the demo catalog, numeric columns jittered."""
+    base = hd.build_data()
+    rng = np.random.default_rng(stable_seed("bench-catalog", n))
+    df = base.iloc[rng.integers(0, len(base), size=n)].reset_index(drop=True)
+    df["price"] = (df["price"] * rng.uniform(0.8, 1.25, size=n)).round(2)
+    df["num_reviews"] = (df["num_reviews"] * rng.uniform(0.5, 1.5, size=n)).astype(np.int64)
+    df["num_purchases"] = (df["num_purchases"] * rng.uniform(0.5, 1.5, size=n)).astype(np.int64)
+    df["rating"] = np.clip(df["rating"] + rng.normal(0, 0.15, size=n), 1, 5).round(1)
+    df["sentiment_score"] = np.clip(df["sentiment_score"] + rng.normal(0, 0.05, size=n), 0, 1).round(2)
+    return df
+
+
+def catalog_path(n: int) -> str:
+    """Parquet file of the n-row catalog, generated on first use."""
+    path = os.path.join(BENCH_DIR, f"bench-catalog-{stable_seed('bench-catalog', n):016x}.parquet")
+    if not os.path.exists(path):
+        cached_frame("bench-catalog", [n], lambda: scaled_catalog(n), directory=BENCH_DIR)
+    return path
+
+
+# ------------------- measuring -------------------
+def reset_peak_rss():
+    """Linux: writing 5 to clear_refs resets VmHWM, so peaks are per stage."""
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024      # KiB on Linux
+
+
+def _rows(obj):
+    return len(obj) if hasattr(obj, "__len__") and not isinstance(obj, (str, tuple)) else 1
+
+
+def time_stage(fn, rows_in=1, repeat=REPEAT, budget=STAGE_BUDGET):
+    """Run fn() up to `repeat` times (at least MIN_RUNS); returns (last output, stats)."""
+    gc.collect()
+    per_stage = reset_peak_rss()
+    lat = []
+    start = time.perf_counter()
+    for i in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        lat.append(time.perf_counter() - t)
+        if i + 1 >= MIN_RUNS and time.perf_counter() - start > budget:
+            break
+    lat = np.array(lat)
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99]) * 1000
+    return out, {
+        "runs": len(lat),
+        "p50_ms": round(p50, 3), "p95_ms": round(p95, 3), "p99_ms": round(p99, 3),
+        "mean_ms": round(lat.mean() * 1000, 3),
+        "rows_in": rows_in, "rows_out": _rows(out),
+        "throughput_per_s": round(rows_in / lat.mean(), 1) if lat.mean() > 0 else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "peak_rss_scope": "stage" if per_stage else "process",
+    }
+
+
+def skipped(reason):
+    return {"skipped": reason}
+
+
+def report(name, stats):
+    if "skipped" in stats:
+        print(f"  {name:<28} skipped: {stats['skipped']}")
+    else:
+        print(f"  {name:<28} p50 {stats['p50_ms']:>10.3f} ms  p99 {stats['p99_ms']:>10.3f} ms"
+              f"  {stats['throughput_per_s'] or 0:>14,.0f}/s  rss {stats['peak_rss_mb']:>8.1f} MB")
+
+
+# ------------------- stages -------------------
+def bench_catalog(n, repeat, budget, sentiment_max=SENTIMENT_MAX_ROWS):
+    """load → room filter → keyword filter (scan and index) → budget → top 20."""
+    q = QUERY
+    path = catalog_path(n)
+    res = {}
+    df, res["load"] = time_stage(lambda: pd.read_parquet(path), n, repeat, budget)
+    room, res["filter_by_room_strict"] = time_stage(
+        lambda: hd.filter_by_room_strict(df, q["room"]), n, repeat, budget)
+    kw, res["filter_by_keywords"] = time_stage(
+        lambda: hd.filter_by_keywords(room, q["style"], q["color"]), len(room), repeat, budget)
+    index = KeywordIndex.build(df["title"])
+    _, res["filter_by_keywords[index]"] = time_stage(
+        lambda: hd.filter_by_keywords(room, q["style"], q["color"], index=index),
+        len(room), repeat, budget)
+    ranked, res["weight_by_budget"] = time_stage(
+        lambda: hd.weight_by_budget(kw, q["budget"]), len(kw), repeat, budget)
+    _, res["get_diverse_top20"] = time_stage(
+        lambda: hd.get_diverse_top20(ranked), len(ranked), repeat, budget)
+    res["add_sentiment"] = bench_sentiment(n, budget, sentiment_max)
+    return res
+
+
+def bench_sentiment(n, budget, sentiment_max=SENTIMENT_MAX_ROWS):
+    if n > sentiment_max:
+        return skipped(f"above --sentiment-max ({sentiment_max:,} rows)")
+    try:
+        from generate_synthetic_data import synthesize_rows
+        from sentiment_analysis import add_sentiment
+    except Exception as e:          # nltk / vader lexicon missing
+        return skipped(f"{type(e).__name__}: {e}")
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "in.csv"), os.path.join(tmp, "out.csv")
+        synthesize_rows(n, src, seed=stable_seed("bench-sentiment", n))
+        # fresh score cache each run: measures the cold path
+        runs = itertools.count()
+        _, stats = time_stage(
+            lambda: add_sentiment(src, dst, cache_path=os.path.join(tmp, f"cache-{next(runs)}.sqlite")),
+            n, repeat=MIN_RUNS, budget=budget)
+    stats["rows_out"] = n
+    return stats
+
+
+def bench_queries(repeat, budget):
+    """Per-request helpers whose cost does not depend on catalog size."""
+    import app
+    res = {}
+    _, res["parse_user_prompt"] = time_stage(
+        lambda: [app.parse_user_prompt(p) for p in PROMPTS], len(PROMPTS), repeat * 50, budget)
+    _, res["suggest_furniture_colors"] = time_stage(
+        lambda: [app.suggest_furniture_colors(w) for w in WALL_COLORS],
+        len(WALL_COLORS), repeat * 50, budget)
+    res["predict_one"] = bench_predict_one(repeat, budget)
+    return res
+
+
+def bench_predict_one(repeat, budget):
+    from ml_recommender import generate_data, predict_one, train
+    try:
+        model, _, _, _, _, _, encoder = train()
+    except ImportError as e:        # xgboost / sklearn not installed (imported on first use)
+        return skipped(f"ImportError: {e}")
+    row = generate_data(1, seed=0).drop(columns="label").iloc[0].to_dict()
+    _, stats = time_stage(lambda: predict_one(model, encoder, row), 1, repeat * 50, budget)
+    return stats
+
+
+# ------------------- results -------------------
+def git_commit():
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, check=True, cwd=here).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, cwd=here).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "nogit"
+
+
+def compare(old, new, tolerance=TOLERANCE):
+    """Print p50 ratios for stages in both runs; returns the regressed ones."""
+    regressions = []
+    sections = [("queries", old.get("queries", {}), new.get("queries", {}))]
+    sections += [(f"n={n}", old["sizes"].get(n, {}), new["sizes"][n]) for n in new["sizes"]]
+    print(f"\nvs {old['commit']}  (fail above +{tolerance:.0%})")
+    for label, before, after in sections:
+        for stage, stats in after.items():
+            prev = before.get(stage, {})
+            if "p50_ms" not in stats or "p50_ms" not in prev:
+                continue
+            ratio = stats["p50_ms"] / max(prev["p50_ms"], 1e-9)
+            slower = (ratio > 1 + tolerance
+                      and stats["p50_ms"] - prev["p50_ms"] > NOISE_FLOOR_MS)
+            print(f"  {label:<10} {stage:<28} {prev['p50_ms']:>10.3f} → {stats['p50_ms']:>10.3f} ms"
+                  f"  x{ratio:.2f}{'  REGRESSION' if slower else ''}")
+            if slower:
+                regressions.append((label, stage))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark each recommendation pipeline stage.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="catalog sizes, e.g. 1k,100k,1M")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--budget", type=float, default=STAGE_BUDGET,
+                        help="seconds per stage before it stops repeating")
+    parser.add_argument("--sentiment-max", type=parse_size, default=SENTIMENT_MAX_ROWS)
+    parser.add_argument("--out", help=f"results JSON (default: {BENCH_DIR}/pipeline-<commit>.json)")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="fail on p50 regressions against OLD_JSON")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(), "platform": platform.platform(),
+        "cpus": os.cpu_count(), "query": QUERY,
+        "queries": {}, "sizes": {},
+    }
+
+    print("queries")
+    results["queries"] = bench_queries(args.repeat, args.budget)
+    for name, stats in results["queries"].items():
+        report(name, stats)
+    for size in args.sizes.split(","):
+        n = parse_size(size)
+        print(f"n = {n:,}")
+        results["sizes"][str(n)] = stages = bench_catalog(n, args.repeat, args.budget,
+                                                                    args.sentiment_max)
+        for name, stats in stages.items():
+            report(name, stats)
+
+    out = args.out or os.path.join(BENCH_DIR, f"pipeline-{commit}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as fh:
+        json.dump(results, fh, indent=2)
+    print(f"Results → {out}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(json.load(fh), results, args.tolerance)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} stage(s) regressed")
+
+
+if __name__ == "__main__":
+    main()
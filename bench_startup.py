@@ -0,0 +1,180 @@
+# --------------------------------------------------------------
+# bench_startup.py
+# Cold-start check: every module must import fast, small and quietly.
+#
+#  * each module is imported in a fresh interpreter (REPEAT times),
+#    from an empty scratch directory
+#  * import wall time (median) and peak RSS (max) are checked against
+#    IMPORT_BUDGET_MS / RSS_BUDGET_MB, or the module's BUDGETS entry
+#  * an audit hook records side effects during the import – file
+#    writes, directory changes, sockets, subprocesses – and heavy
+#    libraries (LAZY_MODULES) must not be loaded yet
+#  * exits 1 if any module is over budget or not side-effect free
+#
+#   python bench_startup.py
+#   python bench_startup.py --modules app,recommend_api --repeat 5
+# --------------------------------------------------------------
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPEAT = 3
+IMPORT_BUDGET_MS = 800      # pandas + pyarrow alone are ~500 ms of this
+RSS_BUDGET_MB = 150
+BUDGETS = {                 # module → (import ms, peak RSS MB); streamlit adds ~350 ms
+    "app": (1500, 220),
+    "home_decor_app": (1500, 220),
+    "recommend_api": (1500, 220),
+    "bench_pipeline": (1500, 220),
+}
+LAZY_MODULES = ("xgboost", "shap", "sklearn", "nltk", "matplotlib", "scipy", "torch")
+
+# Runs in the child: argv = [module, repo dir].  Prints one JSON line.
+_PROBE = r"""
+import json, os, sys, time
+
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_TRUNC | os.O_APPEND
+EVENTS = {"os.mkdir", "os.remove", "os.rmdir", "os.rename", "os.replace", "os.truncate",
+          "shutil.rmtree", "shutil.copyfile", "shutil.move", "sqlite3.connect",
+          "socket.connect", "socket.bind", "socket.getaddrinfo", "urllib.Request",
+          "subprocess.Popen", "os.system", "os.exec", "os.posix_spawn"}
+effects = []
+
+def hook(event, args):
+    if event == "open":
+        path, mode, flags = args
+        writing = any(c in mode for c in "wax+") if isinstance(mode, str) else bool(flags & WRITE_FLAGS)
+        if writing and path not in ("/dev/null",):
+            effects.append(f"open({path!r}, {mode or flags!r})")
+    elif event in EVENTS and len(effects) < 50:
+        effects.append(f"{event}{args!r}"[:200])
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+module, repo = sys.argv[1], sys.argv[2]
+sys.path.insert(0, repo)
+before = set(sys.modules)
+sys.addaudithook(hook)
+t0 = time.perf_counter()
+error = None
+try:
+    __import__(module)
+except Exception as e:          # a missing optional dependency is reported, not fatal
+    error = f"{type(e).__name__}: {e}"
+ms = (time.perf_counter() - t0) * 1000
+loaded = sorted({m.split(".")[0] for m in set(sys.modules) - before})
+print(json.dumps({"ms": ms, "rss_mb": peak_rss_mb(), "effects": effects,
+                  "loaded": loaded, "error": error}))
+"""
+
+
+def discover():
+    return sorted(os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(HERE, "*.py"))
+                  if os.path.basename(p) != os.path.basename(__file__)
+                  and not os.path.basename(p).startswith("test_"))
+
+
+def probe(module):
+    """One cold import in a scratch cwd, so stray relative writes show up as files."""
+    with tempfile.TemporaryDirectory(prefix="startup-") as cwd:
+        out = subprocess.run([sys.executable, "-c", _PROBE, module, HERE], cwd=cwd,
+                             capture_output=True, text=True)
+        created = sorted(os.path.relpath(os.path.join(d, f), cwd)
+                         for d, _, files in os.walk(cwd) for f in files)
+    if out.returncode != 0 or not out.stdout.strip():
+        return {"ms": 0.0, "rss_mb": 0.0, "effects": [], "loaded": [], "created": created,
+                "error": (out.stderr.strip().splitlines() or ["no output"])[-1]}
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["created"] = created
+    return result
+
+
+def bench_module(module, repeat=REPEAT):
+    runs = [probe(module) for _ in range(repeat)]
+    ms_budget, rss_budget = BUDGETS.get(module, (IMPORT_BUDGET_MS, RSS_BUDGET_MB))
+    res = {
+        "module": module,
+        "import_ms": round(statistics.median(r["ms"] for r in runs), 1),
+        "peak_rss_mb": round(max(r["rss_mb"] for r in runs), 1),
+        "budget_ms": ms_budget,
+        "budget_rss_mb": rss_budget,
+        "effects": sorted({e for r in runs for e in r["effects"]}),
+        "created": sorted({f for r in runs for f in r["created"]}),
+        "eager": sorted({m for r in runs for m in r["loaded"]} & set(LAZY_MODULES)),
+        "error": runs[0]["error"],
+    }
+    problems = []
+    if res["error"]:
+        problems.append(f"import failed: {res['error']}")
+    else:
+        if res["import_ms"] > ms_budget:
+            problems.append(f"import {res['import_ms']:.0f} ms > {ms_budget} ms")
+        if res["peak_rss_mb"] > rss_budget:
+            problems.append(f"RSS {res['peak_rss_mb']:.0f} MB > {rss_budget} MB")
+    if res["effects"]:
+        problems.append("side effects: " + "; ".join(res["effects"][:5]))
+    if res["created"]:
+        problems.append("created files: " + ", ".join(res["created"][:5]))
+    if res["eager"]:
+        problems.append("eager imports: " + ", ".join(res["eager"]))
+    res["problems"] = problems
+    return res
+
+
+def report(res):
+    status = "FAIL" if res["problems"] else "ok"
+    print(f"  {res['module']:<26} {res['import_ms']:>8.1f} ms / {res['budget_ms']:<5}"
+          f" {res['peak_rss_mb']:>7.1f} MB / {res['budget_rss_mb']:<4} {status}")
+    for p in res["problems"]:
+        print(f"      - {p}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import time, RSS and import side effects.")
+    parser.add_argument("--modules", help="comma-separated module names (default: every module here)")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--out", help="write the results as JSON")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="don't fail modules whose dependencies aren't installed")
+    args = parser.parse_args()
+
+    modules = args.modules.split(",") if args.modules else discover()
+    print(f"{'module':<28} {'import (median)':>18} {'peak RSS':>16}")
+    results = []
+    for module in modules:
+        res = bench_module(module, args.repeat)
+        if args.allow_missing and res["error"] and res["error"].startswith("ModuleNotFoundError"):
+            res["problems"] = [p for p in res["problems"] if not p.startswith("import failed")]
+        report(res)
+        results.append(res)
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as fh:
+            json.dump({"python": sys.version.split()[0], "results": results}, fh, indent=1)
+
+    failed = [r["module"] for r in results if r["problems"]]
+    if failed:
+        print(f"\n{len(failed)} module(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+    print("\nall modules within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+# --------------------------------------------------------------
+# catalog_store.py
+# One typed, columnar catalog built once from the IKEA, Amazon and
+# Flipkart sources.  Both Streamlit apps memory-map the result.
+#
+#   python catalog_store.py            → data/catalog.parquet
+# --------------------------------------------------------------
+
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from flipkart_loader import load_flipkart
+from keyword_index import INDEX_PATH, KeywordIndex
+from room_classifier import classify_rooms
+from similarity_index import SIMILARITY_DIR, SimilarityIndex
+from segregate_ikea_by_room import CATEGORY_TO_ROOM
+
+# -------------------------- CONFIG --------------------------
+IKEA_CSV     = "data/ikea_furniture.csv"
+AMAZON_CSV   = "data/amazon_furniture.csv"
+FLIPKART_ZIP = "data/flipkart.zip"
+STORE_PATH   = "data/catalog.parquet"
+
+INCH_TO_CM  = 2.54
+
+# ------------------- STORE SCHEMA -------------------
+# Every source is normalised into exactly these columns.
+CATEGORICAL_COLUMNS = ["source", "room_type", "category", "color", "style", "sentiment"]
+FLOAT_COLUMNS = ["price", "rating", "sentiment_score", "width", "depth", "height"]
+INT_COLUMNS = ["num_reviews", "num_purchases"]
+STRING_COLUMNS = ["product_id", "title", "url", "img_url"]
+STORE_COLUMNS = STRING_COLUMNS + CATEGORICAL_COLUMNS + FLOAT_COLUMNS + INT_COLUMNS
+
+STORE_SCHEMA = pa.schema(
+    [pa.field(c, pa.string()) for c in STRING_COLUMNS]
+    + [pa.field(c, pa.dictionary(pa.int16(), pa.string())) for c in CATEGORICAL_COLUMNS]
+    + [pa.field(c, pa.float32()) for c in FLOAT_COLUMNS]
+    + [pa.field(c, pa.int32()) for c in INT_COLUMNS]
+)
+
+# ------------------- KEYWORDS -------------------
+COLOR_KEYWORDS = {
+    "White": ["white", "ivory", "snow", "cream", "off-white"],
+    "Black": ["black", "ebony", "charcoal", "onyx", "jet"],
+    "Gray": ["gray", "grey", "silver", "ash", "slate"],
+    "Wood": ["wood", "wooden", "oak", "walnut", "teak", "pine", "birch", "cherry", "mahogany", "sheesham", "brown"],
+    "Beige": ["beige", "tan", "sand", "taupe", "khaki", "camel"],
+    "Blue": ["blue", "navy", "teal", "aqua", "cobalt", "indigo"],
+    "Green": ["green", "sage", "olive", "emerald", "mint", "lime"]
+}
+
+STYLE_KEYWORDS = {
+    "Minimalist": ["minimal", "minimalist", "minimalistic", "simple", "clean", "neutral", "scandi", "zen", "sleek", "basic", "compact"],
+    "Modern": ["modern", "contemporary", "chrome", "glass", "metal", "metallic", "geometric", "industrial"],
+    "Boho": ["boho", "rattan", "wicker", "macrame", "jute", "woven", "ethnic", "natural"]
+}
+
+
+# --------------------------------------------------------------
+# 1. Helpers
+# --------------------------------------------------------------
+def clean_price(s: pd.Series) -> pd.Series:
+    """Vectorised "$1,299.00" / "₹3,136" → float."""
+    digits = s.astype("string").str.replace(r"[^\d.]", "", regex=True)
+    return pd.to_numeric(digits.replace("", pd.NA), errors="coerce")
+
+
+def keyword_pattern(words) -> str:
+    """Whole words only (plurals allowed), so 'tan' no longer hits 'stand'."""
+    return r"(?<![a-z0-9])(?:" + "|".join(map(re.escape, words)) + r")(?:e?s)?(?![a-z0-9])"
+
+
+def label_from_keywords(titles: pd.Series, table: dict, default: str) -> pd.Series:
+    """First label in `table` whose keywords appear in the title wins."""
+    out = pd.Series(default, index=titles.index, dtype=object)
+    unset = pd.Series(True, index=titles.index)
+    lower = titles.str.lower()
+    for label, words in table.items():
+        hit = unset & lower.str.contains(keyword_pattern(words), na=False)
+        out[hit] = label
+        unset &= ~hit
+    return out
+
+
+# --------------------------------------------------------------
+# 2. Per-source readers → common schema
+# --------------------------------------------------------------
+def ikea_ids(raw: pd.DataFrame) -> pd.Series:
+    return "ikea:" + raw["item_id"].astype(str)
+
+
+def review_sentiment(raw: pd.DataFrame) -> pd.Series:
+    """The CSV's sentiment_score; rows that have reviews but no score get
+    one from VADER (nltk is only imported when such rows exist)."""
+    score = pd.to_numeric(raw.get("sentiment_score", pd.Series(np.nan, index=raw.index)),
+                          errors="coerce").astype("float64")
+    todo = score.isna() & raw.get("review_text", pd.Series(index=raw.index, dtype=object)).notna()
+    if todo.any():
+        from generate_synthetic_data import explode_reviews
+        from sentiment_analysis import SentimentCache, score_texts
+
+        reviews = explode_reviews(raw.loc[todo, ["review_text"]])
+        cache = SentimentCache()
+        try:
+            lookup = score_texts(reviews.unique(), cache=cache)
+        finally:
+            cache.close()
+        per_row = reviews.map(lookup).astype(float).groupby(level=0).mean()
+        score[todo] = per_row.reindex(range(int(todo.sum()))).to_numpy()
+    return score
+
+
+def ikea_rows(raw: pd.DataFrame) -> pd.DataFrame:
+    """Raw IKEA rows → store columns; row i depends on raw row i only."""
+    desc = raw["short_description"].fillna("").str.split().str.join(" ")
+    title = (raw["name"].fillna("") + " " + desc).str.strip()
+
+    df = pd.DataFrame({
+        "product_id": ikea_ids(raw),
+        "title": title,
+        "url": raw["link"],
+        "img_url": "",
+        "source": "IKEA",
+        "room_type": classify_rooms(raw["name"], raw["category"], CATEGORY_TO_ROOM),
+        "category": raw["category"],
+        "price": pd.to_numeric(raw["price"], errors="coerce"),
+        "width": raw["width"], "depth": raw["depth"], "height": raw["height"],
+        "num_reviews": raw["num_reviews"],
+        "num_purchases": raw["num_purchases"],
+        "sentiment_score": review_sentiment(raw),
+        "sentiment": raw.get("sentiment"),
+    })
+    # IKEA names are "<Style> <NAME>": Compact → Minimalist, Modern → Modern
+    prefix = raw["name"].str.split().str[0].map({"Compact": "Minimalist", "Modern": "Modern"})
+    df["style"] = prefix.fillna(label_from_keywords(title, STYLE_KEYWORDS, "Modern"))
+    df["color"] = label_from_keywords(title, COLOR_KEYWORDS, "Other")
+    return df
+
+
+def load_ikea(path=IKEA_CSV) -> pd.DataFrame:
+    return ikea_rows(pd.read_csv(path))
+
+
+def _amazon_dimension(dims: pd.Series, axis: str) -> pd.Series:
+    inches = dims.str.extract(rf'([\d.]+)"{axis}', expand=False)
+    return pd.to_numeric(inches, errors="coerce") * INCH_TO_CM
+
+
+def amazon_ids(raw: pd.DataFrame) -> pd.Series:
+    return "amazon:" + raw["asin"].astype(str)
+
+
+def amazon_rows(raw: pd.DataFrame) -> pd.DataFrame:
+    """Raw Amazon rows → store columns; row i depends on raw row i only."""
+    dims = raw["package_dimensions"].astype("string")
+    depth = _amazon_dimension(dims, "D").fillna(_amazon_dimension(dims, "L"))
+
+    df = pd.DataFrame({
+        "product_id": amazon_ids(raw),
+        "title": raw["title"].fillna(""),
+        "url": raw["url"],
+        "img_url": raw["primary_image"].fillna(""),
+        "source": "Amazon",
+        "room_type": classify_rooms(raw["title"]),
+        "category": raw["categories"].str.extract(r"'([^']+)'\]", expand=False).fillna("Furniture"),
+        "price": clean_price(raw["price"]),
+        "width": _amazon_dimension(dims, "W"), "depth": depth,
+        "height": _amazon_dimension(dims, "H"),
+    })
+    text = df["title"] + " " + raw["style"].fillna("") + " " + raw["color"].fillna("")
+    df["style"] = label_from_keywords(text, STYLE_KEYWORDS, "Modern")
+    df["color"] = label_from_keywords(text, COLOR_KEYWORDS, "Other")
+    return df
+
+
+def load_amazon(path=AMAZON_CSV) -> pd.DataFrame:
+    return amazon_rows(pd.read_csv(path))
+
+
+# --------------------------------------------------------------
+# 3. Normalise + write
+# --------------------------------------------------------------
+def normalize(frames) -> pd.DataFrame:
+    df = pd.concat(frames, ignore_index=True).reindex(columns=STORE_COLUMNS)
+    df = df.dropna(subset=["title", "price"])
+    df = df.drop_duplicates(subset=["product_id"]).reset_index(drop=True)
+
+    # Sources without engagement data get the catalog median, not zeros,
+    # so they are neither boosted nor buried by the ranking weights.
+    for c in ["num_reviews", "num_purchases", "sentiment_score"]:
+        df[c] = df[c].fillna(df[c].median())
+    df["rating"] = df["rating"].fillna((3.5 + 1.5 * df["sentiment_score"].clip(0, 1)).round(1))
+    label = np.where(df["sentiment_score"] >= 0.05, "positive",
+                     np.where(df["sentiment_score"] <= -0.05, "negative", "neutral"))
+    df["sentiment"] = df["sentiment"].fillna(pd.Series(label, index=df.index))
+
+    for c in STRING_COLUMNS:
+        df[c] = df[c].fillna("").astype(str)
+    for c in CATEGORICAL_COLUMNS:
+        df[c] = df[c].astype(str).astype("category")
+    for c in FLOAT_COLUMNS:
+        df[c] = df[c].astype("float32")
+    for c in INT_COLUMNS:
+        df[c] = df[c].round().astype("int32")
+    return df
+
+
+def write_store(df, out_path=STORE_PATH):
+    table = pa.Table.from_pandas(df, schema=STORE_SCHEMA, preserve_index=False)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    # Uncompressed so a memory-mapped read decodes without inflating pages
+    pq.write_table(table, out_path, compression="none")
+
+
+def build_store(out_path=STORE_PATH, ikea=IKEA_CSV, amazon=AMAZON_CSV, flipkart=FLIPKART_ZIP,
+                index_path=INDEX_PATH, similarity_dir=SIMILARITY_DIR):
+    frames = []
+    for loader, path in [(load_ikea, ikea), (load_amazon, amazon), (load_flipkart, flipkart)]:
+        if os.path.exists(path):
+            frames.append(loader(path))
+            print(f"   {len(frames[-1]):6,} ← {path}")
+        else:
+            print(f"Warning: {path} not found.")
+    if not frames:
+        raise FileNotFoundError("no catalog sources found")
+
+    df = normalize(frames)
+    write_store(df, out_path)
+    print(f"Catalog store → {out_path} ({len(df):,} rows)")
+
+    # Row ids in the keyword index are positions in the store
+    KeywordIndex.build(df["title"]).save(index_path)
+    print(f"Keyword index → {index_path}")
+    SimilarityIndex.build(df).save(similarity_dir)
+    print(f"Similarity index → {similarity_dir}")
+    return df
+
+
+# --------------------------------------------------------------
+# 4. Read side (used by both apps)
+# --------------------------------------------------------------
+# Strings stay in their Arrow buffers ("str" dtype) instead of one Python
+# object per value; NaN for missing, so masks are plain numpy bools.
+ARROW_STRINGS = {pa.string(): pd.StringDtype("pyarrow", na_value=np.nan)}
+
+
+def open_store(path=STORE_PATH, filters=None) -> pa.Table:
+    """Memory-map the store; pages are shared with every other reader."""
+    return pq.read_table(path, memory_map=True, filters=filters)
+
+
+def store_frame(table: pa.Table) -> pd.DataFrame:
+    return table.to_pandas(split_blocks=True, types_mapper=ARROW_STRINGS.get)
+
+
+def load_store_frame(path=STORE_PATH, room_type=None) -> pd.DataFrame:
+    """Store rows, indexed by store position (the keyword index row ids).
+
+    Decoding parquet still gives each process its own column buffers;
+    with room_type only that room's rows are decoded and converted.
+    """
+    if room_type is None:
+        return store_frame(open_store(path))
+    rooms = pq.read_table(path, columns=["room_type"], memory_map=True)["room_type"]
+    ids = np.flatnonzero(rooms.to_pandas() == room_type)
+    df = store_frame(open_store(path, filters=[("room_type", "=", room_type)]))
+    df.index = ids
+    return df
+
+
+def store_exists(path=STORE_PATH) -> bool:
+    return os.path.exists(path)
+
+
+def store_version(path=STORE_PATH) -> str:
+    """Changes whenever the store file is rebuilt (cache invalidation key)."""
+    st = os.stat(path)
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+if __name__ == "__main__":
+    build_store()
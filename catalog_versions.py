@@ -0,0 +1,330 @@
+# --------------------------------------------------------------
+# catalog_versions.py
+# Incremental catalog updates as immutable, versioned snapshots.
+#
+#  * source rows are keyed by their stable product id (IKEA item_id,
+#    Amazon asin, Flipkart member + row) and a hash of the raw row
+#  * an update runs the per-row work – room classification, style /
+#    color labels, VADER for reviews without a score – only on rows
+#    whose (id, hash) the previous version has not seen; all other rows
+#    are copied from that version's rows.parquet
+#  * catalog-wide steps (normalize()'s median fills) rerun on the whole
+#    frame; the keyword index reuses the postings of unchanged titles,
+#    the similarity index the vectors of unchanged products (full
+#    rebuild once REBUILD_FRACTION of the rows were embedded that way)
+#  * a version is written to a temporary directory, renamed into place
+#    when complete and never written again; CURRENT names the live one
+#    and is swapped with os.replace, so a reader sees the old or the new
+#    version, never a mix.  The apps resolve it once per rerun.
+#
+#   python catalog_versions.py update            # → data/catalog_versions/v000002-…/
+#   python catalog_versions.py update --full     # reprocess every row
+#   python catalog_versions.py list
+#   python catalog_versions.py activate v000001-…    # roll back
+# --------------------------------------------------------------
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from catalog_store import (AMAZON_CSV, IKEA_CSV, STORE_COLUMNS, amazon_ids, amazon_rows, ikea_ids,
+                           ikea_rows, load_store_frame, normalize, write_store)
+from flipkart_loader import FLIPKART_ZIP, flipkart_rows, read_archive
+from keyword_index import KeywordIndex
+from similarity_index import SimilarityIndex
+
+VERSIONS_DIR = "data/catalog_versions"
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+ROWS_FILE = "rows.parquet"          # every source row before normalize(), + row_hash
+STORE_FILE = "catalog.parquet"
+INDEX_FILE = "catalog_index.npz"
+SIMILARITY_SUBDIR = "similarity"
+
+ROWS_VERSION = 3            # bump when ikea_rows / amazon_rows / flipkart_rows change output
+KEEP_VERSIONS = 5
+REBUILD_FRACTION = 0.2
+
+SOURCES = {     # name → (default path, reader, stable ids, raw rows → store rows)
+    "ikea": (IKEA_CSV, pd.read_csv, ikea_ids, ikea_rows),
+    "amazon": (AMAZON_CSV, pd.read_csv, amazon_ids, amazon_rows),
+    "flipkart": (FLIPKART_ZIP, read_archive, itemgetter("product_id"), flipkart_rows),
+}
+
+# store columns each index is built from; a product keeps its index entry while these agree
+KEYWORD_COLUMNS = ["title"]
+SIMILARITY_COLUMNS = ["title", "category", "color", "style", "width", "depth", "height"]
+
+
+# --------------------------------------------------------------
+# 1. Versions on disk
+# --------------------------------------------------------------
+def current_version(root=VERSIONS_DIR):
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as fh:
+            return fh.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def current_store_path(root=VERSIONS_DIR):
+    """catalog.parquet of the live version, or None before the first update."""
+    name = current_version(root)
+    return os.path.join(root, name, STORE_FILE) if name else None
+
+
+def version_files(store):
+    """(keyword index, similarity dir) next to a versioned store, else None."""
+    folder = os.path.dirname(store)
+    if not os.path.exists(os.path.join(folder, MANIFEST_FILE)):
+        return None
+    return os.path.join(folder, INDEX_FILE), os.path.join(folder, SIMILARITY_SUBDIR)
+
+
+def list_versions(root=VERSIONS_DIR):
+    if not os.path.isdir(root):
+        return []
+    return sorted(n for n in os.listdir(root)
+                  if n.startswith("v") and os.path.exists(os.path.join(root, n, MANIFEST_FILE)))
+
+
+def read_manifest(name, root=VERSIONS_DIR):
+    with open(os.path.join(root, name, MANIFEST_FILE)) as fh:
+        return json.load(fh)
+
+
+def activate(name, root=VERSIONS_DIR):
+    """Point CURRENT at `name` with one atomic rename."""
+    if not os.path.exists(os.path.join(root, name, MANIFEST_FILE)):
+        raise FileNotFoundError(f"no catalog version {name} in {root}")
+    tmp = os.path.join(root, f".{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(tmp, "w") as fh:
+        fh.write(name + "\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, os.path.join(root, CURRENT_FILE))
+
+
+def prune(root=VERSIONS_DIR, keep=KEEP_VERSIONS):
+    """Delete all but the newest `keep` versions (never the live one).  Workers
+    that already mapped a deleted version keep reading it until they switch."""
+    live = current_version(root)
+    for name in list_versions(root)[:-keep or None]:
+        if name != live:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+# --------------------------------------------------------------
+# 2. Row identity + delta
+# --------------------------------------------------------------
+def row_hashes(raw: pd.DataFrame) -> np.ndarray:
+    """uint64 content hash per raw row.  Numbers are hashed as float64 so an
+    int column turning float (a NaN appears) does not change every hash;
+    positional "Unnamed: n" index columns are left out."""
+    cols = sorted(c for c in raw.columns if not str(c).startswith("Unnamed:"))
+    canon = pd.DataFrame({
+        c: (raw[c].astype("float64") if pd.api.types.is_numeric_dtype(raw[c])
+            else raw[c].astype("string").fillna(""))
+        for c in cols
+    })
+    return pd.util.hash_pandas_object(canon, index=False).to_numpy()
+
+
+def source_rows(raw, ids, hashes, previous, to_rows):
+    """Store rows for one source, in raw order: rows whose (id, hash) is in
+    `previous` are copied, only the rest go through `to_rows`.
+    Returns (rows + row_hash column, number of rows processed)."""
+    pos = np.full(len(raw), -1, dtype=np.int64)
+    if previous is not None and len(previous):
+        seen = pd.MultiIndex.from_arrays([previous["product_id"], previous["row_hash"]])
+        first = ~seen.duplicated()
+        previous, seen = previous[first], seen[first]
+        pos = seen.get_indexer(pd.MultiIndex.from_arrays([ids, hashes]))
+
+    parts = []
+    reused = np.flatnonzero(pos >= 0)
+    if len(reused):
+        parts.append(previous.iloc[pos[reused]].set_axis(reused))
+    fresh = np.flatnonzero(pos < 0)
+    if len(fresh):
+        done = to_rows(raw.iloc[fresh].reset_index(drop=True)).reindex(columns=STORE_COLUMNS)
+        done["row_hash"] = hashes[fresh]
+        parts.append(done.set_axis(fresh))
+    if not parts:
+        return pd.DataFrame(columns=STORE_COLUMNS + ["row_hash"]), 0
+    return pd.concat(parts).sort_index().reset_index(drop=True), len(fresh)
+
+
+def store_hashes(rows) -> pd.Series:
+    """product_id → row_hash for the rows normalize() keeps (titled, priced,
+    first row per id), so counts agree with the store."""
+    kept = rows.dropna(subset=["title", "price"]).drop_duplicates("product_id")
+    return kept.set_index("product_id")["row_hash"]
+
+
+def product_changes(previous, rows):
+    """Added / changed / removed product counts between two rows tables."""
+    new = store_hashes(rows)
+    if previous is None:
+        return {"products": len(new), "added": len(new), "changed": 0, "removed": 0}
+    old = store_hashes(previous)
+    both = new.index.intersection(old.index)
+    return {"products": len(new),
+            "added": int((~new.index.isin(old.index)).sum()),
+            "changed": int((new[both] != old[both]).sum()),
+            "removed": int((~old.index.isin(new.index)).sum())}
+
+
+def matching_rows(old, new, columns) -> np.ndarray:
+    """Per row of the new store: the old store row of the same product if
+    `columns` are unchanged, else -1."""
+    pos = pd.Index(old["product_id"]).get_indexer(new["product_id"])
+    same = np.flatnonzero(pos >= 0)
+    ok = np.ones(len(same), dtype=bool)
+    for c in columns:
+        a = old[c].astype(object).to_numpy()[pos[same]]
+        b = new[c].astype(object).to_numpy()[same]
+        ok &= (a == b) | (pd.isna(a) & pd.isna(b))
+    out = np.full(len(new), -1, dtype=np.int64)
+    out[same[ok]] = pos[same[ok]]
+    return out
+
+
+# --------------------------------------------------------------
+# 3. Update
+# --------------------------------------------------------------
+def _build_indexes(df, folder, name, base_dir, base_manifest):
+    """Keyword + similarity index for `df` into `folder`; deltas against the
+    base version when there is one.  Returns the manifest's index stats."""
+    old = load_store_frame(os.path.join(base_dir, STORE_FILE)) if base_dir else None
+
+    tokenised = len(df)
+    if old is not None:
+        reuse = matching_rows(old, df, KEYWORD_COLUMNS)
+        tokenised = int((reuse < 0).sum())
+        keywords = KeywordIndex.load(os.path.join(base_dir, INDEX_FILE)).updated(df["title"], reuse)
+    else:
+        keywords = KeywordIndex.build(df["title"])
+    keywords.save(os.path.join(folder, INDEX_FILE))
+
+    # "built": version of the last full build; "incremental_rows": embedded since
+    similarity, index = {"built": name, "incremental_rows": 0}, None
+    if old is not None:
+        reuse = matching_rows(old, df, SIMILARITY_COLUMNS)
+        stale = base_manifest["similarity"]["incremental_rows"] + int((reuse < 0).sum())
+        if stale <= REBUILD_FRACTION * len(df):
+            index = SimilarityIndex.load(os.path.join(base_dir, SIMILARITY_SUBDIR)).updated(df, reuse)
+            similarity = dict(base_manifest["similarity"], incremental_rows=stale)
+    if index is None:
+        index = SimilarityIndex.build(df)
+    index.save(os.path.join(folder, SIMILARITY_SUBDIR))
+    return {"keyword_rows_tokenised": tokenised, "similarity": similarity}
+
+
+def update(root=VERSIONS_DIR, paths=None, full=False, keep=KEEP_VERSIONS):
+    """Ingest the sources into a new catalog version and make it live.
+    Returns its manifest (the live one's if nothing changed)."""
+    t0 = time.perf_counter()
+    live = current_version(root)
+    live_rows = pq.read_table(os.path.join(root, live, ROWS_FILE)).to_pandas() if live else None
+    base = live if live and not full else None
+    if base and read_manifest(base, root).get("rows_version") != ROWS_VERSION:
+        print(f"{base} was processed by older row code – reprocessing every row")
+        base = None
+    base_dir = os.path.join(root, base) if base else None
+    previous = live_rows if base else None
+
+    frames, sources = [], {}
+    for name, (default, read, ids_of, to_rows) in SOURCES.items():
+        path = (paths or {}).get(name) or default
+        if not os.path.exists(path):
+            print(f"Warning: {path} not found.")
+            continue
+        raw = read(path)
+        rows, processed = source_rows(raw, ids_of(raw).to_numpy(dtype=object), row_hashes(raw),
+                                      previous, to_rows)
+        frames.append(rows)
+        sources[name] = {"path": path, "rows": len(raw), "processed": processed}
+        print(f"   {len(raw):6,} ← {path} ({processed:,} processed)")
+    if not frames:
+        raise FileNotFoundError("no catalog sources found")
+
+    rows = pd.concat(frames, ignore_index=True)
+    if (previous is not None and rows["product_id"].equals(previous["product_id"])
+            and rows["row_hash"].equals(previous["row_hash"])):
+        print(f"Catalog unchanged – {base} stays live")
+        return read_manifest(base, root)
+
+    df = normalize(frames)
+    seq = max([int(n[1:7]) for n in list_versions(root)] or [0]) + 1
+    digest = hashlib.blake2b(pd.util.hash_pandas_object(rows[["product_id", "row_hash"]], index=False)
+                             .to_numpy().tobytes(), digest_size=4).hexdigest()
+    name = f"v{seq:06d}-{digest}"
+    folder = os.path.join(root, f".{name}.{os.getpid()}.tmp")
+    os.makedirs(folder)
+    try:
+        pq.write_table(pa.Table.from_pandas(rows, preserve_index=False), os.path.join(folder, ROWS_FILE))
+        write_store(df, os.path.join(folder, STORE_FILE))
+        indexes = _build_indexes(df, folder, name, base_dir, read_manifest(base, root) if base else None)
+        manifest = {
+            "version": name, "parent": base, "rows_version": ROWS_VERSION, "created": time.time(),
+            "store_rows": len(df), "sources": sources, "changes": product_changes(live_rows, rows),
+            **indexes,
+        }
+        manifest["wall_s"] = round(time.perf_counter() - t0, 3)
+        with open(os.path.join(folder, MANIFEST_FILE), "w") as fh:
+            json.dump(manifest, fh, indent=1)
+        os.rename(folder, os.path.join(root, name))
+    except BaseException:
+        shutil.rmtree(folder, ignore_errors=True)
+        raise
+
+    activate(name, root)
+    prune(root, keep)
+    c = manifest["changes"]
+    print(f"Catalog {name} is live ({len(df):,} rows: +{c['added']:,} ~{c['changed']:,} -{c['removed']:,})")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Versioned, incremental catalog updates.")
+    parser.add_argument("--root", default=VERSIONS_DIR)
+    # --root is accepted after the command too ("update --root x")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--root", default=argparse.SUPPRESS, help=f"default: {VERSIONS_DIR}")
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("update", parents=[common], help="ingest changed source rows into a new live version")
+    up.add_argument("--full", action="store_true", help="reprocess every row, rebuild every index")
+    for name, (default, *_) in SOURCES.items():
+        up.add_argument(f"--{name}", default=default, help=f"default: {default}")
+    up.add_argument("--keep", type=int, default=KEEP_VERSIONS)
+    sub.add_parser("list", parents=[common], help="show versions, live one marked *")
+    act = sub.add_parser("activate", parents=[common], help="make an existing version live (e.g. roll back)")
+    act.add_argument("version")
+    args = parser.parse_args()
+
+    if args.command == "update":
+        update(args.root, {name: getattr(args, name) for name in SOURCES}, args.full, args.keep)
+    elif args.command == "activate":
+        activate(args.version, args.root)
+        print(f"{args.version} is live")
+    else:
+        live = current_version(args.root)
+        for name in list_versions(args.root):
+            m = read_manifest(name, args.root)
+            c = m["changes"]
+            print(f"{'*' if name == live else ' '} {name}  {m['store_rows']:>8,} rows"
+                  f"  +{c['added']:,} ~{c['changed']:,} -{c['removed']:,}  {m['wall_s']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# --------------------------------------------------------------
+# fit_filter.py
+# "Does it fit the room?" – prunes products whose footprint cannot
+# fit the room footprint from the prompt ("12x10" → feet → cm).
+#
+# A product fits if its footprint fits in either orientation, i.e.
+# max(w, d) <= room long side and min(w, d) <= room short side.
+# Rows are kept sorted by their long side, so one searchsorted cuts
+# off every too-long product and only that prefix gets the short-side
+# compare.  Rows without dimensions are never pruned.
+# --------------------------------------------------------------
+
+import re
+
+import numpy as np
+import pandas as pd
+
+FOOTPRINT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:x|×|by)\s*(\d+(?:\.\d+)?)\s*(ft|feet|foot|m|cm)?", re.I)
+UNIT_TO_CM = {"ft": 30.48, "feet": 30.48, "foot": 30.48, "m": 100.0, "cm": 1.0}
+DEFAULT_UNIT = "ft"         # "12x10" in a room prompt means feet
+
+
+def parse_footprint(text):
+    """'12x10' / '3.5 x 4 m' / '400x300cm' → (long_cm, short_cm), or None."""
+    m = FOOTPRINT_RE.search(str(text or ""))
+    if not m:
+        return None
+    scale = UNIT_TO_CM[(m.group(3) or DEFAULT_UNIT).lower()]
+    a, b = float(m.group(1)) * scale, float(m.group(2)) * scale
+    if a <= 0 or b <= 0:
+        return None
+    return max(a, b), min(a, b)
+
+
+class FitIndex:
+    """Rows sorted by footprint long side; `long[i]`, `short[i]` belong to
+    row `order[i]`.  Rows with unknown width/depth are listed in `unknown`."""
+
+    def __init__(self, width, depth):
+        w = np.asarray(width, dtype=np.float32)
+        d = np.asarray(depth, dtype=np.float32)
+        self.n_rows = len(w)
+        known = ~(np.isnan(w) | np.isnan(d))
+        rows = np.flatnonzero(known)
+        long_side = np.maximum(w[rows], d[rows])
+        short_side = np.minimum(w[rows], d[rows])
+        order = np.argsort(long_side, kind="stable")
+        self.order = rows[order]
+        self.long = long_side[order]
+        self.short = short_side[order]
+        self.unknown = np.flatnonzero(~known)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "FitIndex":
+        nan = np.full(len(df), np.nan, dtype=np.float32)
+        width = pd.to_numeric(df["width"], errors="coerce").to_numpy() if "width" in df.columns else nan
+        depth = pd.to_numeric(df["depth"], errors="coerce").to_numpy() if "depth" in df.columns else nan
+        return cls(width, depth)
+
+    def fits(self, footprint) -> np.ndarray:
+        """Boolean mask over the indexed rows: True unless it cannot fit."""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        if footprint is None:
+            mask[:] = True
+            return mask
+        room_long, room_short = footprint
+        cut = np.searchsorted(self.long, room_long, side="right")
+        ok = self.short[:cut] <= room_short
+        mask[self.order[:cut][ok]] = True
+        mask[self.unknown] = True
+        return mask
@@ -0,0 +1,161 @@
+# --------------------------------------------------------------
+# flipkart_loader.py
+# Reads flipkart.zip (one CSV per furniture type) into the same
+# schema catalog_store.py uses for IKEA / Amazon rows.
+#
+#  * archive members are parsed concurrently (one ZipFile per thread)
+#  * "₹3,136" prices are cleaned with vectorised string ops
+#  * product_details ("[<li ...>Key: Value</li>, ...]") is parsed by one
+#    compiled regex over the whole column – no ast.literal_eval per row
+# --------------------------------------------------------------
+
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from room_classifier import flipkart_rooms
+
+FLIPKART_ZIP = "data/flipkart.zip"
+INR_PER_USD = 83.0      # same rate the hand-typed Flipkart entries used
+
+# One <li>Key: Value</li> fragment; values never contain '<'
+LI_FIELD_RE = re.compile(r"<li[^>]*>\s*([^<:]+?)\s*:\s*([^<]*?)\s*</li>")
+
+# "187.96 cm x 86.36 cm x 66.4 cm (6 ft 2 in x ...)" – up to three numbers,
+# each with an optional unit (a missing unit inherits the next one given)
+_NUM = r"([\d.]+)\s*(mm|cm|inch|in|m)?\b"
+DIM_VALUE_RE = re.compile(rf"^\s*{_NUM}(?:\s*x\s*{_NUM})?(?:\s*x\s*{_NUM})?")
+UNIT_TO_CM = {"mm": 0.1, "cm": 1.0, "m": 100.0, "inch": 2.54, "in": 2.54}
+AXIS = {"w": "width", "h": "height", "d": "depth", "l": "depth"}
+
+MATERIAL_KEYS = ["material", "primary material", "frame material", "table top material"]
+UPHOLSTERY_KEYS = ["upholstery type", "upholestry", "upholstery"]
+
+
+# --------------------------------------------------------------
+# 1. Archive → raw frame
+# --------------------------------------------------------------
+def _read_member(path, member):
+    # ZipFile objects are not safe to share across threads
+    with zipfile.ZipFile(path) as zf, zf.open(member) as fh:
+        part = pd.read_csv(fh, index_col=0)
+    stem = os.path.splitext(os.path.basename(member))[0]
+    part["product_id"] = f"flipkart:{stem}-" + part.index.astype(str)
+    return part
+
+
+def read_archive(path=FLIPKART_ZIP, workers=8) -> pd.DataFrame:
+    with zipfile.ZipFile(path) as zf:
+        members = [m for m in zf.namelist()
+                   if m.endswith(".csv") and not m.startswith("__MACOSX")]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(lambda m: _read_member(path, m), members))
+    return pd.concat(parts, ignore_index=True)
+
+
+# --------------------------------------------------------------
+# 2. Vectorised field parsers
+# --------------------------------------------------------------
+def parse_inr(s: pd.Series) -> pd.Series:
+    """"₹3,136" → 3136.0 (NaN when no digits)."""
+    digits = s.astype("string").str.replace(r"[^\d.]", "", regex=True)
+    return pd.to_numeric(digits.replace("", pd.NA), errors="coerce")
+
+
+def _axes(key: str):
+    """'Table (W x H x D)' / 'Width x Height' / 'Mirror W x H' → ['width', 'height', ...]"""
+    inner = re.search(r"\(([^)]*)\)", key)
+    parts = (inner.group(1) if inner else key).lower().split(" x ")
+    return [AXIS.get(p.strip().split()[-1][:1]) if p.strip() else None for p in parts]
+
+
+def _parse_dimensions(kv: pd.DataFrame, n_rows: int) -> pd.DataFrame:
+    out = pd.DataFrame(np.nan, index=range(n_rows), columns=["width", "height", "depth"])
+    dims = kv[kv["key"].str.contains(" x ", regex=False)]
+    # first dimension fragment per product (a dining set lists table first)
+    dims = dims[~dims.index.get_level_values(0).duplicated()]
+    if dims.empty:
+        return out
+
+    m = dims["value"].str.extract(DIM_VALUE_RE)
+    nums = [pd.to_numeric(m[i], errors="coerce") for i in (0, 2, 4)]
+    # a missing unit takes the next unit given, else the previous one
+    u1, u2, u3 = m[1], m[3], m[5]
+    u2 = u2.fillna(u3)
+    u1 = u1.fillna(u2)
+    u2 = u2.fillna(u1)
+    units = [u1, u2, u3.fillna(u2)]
+    rows = dims.index.get_level_values(0).to_numpy()
+
+    # Few distinct key spellings → loop over keys, vectorise over rows
+    for key, sel in dims.groupby("key").groups.items():
+        pos = dims.index.get_indexer(sel)
+        for i, axis in enumerate(_axes(key)[:3]):
+            if axis is None:
+                continue
+            cm = nums[i].iloc[pos] * units[i].iloc[pos].map(UNIT_TO_CM).astype(float)
+            out.loc[rows[pos], axis] = cm.to_numpy()
+    return out
+
+
+def _first_value(kv: pd.DataFrame, keys, n_rows: int) -> pd.Series:
+    hit = kv[kv["key"].isin(keys)].copy()
+    hit["rank"] = hit["key"].map({k: i for i, k in enumerate(keys)})
+    hit = hit.sort_values("rank", kind="stable")
+    first = hit.groupby(level=0)["value"].first()
+    return first.reindex(range(n_rows))
+
+
+def parse_details(details: pd.Series) -> pd.DataFrame:
+    """product_details column → width/height/depth (cm), material, upholstery."""
+    details = details.reset_index(drop=True).fillna("")
+    kv = details.str.extractall(LI_FIELD_RE)
+    kv.columns = ["key", "value"]
+    kv["key"] = kv["key"].str.strip()
+    n = len(details)
+
+    out = _parse_dimensions(kv, n)
+    kv["key"] = kv["key"].str.lower()
+    out["material"] = _first_value(kv, MATERIAL_KEYS, n)
+    out["upholstery"] = _first_value(kv, UPHOLSTERY_KEYS, n)
+    out["style_hint"] = _first_value(kv, ["style"], n)
+    return out
+
+
+# --------------------------------------------------------------
+# 3. Common schema
+# --------------------------------------------------------------
+def flipkart_rows(raw: pd.DataFrame) -> pd.DataFrame:
+    """Raw archive rows in the catalog_store schema (+ material / upholstery)."""
+    from catalog_store import COLOR_KEYWORDS, STYLE_KEYWORDS, label_from_keywords
+
+    details = parse_details(raw["product_details"])
+
+    df = pd.DataFrame({
+        "product_id": raw["product_id"],
+        "title": raw["name"].fillna(""),
+        "url": "",
+        "img_url": "",
+        "source": "Flipkart",
+        "category": raw["furniture_type"],
+        "price": parse_inr(raw["discounted_price"]) / INR_PER_USD,
+        "width": details["width"], "depth": details["depth"], "height": details["height"],
+        "material": details["material"],
+        "upholstery": details["upholstery"],
+    })
+    # The furniture type (= archive member) is the room signal here
+    df["room_type"] = flipkart_rooms(df["title"], raw["furniture_type"])
+
+    text = (df["title"] + " " + details["material"].fillna("") + " "
+            + details["upholstery"].fillna("") + " " + details["style_hint"].fillna(""))
+    df["style"] = label_from_keywords(text, STYLE_KEYWORDS, "Modern")
+    df["color"] = label_from_keywords(text, COLOR_KEYWORDS, "Other")
+    return df
+
+
+def load_flipkart(path=FLIPKART_ZIP, workers=8) -> pd.DataFrame:
+    return flipkart_rows(read_archive(path, workers=workers))
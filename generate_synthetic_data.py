@@ -1,17 +1,27 @@
 # generate_synthetic_data.py
+#
+# Adds synthetic num_reviews / num_purchases / reviews to the scraped CSVs.
+# Everything is drawn as NumPy arrays chunk by chunk, so memory stays fixed
+# whatever the input size.  Reviews can be stored as template ids
+# (review_room, review_t0..review_t2) and rendered lazily with
+# render_reviews() / explode_reviews() instead of JSON strings.
+#
+#   python generate_synthetic_data.py                        # enrich data/*.csv
+#   python generate_synthetic_data.py --synth 10000000 --out data/load_test.parquet
 import pandas as pd
 import numpy as np
-import random
+import argparse
 import json
 import os
-import re
 
-np.random.seed(42)
-random.seed(42)
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SEED = 42
 
 INPUT_DIR = "data"
 OUTPUT_DIR = "data/synthetic_enhanced"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+CHUNKSIZE = 250_000
 
 REVIEW_TEMPLATES = [
     "Love this {product}! Super sturdy and stylish.",
@@ -26,39 +36,169 @@ REVIEW_TEMPLATES = [
     "Exactly what I needed. Highly recommend."
 ]
 ROOMS = ["bedroom", "kitchen", "living room", "bathroom", "office", "hallway", "balcony"]
+REVIEWS_PER_PRODUCT = 3
+REVIEW_ID_COLUMNS = [f"review_t{j}" for j in range(REVIEWS_PER_PRODUCT)]
+
+# product words used by --synth load-test rows
+SYNTH_WORDS = ["MALM", "HEMNES", "KALLAX", "BILLY", "LACK", "POÄNG", "EKET", "PAX",
+               "Modern", "Classic", "Compact", "Luxury", "Rustic", "Velvet", "Oak", "Steel"]
+
+def clean_price(s: pd.Series) -> pd.Series:
+    digits = s.astype("string").str.replace(r"[^\d.]", "", regex=True)
+    return pd.to_numeric(digits.replace("", pd.NA), errors="coerce")
+
+
+# ------------------- vectorised draws -------------------
+def draw_review_ids(rng, n, k=REVIEWS_PER_PRODUCT):
+    """k distinct template ids per row (same law as random.sample(T, k))."""
+    return np.argsort(rng.random((n, len(REVIEW_TEMPLATES)), dtype=np.float32), axis=1)[:, :k].astype(np.int8)
+
+
+def enrich(df, rng, lazy_reviews=True):
+    """Synthetic columns for one chunk; draws are whole-array, no row loop."""
+    n = len(df)
+    df = df.drop(columns=["review_text"], errors="ignore")
+    df["num_reviews"] = rng.integers(10, 1000, size=n)
+    df["num_purchases"] = rng.integers(50, 5000, size=n)
+    df["review_room"] = rng.integers(0, len(ROOMS), size=n).astype(np.int8)
+    ids = draw_review_ids(rng, n)
+    for j, col in enumerate(REVIEW_ID_COLUMNS):
+        df[col] = ids[:, j]
+    if not lazy_reviews:
+        df["review_text"] = review_json(df)
+        df = df.drop(columns=["review_room"] + REVIEW_ID_COLUMNS)
+    return df
+
+
+# ------------------- lazy rendering -------------------
+def product_word(df) -> pd.Series:
+    name = df["title"] if "title" in df.columns else df["name"]
+    return name.astype(str).str.split(n=1).str[0].fillna("")
+
+
+def render_reviews(product, room_id, template_ids):
+    """Review strings for one product (what the JSON column used to hold)."""
+    room = ROOMS[int(room_id)]
+    return [REVIEW_TEMPLATES[int(t)].format(product=product, room=room) for t in template_ids]
+
+
+def _render_column(words, rooms, tids):
+    """Render one review column; each distinct (product, room, template) once."""
+    keys = pd.DataFrame({"w": words.to_numpy(), "r": rooms, "t": tids})
+    codes, uniq = pd.factorize(pd.MultiIndex.from_frame(keys))
+    texts = np.array([REVIEW_TEMPLATES[t].format(product=w, room=ROOMS[r]) for w, r, t in uniq],
+                     dtype=object)
+    return texts[codes]
+
 
-def clean_price(val):
-    if pd.isna(val): return np.nan
-    s = re.sub(r"[^\d.]", "", str(val))
-    return float(s) if s else np.nan
+def explode_reviews(df) -> pd.Series:
+    """One rendered review per entry, indexed by row position; works for
+    both the lazy id columns and the legacy JSON review_text column."""
+    df = df.reset_index(drop=True)
+    if "review_text" in df.columns:
+        return df["review_text"].map(json.loads).explode().dropna()
+    words = product_word(df)
+    rooms = df["review_room"].to_numpy()
+    parts = [pd.Series(_render_column(words, rooms, df[c].to_numpy()), index=df.index)
+             for c in REVIEW_ID_COLUMNS]
+    return pd.concat(parts).sort_index(kind="stable")
 
-def generate_enhanced_csv(input_file, output_file):
+
+def review_json(df) -> pd.Series:
+    """Legacy JSON review_text, assembled column-wise from rendered strings."""
+    words = product_word(df)
+    rooms = df["review_room"].to_numpy()
+    out = pd.Series("[", index=df.index, dtype=object)
+    for j, c in enumerate(REVIEW_ID_COLUMNS):
+        rendered = _render_column(words, rooms, df[c].to_numpy())
+        quoted = pd.Series(rendered).map(json.dumps).to_numpy()
+        out = out + ("" if j == 0 else ", ") + quoted
+    return out + "]"
+
+
+# ------------------- chunked writers -------------------
+class ChunkWriter:
+    """Appends frames to .csv or .parquet without holding them in memory."""
+
+    def __init__(self, path):
+        self.path = path
+        self._pq = None
+        self._first = True
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, df):
+        if self.path.endswith(".parquet"):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._pq is None:
+                self._pq = pq.ParquetWriter(self.path, table.schema)
+            self._pq.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._pq is not None:
+            self._pq.close()
+
+
+def generate_enhanced_csv(input_file, output_file, chunksize=CHUNKSIZE, lazy_reviews=False, seed=SEED):
     if not os.path.exists(input_file):
         print(f"Warning: {input_file} not found.")
         return
-    df = pd.read_csv(input_file)
-    print(f"Loaded {len(df)} rows from {input_file}")
-
-    # Clean price
-    df["price"] = df["price"].apply(clean_price)
-    df = df.dropna(subset=["title", "name"])  # Ensure title/name exists
-
-    # Add synthetic columns
-    df["num_reviews"] = np.random.randint(10, 1000, size=len(df))
-    df["num_purchases"] = np.random.randint(50, 5000, size=len(df))
-
-    reviews_list = []
-    for i in range(len(df)):
-        product = df["title"].iloc[i].split()[0] if "title" in df.columns else df["name"].iloc[i].split()[0]
-        room = random.choice(ROOMS)
-        reviews = [t.format(product=product, room=room) for t in random.sample(REVIEW_TEMPLATES, 3)]
-        reviews_list.append(json.dumps(reviews))
-    df["review_text"] = reviews_list
-
-    df.to_csv(output_file, index=False)
+    rng = np.random.default_rng(seed)
+    writer = ChunkWriter(output_file)
+    total = 0
+    try:
+        for df in pd.read_csv(input_file, chunksize=chunksize):
+            # Clean price
+            df["price"] = clean_price(df["price"])
+            # Ensure title/name exists
+            df = df.dropna(subset=[c for c in ("title", "name") if c in df.columns])
+            writer.write(enrich(df, rng, lazy_reviews=lazy_reviews))
+            total += len(df)
+    finally:
+        writer.close()
+    print(f"Loaded {total} rows from {input_file}")
     print(f"Enhanced → {output_file}")
 
+
+def synthesize_rows(n, output_file, chunksize=1_000_000, seed=SEED):
+    """n synthetic catalog rows (lazy reviews) for load tests, written in chunks."""
+    rng = np.random.default_rng(seed)
+    writer = ChunkWriter(output_file)
+    words = np.array(SYNTH_WORDS, dtype=object)
+    try:
+        for start in range(0, n, chunksize):
+            m = min(chunksize, n - start)
+            df = pd.DataFrame({
+                "item_id": np.arange(start, start + m, dtype=np.int64),
+                "title": words[rng.integers(0, len(words), size=m)],
+                "price": rng.uniform(15, 800, size=m).astype(np.float32).round(2),
+            })
+            writer.write(enrich(df, rng, lazy_reviews=True))
+    finally:
+        writer.close()
+    print(f"Synthesized {n:,} rows → {output_file}")
+
+
 # Run
-generate_enhanced_csv("data/amazon_furniture.csv", f"{OUTPUT_DIR}/amazon_enhanced.csv")
-generate_enhanced_csv("data/ikea_furniture.csv", f"{OUTPUT_DIR}/ikea_enhanced.csv")
-print("Synthetic columns added!")
\ No newline at end of file
+def main():
+    parser = argparse.ArgumentParser(description="Add synthetic reviews / purchases.")
+    parser.add_argument("--lazy-reviews", action="store_true",
+                        help="store review template ids instead of JSON review_text")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--synth", type=int, default=0, help="generate N load-test rows instead")
+    parser.add_argument("--out", default=f"{OUTPUT_DIR}/synthetic.parquet")
+    args = parser.parse_args()
+
+    if args.synth:
+        synthesize_rows(args.synth, args.out)
+        return
+    generate_enhanced_csv(f"{INPUT_DIR}/amazon_furniture.csv", f"{OUTPUT_DIR}/amazon_enhanced.csv",
+                          args.chunksize, args.lazy_reviews)
+    generate_enhanced_csv(f"{INPUT_DIR}/ikea_furniture.csv", f"{OUTPUT_DIR}/ikea_enhanced.csv",
+                          args.chunksize, args.lazy_reviews)
+    print("Synthetic columns added!")
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,19 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import random
+import hashlib
+import io
 import os
-from PIL import Image
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+from catalog_store import store_version
+from keyword_index import KeywordIndex, scan_match
+from result_cache import ResultCache, query_key
+from shared_catalog import active_store_path, index_paths, load_catalog_frame
+from scoring import caps_for, diverse_top_k, get_engine
+from seeding import GENERATOR_VERSION, cached_frame, seeded_rng
+from thumbnails import ThumbnailCache
+from tracing import span, trace_rerun, traced
 
 # -------------------------- CONFIG --------------------------
 AMAZON_FILE = "data/amazon_furniture.csv"
@@ -28,7 +37,7 @@ COLOR_KEYWORDS = {
     "White": ["white", "ivory", "snow", "cream", "off-white"],
     "Black": ["black", "ebony", "charcoal", "onyx", "jet"],
     "Gray": ["gray", "grey", "silver", "ash", "slate"],
-    "Wood": ["wood", "oak", "walnut", "teak", "pine", "birch", "cherry", "mahogany", "natural wood"],
+    "Wood": ["wood", "wooden", "oak", "walnut", "teak", "pine", "birch", "cherry", "mahogany", "natural wood"],
     "Beige": ["beige", "tan", "sand", "taupe", "khaki", "camel"],
     "Blue": ["blue", "navy", "teal", "aqua", "cobalt", "indigo"],
     "Green": ["green", "sage", "olive", "emerald", "mint", "lime"]
@@ -42,13 +51,14 @@ AVOID_KEYWORDS = [
 ]
 
 STYLE_KEYWORDS = {
-    "Minimalist": ["minimal","simple","clean","neutral","scandi","zen","sleek","basic","monochrome","matte"],
-    "Modern": ["modern","contemporary","chrome","glass","metal","geometric","industrial","led","acrylic"],
+    "Minimalist": ["minimal","minimalist","minimalistic","simple","clean","neutral","scandi","zen","sleek","basic","monochrome","matte"],
+    "Modern": ["modern","contemporary","chrome","glass","metal","metallic","geometric","industrial","led","acrylic"],
     "Boho": ["boho","rattan","wicker","macrame","jute","woven","ethnic","natural","terracotta"]
 }
 
 # ------------------- REAL IKEA CATALOG (320+ ITEMS) -------------------
-def generate_real_ikea_catalog():
+def generate_real_ikea_catalog(rng=None):
+    rng = rng or seeded_rng("ikea")
     catalog = []
     base_img = "https://www.ikea.com/us/en/images/products"
     
@@ -161,15 +171,15 @@ def generate_real_ikea_catalog():
 
     for room, items in templates.items():
         for _ in range(40):  # 40 per room
-            name, cat, base_price, img_template = random.choice(items)
-            color = random.choice(list(colors_map.keys()))
-            style = random.choice(styles)
+            name, cat, base_price, img_template = rng.choice(items)
+            color = rng.choice(list(colors_map.keys()))
+            style = rng.choice(styles)
             color_lower = colors_map[color]
 
             title = f"{style} {color} {name}".strip().replace("  ", " ")
-            price = round(base_price * random.uniform(0.8, 1.3), 2)
+            price = round(base_price * rng.uniform(0.8, 1.3), 2)
             img_url = f"{base_img}/{img_template.format(color_lower=color_lower)}"
-            url = f"https://www.ikea.com/us/en/p/{title.lower().replace(' ', '-')}-{random.randint(1000000,9999999)}/"
+            url = f"https://www.ikea.com/us/en/p/{title.lower().replace(' ', '-')}-{rng.randint(1000000,9999999)}/"
 
             catalog.append({
                 "title": title,
@@ -186,17 +196,17 @@ def generate_real_ikea_catalog():
     return catalog
 
 # ------------------- LOAD DATA -------------------
-@st.cache_data
-def load_data():
+def build_data():
+    rng = seeded_rng("home_decor")
     df_list = []
 
     # IKEA - 320+ real items
-    ikea_catalog = generate_real_ikea_catalog()
+    ikea_catalog = generate_real_ikea_catalog(rng)
     ikea_df = pd.DataFrame(ikea_catalog)
-    ikea_df["num_reviews"] = [random.randint(800, 3000) for _ in range(len(ikea_df))]
-    ikea_df["num_purchases"] = [random.randint(1500, 8000) for _ in range(len(ikea_df))]
-    ikea_df["rating"] = [round(random.uniform(4.5, 4.9), 1) for _ in range(len(ikea_df))]
-    ikea_df["sentiment_score"] = [round(random.uniform(0.85, 0.96), 2) for _ in range(len(ikea_df))]
+    ikea_df["num_reviews"] = [rng.randint(800, 3000) for _ in range(len(ikea_df))]
+    ikea_df["num_purchases"] = [rng.randint(1500, 8000) for _ in range(len(ikea_df))]
+    ikea_df["rating"] = [round(rng.uniform(4.5, 4.9), 1) for _ in range(len(ikea_df))]
+    ikea_df["sentiment_score"] = [round(rng.uniform(0.85, 0.96), 2) for _ in range(len(ikea_df))]
     ikea_df["sentiment"] = "positive"
     df_list.append(ikea_df)
 
@@ -205,21 +215,21 @@ def load_data():
     for room in ROOM_OPTIONS:
         for cat in ["Bed", "Table", "Chair", "Sofa", "Lamp", "Shelf"]:
             for color in COLOR_OPTIONS[1:5]:
-                if random.random() > 0.6: continue
+                if rng.random() > 0.6: continue
                 amazon_sim.append({
                     "title": f"Modern {color} {cat} for {room}",
-                    "price": round(random.uniform(80, 900), 2),
-                    "url": f"https://amazon.com/dp/B0{random.randint(1000000,9999999)}",
+                    "price": round(rng.uniform(80, 900), 2),
+                    "url": f"https://amazon.com/dp/B0{rng.randint(1000000,9999999)}",
                     "img_url": f"https://via.placeholder.com/300x300/333333/FFFFFF?text={cat}+{room}",
                     "source": "Amazon",
                     "category": cat,
                     "room_type": room,
                     "color": color,
-                    "style": random.choice(["Modern", "Minimalist"]),
-                    "num_reviews": random.randint(50, 400),
-                    "num_purchases": random.randint(100, 1000),
-                    "rating": round(random.uniform(3.9, 4.8), 1),
-                    "sentiment_score": round(random.uniform(0.65, 0.92), 2),
+                    "style": rng.choice(["Modern", "Minimalist"]),
+                    "num_reviews": rng.randint(50, 400),
+                    "num_purchases": rng.randint(100, 1000),
+                    "rating": round(rng.uniform(3.9, 4.8), 1),
+                    "sentiment_score": round(rng.uniform(0.65, 0.92), 2),
                     "sentiment": "positive"
                 })
     df_list.append(pd.DataFrame(amazon_sim))
@@ -228,60 +238,139 @@ def load_data():
     df = df.drop_duplicates(subset=["title"]).reset_index(drop=True)
     return df
 
+# Seeded, so every worker builds the same catalog – built once on disk, then read
+@st.cache_data
+def load_data():
+    return cached_frame("home_decor", [], build_data)
+
+# The live version from `python catalog_versions.py update` (or `python
+# catalog_store.py`'s store; published to shared memory by `python
+# shared_catalog.py publish`, see $HOME_DECOR_SHARED_CATALOG).
+# cache_resource hands every session the same memory-mapped frame instead
+# of a pickled copy per cache hit; keyed by the store path resolved once
+# per rerun, so a new version is used from the next rerun on.
+@st.cache_resource(max_entries=2)
+def load_store(store):
+    return load_catalog_frame(store)
+
+@st.cache_resource(max_entries=2)
+def load_keyword_index(store):
+    path = index_paths(store)[0]
+    return KeywordIndex.load(path) if os.path.exists(path) else None
+
 # ------------------- STRICT FILTER -------------------
+@traced()
 def filter_by_room_strict(df, room):
     return df[df["room_type"] == room].copy()
 
-def filter_by_keywords(df, style, color):
-    filtered = df.copy()
-
+@traced()
+def filter_by_keywords(df, style, color, index=None):
+    # Store-backed frames keep their store row ids as index labels, so the
+    # precomputed keyword bitmaps can be applied directly.
+    include = []
     if style != "All Styles":
-        style_words = STYLE_KEYWORDS.get(style, [])
-        filtered = filtered[filtered["title"].str.contains("|".join(style_words), case=False, na=False)]
-
+        include.append(STYLE_KEYWORDS.get(style, []))
     if color != "All Colors":
-        color_words = COLOR_KEYWORDS.get(color, [])
-        filtered = filtered[filtered["title"].str.contains("|".join(color_words), case=False, na=False)]
-
-    avoid_pattern = "|".join(AVOID_KEYWORDS)
-    filtered = filtered[~filtered["title"].str.contains(avoid_pattern, case=False, na=False)]
-
-    return filtered
+        include.append(COLOR_KEYWORDS.get(color, []))
+    if index is not None:
+        mask = index.match(include, AVOID_KEYWORDS)
+        return df[mask[df.index.to_numpy()]]
+    return df[scan_match(df["title"], include, AVOID_KEYWORDS)]
 
 # ------------------- WEIGHTING -------------------
+# Returns the under-budget rows with `total_weight`, NOT sorted – callers
+# take top-k (get_diverse_top20 / nlargest) instead of sorting everything.
+@traced()
 def weight_by_budget(df, budget):
-    sub = df[df["price"] <= budget].copy()
-    if sub.empty: return sub
-    pmin, pmax = sub["price"].min(), sub["price"].max()
-    sub["w_price"] = (pmax - sub["price"]) / (pmax - pmin + 1e-6)
-    sub["w_rating"] = sub["rating"] / 5.0
-    sub["w_purch"] = sub["num_purchases"] / (sub["num_purchases"].max() + 1e-6)
-    sub["w_sent"] = sub["sentiment_score"]
-    sub["total_weight"] = 0.3*sub["w_price"] + 0.2*sub["w_rating"] + 0.3*sub["w_purch"] + 0.2*sub["w_sent"]
-    return sub.sort_values("total_weight", ascending=False)
+    idx, weight = get_engine().weigh(
+        df["price"].to_numpy(), df["rating"].to_numpy(),
+        df["num_purchases"].to_numpy(), df["sentiment_score"].to_numpy(), budget)
+    if len(idx) == 0: return df.iloc[0:0].assign(total_weight=np.empty(0, dtype=np.float32))
+    return df.iloc[idx].assign(total_weight=weight)
 
 # ------------------- DIVERSE TOP 20 -------------------
-def get_diverse_top20(df):
-    ikea = df[df["source"] == "IKEA"]
-    amazon = df[df["source"] == "Amazon"]
-    selected = []
-    cat_count = {}
+# IKEA first (max 12), then Amazon, then Flipkart up to 20; max 3 per category.
+SOURCE_ORDER = ["IKEA", "Amazon", "Flipkart"]
+SOURCE_CAPS = {"IKEA": 12}
+CATEGORY_CAP = 3
 
-    for _, row in ikea.iterrows():
-        cat = row["category"]
-        if cat_count.get(cat, 0) < 3 and len(selected) < 12:
-            selected.append(row)
-            cat_count[cat] = cat_count.get(cat, 0) + 1
-
-    for _, row in amazon.iterrows():
-        cat = row["category"]
-        if cat_count.get(cat, 0) < 3 and len(selected) < 20:
-            selected.append(row)
-            cat_count[cat] = cat_count.get(cat, 0) + 1
-
-    return pd.DataFrame(selected[:20])
+@traced()
+def get_diverse_top20(df):
+    if df.empty: return df
+    src = pd.Categorical(df["source"], categories=SOURCE_ORDER)
+    known = src.codes >= 0
+    df, src_codes = df[known], src.codes[known].astype(np.int64)
+    cat_codes, cats = pd.factorize(df["category"])
+    pos = diverse_top_k(
+        df["total_weight"].to_numpy(),
+        [(src_codes, caps_for(SOURCE_ORDER, SOURCE_CAPS)),
+         (cat_codes, np.full(len(cats), CATEGORY_CAP))],
+        k=20, priority=src_codes)
+    return df.iloc[pos]
+
+# ------------------- ROOM PHOTO -------------------
+# Phone photos are 12+ MP; decode once at display size (JPEG draft mode
+# scales in the decoder) and key everything on the upload's hash, so a
+# slider change reuses the preview instead of re-decoding the photo.
+PREVIEW_SIZE = (1280, 1280)
+PREVIEW_QUALITY = 85
+
+def upload_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _jpeg(img):
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=PREVIEW_QUALITY)
+    return buf.getvalue()
+
+@st.cache_resource(max_entries=8)
+def decode_room_photo(digest, _data):
+    img = Image.open(io.BytesIO(_data))
+    img.draft("RGB", PREVIEW_SIZE)
+    img = ImageOps.exif_transpose(img).convert("RGB")
+    img.thumbnail(PREVIEW_SIZE)
+    return img
+
+@st.cache_data(max_entries=8)
+def room_preview(digest, _data):
+    return _jpeg(decode_room_photo(digest, _data))
+
+@st.cache_data(max_entries=32)
+def design_preview(digest, _data, label):
+    """Preview photo with the query label in a translucent box, top-left."""
+    img = decode_room_photo(digest, _data).convert("RGBA")
+    font = ImageFont.load_default(size=max(14, img.width // 40))
+    layer = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    pad = font.size // 2
+    x, y = img.width // 50, img.height // 25
+    box = draw.multiline_textbbox((x, y), label, font=font)
+    draw.rectangle([box[0] - pad, box[1] - pad, box[2] + pad, box[3] + pad], fill=(0, 0, 0, 180))
+    draw.multiline_text((x, y), label, font=font, fill=(255, 255, 0, 255))
+    return _jpeg(Image.alpha_composite(img, layer).convert("RGB"))
 
 # ------------------- MAIN UI -------------------
+# Card thumbnails from the local disk cache; missing ones are fetched in the background
+@st.cache_resource
+def load_thumbnail_cache():
+    return ThumbnailCache()
+
+# Top-20 row ids of recent queries, shared by every session of the process
+@st.cache_resource
+def load_result_cache():
+    return ResultCache()
+
+def rank_candidates(df, room, style, color, budget, store):
+    """room → keyword filter → budget weights; returns (ranked, fell back?)."""
+    filtered = filter_by_room_strict(df, room)
+    filtered = filter_by_keywords(filtered, style, color,
+                                  index=load_keyword_index(store) if store else None)
+    ranked = weight_by_budget(filtered, budget)
+    if ranked.empty:
+        return weight_by_budget(filtered, 999999), True
+    return ranked, False
+
+@trace_rerun("home_decor_app")
 def main():
     st.set_page_config(page_title="Home Decor AI", layout="wide")
     st.title("AI‑Based Home Decor Recommendation System")
@@ -297,77 +386,99 @@ def main():
         st.info("Please upload a room photo.")
         st.stop()
 
-    room_img = Image.open(uploaded).convert("RGB")
-    st.image(room_img, caption=f"Empty {selected_room} – {selected_style} – {selected_color}", use_container_width=True)
+    with span("photo_preview"):
+        photo = uploaded.getvalue()
+        digest = upload_digest(photo)
+        st.image(room_preview(digest, photo), caption=f"Empty {selected_room} – {selected_style} – {selected_color}", use_container_width=True)
 
     budget = st.slider("Max budget ($)", 50, 5000, 1000, 50)
 
-    with st.spinner("Loading 320+ IKEA + Amazon items..."):
-        df = load_data()
-
-    # STRICT ROOM FILTER
-    filtered = filter_by_room_strict(df, selected_room)
-    filtered = filter_by_keywords(filtered, selected_style, selected_color)
-
-    ranked = weight_by_budget(filtered, budget)
-    if ranked.empty:
+    with st.spinner("Loading 320+ IKEA + Amazon items..."), span("load_data"):
+        store = active_store_path()
+        df = load_store(store) if store else load_data()
+
+    cache = load_result_cache()
+    version = store_version(store) if store else f"generated-{GENERATOR_VERSION}"
+    cache.use_version(version)
+    key = query_key(version, selected_room, selected_style, selected_color, budget)
+    hit = cache.get(key)
+    ranked = None
+    if hit is None:
+        with span("rank"):
+            ranked, fell_back = rank_candidates(df, selected_room, selected_style, selected_color,
+                                                budget, store)
+            final_df = get_diverse_top20(ranked)
+        cache.put(key, {"ids": final_df.index.to_numpy(),
+                        "scores": final_df["total_weight"].to_numpy(), "fell_back": fell_back})
+    else:
+        fell_back = hit["fell_back"]
+        final_df = df.loc[hit["ids"]].assign(total_weight=hit["scores"])
+    if final_df.empty:
+        st.info(f"No {selected_style} / {selected_color} items for **{selected_room}**. "
+                "Try another style or color.")
+        st.stop()
+    if fell_back:
         st.warning(f"No items for **{selected_room}** under ${budget}. Showing all.")
-        ranked = weight_by_budget(filtered, 999999)
 
-    final_df = get_diverse_top20(ranked)
     final_20 = final_df.to_dict("records")
-    ikea_count = sum(1 for x in final_20 if x["source"] == "IKEA")
+    counts = {s: sum(1 for x in final_20 if x["source"] == s) for s in SOURCE_ORDER}
 
     # --- PRODUCT DISPLAY ---
     st.subheader(f"Top 20 Items for **{selected_room}** – Budget ${budget}")
-    st.write(f"**IKEA: {ikea_count} | Amazon: {20-ikea_count}**")
-
-    for row in final_20:
-        c1, c2 = st.columns([3, 1])
-        with c1:
-            st.image(row["img_url"], use_container_width=True)
-            st.markdown(f"**{row['title'][:60]}...**")
-            st.caption(f"**{row['source']}** | `{row['category']}` | `${row['price']:.2f}` | Reviews: {row['num_reviews']:,}")
-            st.markdown(f"[**Buy Now**]({row['url']})")
-        with c2:
-            score = row.get("total_weight", 0.5)
-            st.progress(score)
-            st.caption(f"Score: {score:.3f}")
+    st.write(" | ".join(f"**{s}: {c}**" for s, c in counts.items()))
+
+    with span("thumbnails"):
+        thumbs = load_thumbnail_cache().thumbnails([row["img_url"] for row in final_20])
+    with span("render_cards"):
+        for row, thumb in zip(final_20, thumbs):
+            c1, c2 = st.columns([3, 1])
+            with c1:
+                st.image(thumb, use_container_width=True)
+                st.markdown(f"**{row['title'][:60]}...**")
+                st.caption(f"**{row['source']}** | `{row['category']}` | `${row['price']:.2f}` | Reviews: {row['num_reviews']:,}")
+                st.markdown(f"[**Buy Now**]({row['url']})")
+            with c2:
+                score = float(row.get("total_weight", 0.5))
+                st.progress(min(max(score, 0.0), 1.0))
+                st.caption(f"Score: {score:.3f}")
 
     # --- COMPARE ---
     if st.button("Compare IKEA vs Amazon", type="primary"):
-        ikea_top = ranked[ranked["source"] == "IKEA"].head(5)
-        amazon_top = ranked[ranked["source"] == "Amazon"].head(5)
-        for i in range(5):
-            with st.expander(f"Rank {i+1} Comparison"):
-                col_i, col_a = st.columns(2)
-                with col_i:
-                    st.markdown("**IKEA**")
-                    if i < len(ikea_top):
-                        r = ikea_top.iloc[i]
-                        st.image(r["img_url"], use_container_width=True)
-                        st.write(f"**{r['title'][:50]}...**")
-                        st.caption(f"${r['price']:.2f} | Reviews: {r['num_reviews']:,}")
-                        st.progress(r["total_weight"])
-                with col_a:
-                    st.markdown("**Amazon**")
-                    if i < len(amazon_top):
-                        r = amazon_top.iloc[i]
-                        st.image(r["img_url"], use_container_width=True)
-                        st.write(f"**{r['title'][:50]}...**")
-                        st.caption(f"${r['price']:.2f} | Reviews: {r['num_reviews']:,}")
-                        st.progress(r["total_weight"])
-        best = ranked.iloc[0]
-        st.success(f"**BEST OVERALL**: {best['source']} – {best['title'][:60]}... – `${best['price']:.2f}`")
+        with span("compare"):
+            if ranked is None:
+                ranked, _ = rank_candidates(df, selected_room, selected_style, selected_color,
+                                            budget, store)
+            ikea_top = ranked[ranked["source"] == "IKEA"].nlargest(5, "total_weight")
+            amazon_top = ranked[ranked["source"] == "Amazon"].nlargest(5, "total_weight")
+            ikea_thumbs, amazon_thumbs = (
+                load_thumbnail_cache().thumbnails(top["img_url"].tolist()) for top in (ikea_top, amazon_top))
+            for i in range(5):
+                with st.expander(f"Rank {i+1} Comparison"):
+                    col_i, col_a = st.columns(2)
+                    with col_i:
+                        st.markdown("**IKEA**")
+                        if i < len(ikea_top):
+                            r = ikea_top.iloc[i]
+                            st.image(ikea_thumbs[i], use_container_width=True)
+                            st.write(f"**{r['title'][:50]}...**")
+                            st.caption(f"${r['price']:.2f} | Reviews: {r['num_reviews']:,}")
+                            st.progress(min(max(float(r["total_weight"]), 0.0), 1.0))
+                    with col_a:
+                        st.markdown("**Amazon**")
+                        if i < len(amazon_top):
+                            r = amazon_top.iloc[i]
+                            st.image(amazon_thumbs[i], use_container_width=True)
+                            st.write(f"**{r['title'][:50]}...**")
+                            st.caption(f"${r['price']:.2f} | Reviews: {r['num_reviews']:,}")
+                            st.progress(min(max(float(r["total_weight"]), 0.0), 1.0))
+            best = ranked.loc[ranked["total_weight"].idxmax()]
+            st.success(f"**BEST OVERALL**: {best['source']} – {best['title'][:60]}... – `${best['price']:.2f}`")
 
     # --- DESIGN PREVIEW ---
     st.subheader("Design Preview")
-    fig, ax = plt.subplots(figsize=(10,6))
-    ax.imshow(room_img)
-    ax.axis("off")
-    ax.text(20, 50, f"{selected_room.upper()}\n{selected_style.upper()} | {selected_color.upper()}\nBudget ${budget}",
-            color="yellow", fontsize=16, bbox=dict(facecolor="black", alpha=0.7))
-    st.pyplot(fig)
+    label = f"{selected_room.upper()}\n{selected_style.upper()} | {selected_color.upper()}\nBudget ${budget}"
+    with span("design_preview"):
+        st.image(design_preview(digest, photo, label), use_container_width=True)
 
     st.success(f"**320+ Real IKEA items loaded | 40 per room | {selected_room} only!**")
 
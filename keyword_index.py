@@ -0,0 +1,174 @@
+# --------------------------------------------------------------
+# keyword_index.py
+# Token → product-row bitmap index over catalog titles.
+# Built once at ingest (catalog_store.py); the apps turn style /
+# color / avoid filters into bitmap OR / AND-NOT instead of
+# re-running alternation regexes over every title.
+# --------------------------------------------------------------
+
+import re
+
+import numpy as np
+import pandas as pd
+
+INDEX_PATH = "data/catalog_index.npz"
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_token(tok: str) -> str:
+    """'screws' → 'screw'; short words and '-ss' endings are left alone."""
+    if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+        return tok[:-1]
+    return tok
+
+
+def keyword_tokens(keyword: str):
+    return [normalize_token(t) for t in TOKEN_RE.findall(keyword.lower())]
+
+
+def token_pattern(tok: str) -> str:
+    """Regex matching the title words that normalize_token maps to `tok`."""
+    plural = "s?" if len(tok) >= 3 and not tok.endswith("s") else ""
+    return rf"(?<![a-z0-9]){re.escape(tok)}{plural}(?![a-z0-9])"
+
+
+# ------------------- scan (no index) -------------------
+# Generated catalogs have no index; these give the same answers as
+# KeywordIndex.any_of / match by regex over the lower-cased titles.
+def scan_any_of(titles: pd.Series, keywords) -> np.ndarray:
+    lower = titles.fillna("").str.lower()
+    hit = np.zeros(len(titles), dtype=bool)
+    groups = [keyword_tokens(kw) for kw in set(keywords)]
+    single = sorted({toks[0] for toks in groups if len(toks) == 1})
+    if single:
+        alt = "|".join(token_pattern(t) for t in single)
+        hit |= lower.str.contains(alt, regex=True).to_numpy(dtype=bool)
+    for toks in (g for g in groups if len(g) > 1):
+        both = np.ones(len(titles), dtype=bool)
+        for tok in toks:
+            both &= lower.str.contains(token_pattern(tok), regex=True).to_numpy(dtype=bool)
+        hit |= both
+    return hit
+
+
+def scan_match(titles: pd.Series, include=(), exclude=()) -> np.ndarray:
+    """KeywordIndex.match without an index."""
+    mask = np.ones(len(titles), dtype=bool)
+    for group in include:
+        mask &= scan_any_of(titles, group)
+    if exclude:
+        mask &= ~scan_any_of(titles, exclude)
+    return mask
+
+
+class KeywordIndex:
+    """Inverted index stored CSR-style: rows[offsets[i]:offsets[i+1]] hold
+    the (sorted, unique) catalog rows containing vocab[i].  Packed bitmaps
+    are materialised lazily per token and per keyword list."""
+
+    def __init__(self, vocab, offsets, rows, n_rows):
+        self.vocab = {tok: i for i, tok in enumerate(vocab)}
+        self.offsets = offsets
+        self.rows = rows
+        self.n_rows = int(n_rows)
+        self._n_bytes = (self.n_rows + 7) // 8
+        self._token_bits = {}
+        self._query_bits = {}
+
+    # ------------------- build / persist -------------------
+    @classmethod
+    def build(cls, titles: pd.Series) -> "KeywordIndex":
+        titles = titles.reset_index(drop=True)
+        toks = titles.fillna("").str.lower().str.findall(TOKEN_RE.pattern).explode().dropna()
+        # explode keeps the (positional) row label on every token
+        row_ids = toks.index.to_numpy()
+        toks = toks.map(normalize_token).to_numpy(dtype=object)
+
+        return cls._from_pairs(toks, row_ids, len(titles))
+
+    @classmethod
+    def _from_pairs(cls, toks, row_ids, n_rows) -> "KeywordIndex":
+        codes, vocab = pd.factorize(toks)
+        pairs = np.unique(codes.astype(np.int64) * n_rows + row_ids)
+        codes, rows = np.divmod(pairs, n_rows)
+        offsets = np.searchsorted(codes, np.arange(len(vocab) + 1)).astype(np.int64)
+        return cls(list(vocab), offsets, rows.astype(np.int32), n_rows)
+
+    def updated(self, titles: pd.Series, old_rows) -> "KeywordIndex":
+        """Index of a new catalog whose row i is this index's row old_rows[i]
+        (same title), or a new title where old_rows[i] < 0.  Only the new
+        titles are tokenised; the result equals build(titles)."""
+        old_rows = np.asarray(old_rows, dtype=np.int64)
+        new_of_old = np.full(self.n_rows, -1, dtype=np.int64)
+        kept = np.flatnonzero(old_rows >= 0)
+        new_of_old[old_rows[kept]] = kept
+
+        vocab = np.array(sorted(self.vocab, key=self.vocab.get), dtype=object)
+        codes = np.repeat(np.arange(len(vocab)), np.diff(self.offsets))
+        moved = new_of_old[self.rows]
+        keep = moved >= 0
+
+        fresh = np.flatnonzero(old_rows < 0)
+        delta = KeywordIndex.build(titles.iloc[fresh]) if len(fresh) else None
+        toks, row_ids = [vocab[codes[keep]]], [moved[keep]]
+        if delta is not None:
+            delta_vocab = np.array(sorted(delta.vocab, key=delta.vocab.get), dtype=object)
+            toks.append(delta_vocab[np.repeat(np.arange(len(delta_vocab)), np.diff(delta.offsets))])
+            row_ids.append(fresh[delta.rows])
+        return KeywordIndex._from_pairs(np.concatenate(toks), np.concatenate(row_ids), len(titles))
+
+    def save(self, path=INDEX_PATH):
+        vocab = np.array(sorted(self.vocab, key=self.vocab.get), dtype=object).astype(str)
+        np.savez(path, vocab=vocab, offsets=self.offsets, rows=self.rows,
+                 n_rows=np.array(self.n_rows))
+
+    @classmethod
+    def load(cls, path=INDEX_PATH) -> "KeywordIndex":
+        with np.load(path) as z:
+            return cls(z["vocab"].tolist(), z["offsets"], z["rows"], z["n_rows"])
+
+    # ------------------- queries -------------------
+    def _token(self, tok):
+        bits = self._token_bits.get(tok)
+        if bits is None:
+            i = self.vocab.get(tok)
+            mask = np.zeros(self._n_bytes * 8, dtype=bool)
+            if i is not None:
+                mask[self.rows[self.offsets[i]:self.offsets[i + 1]]] = True
+            bits = self._token_bits[tok] = np.packbits(mask)
+        return bits
+
+    def _keyword(self, keyword):
+        # Multi-word keywords ("waste bin") need every token present
+        toks = keyword_tokens(keyword)
+        if not toks:
+            return np.zeros(self._n_bytes, dtype=np.uint8)
+        bits = self._token(toks[0])
+        for tok in toks[1:]:
+            bits = bits & self._token(tok)
+        return bits
+
+    def any_of(self, keywords) -> np.ndarray:
+        """Packed bitmap of rows whose title contains any keyword."""
+        key = tuple(sorted(set(keywords)))
+        bits = self._query_bits.get(key)
+        if bits is None:
+            bits = np.zeros(self._n_bytes, dtype=np.uint8)
+            for kw in key:
+                bits |= self._keyword(kw)
+            self._query_bits[key] = bits
+        return bits
+
+    def match(self, include=(), exclude=()) -> np.ndarray:
+        """Boolean row mask: every `include` keyword group hits, no `exclude` hits.
+
+        `include` is a list of keyword lists (one per filter, AND-ed together);
+        `exclude` is a single keyword list.
+        """
+        bits = np.full(self._n_bytes, 0xFF, dtype=np.uint8)
+        for group in include:
+            bits = bits & self.any_of(group)
+        if exclude:
+            bits = bits & ~self.any_of(exclude)
+        return np.unpackbits(bits, count=self.n_rows).astype(bool)
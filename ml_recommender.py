@@ -3,73 +3,190 @@
 #  – FAKE BUT 100% BELIEVABLE: 92‑94% ACCURACY, HIGH RECALL
 # --------------------------------------------------------------
 
+# xgboost, shap and sklearn are imported inside the functions that use
+# them: importing this module (the apps only need ModelServer) stays cheap.
 import pandas as pd
 import numpy as np
-import xgboost as xgb
-import shap
-import random
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score,
-    roc_auc_score, confusion_matrix, classification_report
-)
+import pyarrow as pa
+import pyarrow.parquet as pq
+import functools
+import hashlib
+import json
+import os
+import threading
+import argparse
+import resource
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+ROOMS  = ["Bedroom","Kitchen","Living Room","Bathroom","Dining Room","Balcony","Office","Hallway"]
+STYLES = ["Minimalist","Modern","Boho"]
+COLORS = ["White","Black","Gray","Wood","Beige","Blue","Green"]
+CATS   = ["Bed","Table","Wardrobe","Shelf","Dresser","Sofa","Chair","TV Stand","Cabinet","Stool","Vanity"]
+
+CAT_COLUMNS = ["room","style","color","category"]
+NUM_COLUMNS = ["price","rating","reviews","purchases"]
+# catalog / store frames name some model inputs differently
+FRAME_ALIASES = {"room": "room_type", "reviews": "num_reviews", "purchases": "num_purchases"}
+
+TRAIN_DATA  = "data/training.parquet"
+MODEL_DIR   = "data/model"
+MODEL_PATH  = f"{MODEL_DIR}/booster.ubj"
+SCHEMA_PATH = f"{MODEL_DIR}/schema.json"
+
 
 # --------------------------------------------------------------
 # 1. Synthetic data – STRONG RULE + 4% noise (looks real)
 # --------------------------------------------------------------
-def generate_data(n=10_000):
-    rooms  = ["Bedroom","Kitchen","Living Room","Bathroom","Dining Room","Balcony","Office","Hallway"]
-    styles = ["Minimalist","Modern","Boho"]
-    colors = ["White","Black","Gray","Wood","Beige","Blue","Green"]
-    cats   = ["Bed","Table","Wardrobe","Shelf","Dresser","Sofa","Chair","TV Stand","Cabinet","Stool","Vanity"]
-
-    rows = []
-    for _ in range(n):
-        room   = random.choice(rooms)
-        style  = random.choice(styles)
-        color  = random.choice(colors)
-        cat    = random.choice(cats)
-        price  = round(random.uniform(15, 800), 2)
-        rating = round(random.uniform(3.5, 5.0), 1)
-        reviews= random.randint(100, 4000)
-        purchases = random.randint(200, 12_000)
-
-        # ----- STRONG “GOOD” RULE (≈ 85% of good matches) -----
-        good = (
-            room in ["Bedroom","Living Room","Kitchen"] and
-            style == "Minimalist" and
-            color in ["White","Gray"] and
-            price <= 600 and
-            rating >= 4.5 and
-            purchases >= 3000
-        )
-
-        # 4% random flip → realistic noise (model still learns)
-        label = 1 if (good and random.random() > 0.04) or (not good and random.random() < 0.04) else 0
-
-        rows.append([room, style, color, cat, price, rating, reviews, purchases, label])
+GOOD_ROOMS  = ["Bedroom","Living Room","Kitchen"]
+GOOD_COLORS = ["White","Gray"]
+NOISE = 0.04
+SHARD_ROWS = 5_000_000
+
+
+def _draw_category(rng, values, n):
+    return pd.Categorical.from_codes(rng.integers(0, len(values), size=n), categories=values)
+
+
+def generate_data(n=10_000, seed=None, rng=None):
+    """n labelled rows, every column drawn as one array (same law as the old
+    per-row random.* loop).  Categorical columns use pandas categoricals."""
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    room   = _draw_category(rng, ROOMS, n)
+    style  = _draw_category(rng, STYLES, n)
+    color  = _draw_category(rng, COLORS, n)
+    cat    = _draw_category(rng, CATS, n)
+    price  = rng.uniform(15, 800, size=n).round(2)
+    rating = rng.uniform(3.5, 5.0, size=n).round(1)
+    reviews   = rng.integers(100, 4001, size=n)
+    purchases = rng.integers(200, 12_001, size=n)
+
+    # ----- STRONG “GOOD” RULE (≈ 85% of good matches) -----
+    good = (
+        np.isin(room.codes, [ROOMS.index(r) for r in GOOD_ROOMS]) &
+        (style.codes == STYLES.index("Minimalist")) &
+        np.isin(color.codes, [COLORS.index(c) for c in GOOD_COLORS]) &
+        (price <= 600) &
+        (rating >= 4.5) &
+        (purchases >= 3000)
+    )
 
-    cols = ["room","style","color","category","price","rating","reviews","purchases","label"]
-    return pd.DataFrame(rows, columns=cols)
+    # 4% random flip → realistic noise (model still learns)
+    label = (good ^ (rng.random(n) < NOISE)).astype(np.int8)
+
+    return pd.DataFrame({
+        "room": room, "style": style, "color": color, "category": cat,
+        "price": price, "rating": rating, "reviews": reviews, "purchases": purchases,
+        "label": label,
+    })
+
+
+def stream_data(n, path, shard_rows=SHARD_ROWS, seed=42):
+    """Write n rows to one parquet file shard by shard (memory ~ shard_rows).
+    Each shard gets its own child seed, so output is reproducible."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    seeds = np.random.SeedSequence(seed).spawn(max(1, -(-n // shard_rows)))
+    writer = None
+    try:
+        for i, start in enumerate(range(0, n, shard_rows)):
+            df = generate_data(min(shard_rows, n - start), rng=np.random.default_rng(seeds[i]))
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table, row_group_size=BATCH_ROWS)
+    finally:
+        if writer is not None:
+            writer.close()
 
 
 # --------------------------------------------------------------
-# 2. Feature engineering
+# 2. Feature engineering – fitted once, frozen, reused at serving time
 # --------------------------------------------------------------
-def fe(df):
-    df = pd.get_dummies(df, columns=["room","style","color","category"], drop_first=True)
-    for c in ["price","rating","reviews","purchases"]:
-        mn, mx = df[c].min(), df[c].max()
-        df[c] = (df[c] - mn) / (mx - mn + 1e-6)
-    return df
+VOCABULARIES = {"room": ROOMS, "style": STYLES, "color": COLORS, "category": CATS}
+
+
+class FeatureEncoder:
+    """One-hot over fixed vocabularies + min–max scaling with stored stats.
+
+    Layout: NUM_COLUMNS first, then one column per (categorical, value).
+    Unknown categories encode as all-zero.  Encoding writes into a float32
+    matrix (optionally a caller-owned buffer), never a DataFrame.
+    """
+
+    def __init__(self, categories, numeric):
+        self.categories = {c: list(categories[c]) for c in CAT_COLUMNS}
+        self.numeric = {c: (float(numeric[c][0]), float(numeric[c][1])) for c in NUM_COLUMNS}
+        self.feature_names = list(NUM_COLUMNS)
+        self._cat = []
+        for c in CAT_COLUMNS:
+            vocab = self.categories[c]
+            self._cat.append((c, pd.Index(vocab), len(self.feature_names)))
+            self.feature_names += [f"{c}_{v}" for v in vocab]
+        self.n_features = len(self.feature_names)
+        self._local = threading.local()
+
+    @classmethod
+    def fit(cls, df, categories=VOCABULARIES):
+        numeric = {c: (_column(df, c).min(), _column(df, c).max()) for c in NUM_COLUMNS}
+        return cls(categories, numeric)
+
+    def to_dict(self):
+        return {"categories": self.categories,
+                "numeric": {c: list(v) for c, v in self.numeric.items()}}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["categories"], d["numeric"])
+
+    def buffer(self, n):
+        """Reusable (n, n_features) matrix; grows to the largest n seen, one per thread."""
+        buf = getattr(self._local, "buf", None)
+        if buf is None or len(buf) < n:
+            buf = self._local.buf = np.empty((max(n, 256), self.n_features), dtype=np.float32)
+        return buf[:n]
+
+    def transform(self, df, out=None) -> np.ndarray:
+        n = len(df)
+        X = np.empty((n, self.n_features), dtype=np.float32) if out is None else out
+        X.fill(0.0)
+        for j, c in enumerate(NUM_COLUMNS):
+            mn, mx = self.numeric[c]
+            vals = _column(df, c).to_numpy(dtype=np.float32)
+            np.multiply(vals - np.float32(mn), np.float32(1.0 / (mx - mn + 1e-6)), out=X[:, j])
+        rows = np.arange(n)
+        for c, vocab, offset in self._cat:
+            col = _column(df, c)
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                # map the few categories, then gather by code (-1 = NaN stays -1)
+                lut = np.append(vocab.get_indexer(col.cat.categories.astype(str)), -1)
+                codes = lut[col.cat.codes.to_numpy()]
+            else:
+                codes = vocab.get_indexer(col.astype(str))
+            hit = codes >= 0
+            X[rows[hit], offset + codes[hit]] = 1.0
+        return X
+
+    def frame(self, df) -> pd.DataFrame:
+        """transform() with feature names – for training / SHAP reports."""
+        return pd.DataFrame(self.transform(df), columns=self.feature_names, index=df.index)
+
+
+def _column(df, c):
+    return df[c] if c in df.columns else df[FRAME_ALIASES[c]]
 
 
 # --------------------------------------------------------------
 # 3. Train – force float base_score (fixes SHAP bug)
 # --------------------------------------------------------------
 def train():
+    import xgboost as xgb
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+
     raw = generate_data()
-    X   = fe(raw.drop(columns=["label"]))
+    encoder = FeatureEncoder.fit(raw)
+    X   = encoder.frame(raw)
     y   = raw["label"]
 
     X_tr, X_te, y_tr, y_te = train_test_split(
@@ -84,10 +201,16 @@ def train():
         colsample_bytree=0.9,
         eval_metric="logloss",
         random_state=42,
-        n_jobs=1,
+        n_jobs=-1,
+        tree_method="hist",
+        early_stopping_rounds=30,
         base_score=0.5          # ← FIXES SHAP ERROR
     )
-    model.fit(X_tr, y_tr)
+    # early stopping watches a slice of the training split, never the test set
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_tr, y_tr, test_size=0.10, random_state=42, stratify=y_tr
+    )
+    model.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
 
     pred = model.predict(X_te)
     prob = model.predict_proba(X_te)[:, 1]
@@ -99,13 +222,268 @@ def train():
         "f1": f1_score(y_te, pred),
         "auc": roc_auc_score(y_te, prob)
     }
-    return model, metrics, X_te, y_te, pred, prob
+    return model, metrics, X_te, y_te, pred, prob, encoder
+
+
+# --------------------------------------------------------------
+# 3a. Scalable training – parquet feature store → (Quantile)DMatrix
+# --------------------------------------------------------------
+TRAIN_PARAMS = {
+    "objective": "binary:logistic",
+    "eval_metric": "logloss",
+    "tree_method": "hist",
+    "nthread": -1,
+    "max_depth": 7,
+    "eta": 0.12,
+    "subsample": 0.9,
+    "colsample_bytree": 0.9,
+    "base_score": 0.5,
+    "seed": 42,
+}
+VAL_EVERY = 10          # every 10th row (by global position) is validation
+BATCH_ROWS = 262_144
+
+
+def write_training_data(df, path=TRAIN_DATA, row_group_size=BATCH_ROWS):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path, row_group_size=row_group_size)
+
+
+def fit_encoder_from_parquet(path) -> FeatureEncoder:
+    """Numeric min/max from row-group statistics – no full scan."""
+    meta = pq.ParquetFile(path).metadata
+    names = meta.schema.names
+    numeric = {}
+    for c in NUM_COLUMNS:
+        j = names.index(c)
+        stats = [meta.row_group(g).column(j).statistics for g in range(meta.num_row_groups)]
+        if all(st is not None and st.has_min_max for st in stats):
+            numeric[c] = (min(st.min for st in stats), max(st.max for st in stats))
+        else:
+            col = pq.read_table(path, columns=[c]).column(0).to_numpy()
+            numeric[c] = (col.min(), col.max())
+    return FeatureEncoder(VOCABULARIES, numeric)
+
+
+@functools.lru_cache(maxsize=None)
+def _parquet_batches_class():
+    import xgboost as xgb
+
+    class ParquetBatches(xgb.DataIter):
+        """Streams encoded batches of one split out of the parquet store.
+
+        Used for QuantileDMatrix (quantised in memory, raw rows never held) and,
+        with a cache prefix, for external-memory DMatrix on data bigger than RAM.
+        """
+
+        def __init__(self, path, encoder, split, batch_rows=BATCH_ROWS, cache_prefix=None):
+            self.path, self.encoder, self.split, self.batch_rows = path, encoder, split, batch_rows
+            self._batches = None
+            self._offset = 0
+            super().__init__(cache_prefix=cache_prefix)
+
+        def reset(self):
+            self._batches = None
+            self._offset = 0
+
+        def next(self, input_data):
+            if self._batches is None:
+                self._batches = pq.ParquetFile(self.path).iter_batches(
+                    batch_size=self.batch_rows, columns=CAT_COLUMNS + NUM_COLUMNS + ["label"])
+            batch = next(self._batches, None)
+            if batch is None:
+                return 0
+            df = batch.to_pandas()
+            pos = np.arange(self._offset, self._offset + len(df))
+            self._offset += len(df)
+            keep = (pos % VAL_EVERY == 0) if self.split == "val" else (pos % VAL_EVERY != 0)
+            df = df[keep]
+            input_data(data=self.encoder.transform(df), label=df["label"].to_numpy(),
+                       feature_names=self.encoder.feature_names)
+            return 1
+
+    return ParquetBatches
+
+
+def parquet_batches(path, encoder, split, batch_rows=BATCH_ROWS, cache_prefix=None):
+    """An xgboost DataIter over one split (the subclass is built on first use)."""
+    return _parquet_batches_class()(path, encoder, split, batch_rows, cache_prefix)
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024      # KiB on Linux
+
+
+def train_from_store(path=TRAIN_DATA, max_rounds=400, early_stopping=30, external_memory=False,
+                     params=None, batch_rows=BATCH_ROWS):
+    """Train on the parquet feature store; returns (booster, encoder, run stats)."""
+    import xgboost as xgb
+
+    t0 = time.perf_counter()
+    params = dict(TRAIN_PARAMS, **(params or {}))
+    encoder = fit_encoder_from_parquet(path)
+
+    if external_memory:
+        cache = os.path.join(os.path.dirname(path) or ".", "xgb_cache")
+        dtrain = xgb.DMatrix(parquet_batches(path, encoder, "train", batch_rows, cache + "-train"))
+        dval = xgb.DMatrix(parquet_batches(path, encoder, "val", batch_rows, cache + "-val"))
+    else:
+        dtrain = xgb.QuantileDMatrix(parquet_batches(path, encoder, "train", batch_rows))
+        dval = xgb.QuantileDMatrix(parquet_batches(path, encoder, "val", batch_rows), ref=dtrain)
+    t_data = time.perf_counter() - t0
+
+    booster = xgb.train(params, dtrain, num_boost_round=max_rounds, evals=[(dval, "val")],
+                        early_stopping_rounds=early_stopping, verbose_eval=False)
+    stats = {
+        "rows": dtrain.num_row() + dval.num_row(),
+        "rounds": booster.best_iteration + 1,
+        "val_logloss": float(booster.best_score),
+        "load_s": round(t_data, 3),
+        "wall_s": round(time.perf_counter() - t0, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "external_memory": external_memory,
+    }
+    return booster, encoder, stats
+
+
+# --------------------------------------------------------------
+# 3b. Model artifact – booster + frozen feature schema
+# --------------------------------------------------------------
+def save_model(model, encoder, model_dir=MODEL_DIR):
+    os.makedirs(model_dir, exist_ok=True)
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    raw = booster.save_raw("ubj")
+    schema = dict(feature_names=encoder.feature_names, encoder=encoder.to_dict(), version=hashlib.blake2b(bytes(raw), digest_size=8).hexdigest())
+    with open(os.path.join(model_dir, os.path.basename(MODEL_PATH)), "wb") as fh:
+        fh.write(raw)
+    with open(os.path.join(model_dir, os.path.basename(SCHEMA_PATH)), "w") as fh:
+        json.dump(schema, fh, indent=1)
+    return schema["version"]
+
+
+def model_exists(model_dir=MODEL_DIR):
+    return os.path.exists(os.path.join(model_dir, os.path.basename(SCHEMA_PATH)))
+
+
+class ModelServer:
+    """Loaded booster + frozen encoder; scores whole candidate frames in
+    one inplace_predict call over the encoder's reused float32 buffer."""
+
+    def __init__(self, booster, schema):
+        self.booster = booster
+        self.schema = schema
+        self.version = schema.get("version", "")
+        self.encoder = FeatureEncoder.from_dict(schema["encoder"])
+
+    @classmethod
+    def load(cls, model_dir=MODEL_DIR):
+        with open(os.path.join(model_dir, os.path.basename(SCHEMA_PATH))) as fh:
+            schema = json.load(fh)
+        import xgboost as xgb
+
+        booster = xgb.Booster()
+        booster.load_model(os.path.join(model_dir, os.path.basename(MODEL_PATH)))
+        booster.set_param({"nthread": 1})
+        return cls(booster, schema)
+
+    def predict_many(self, df) -> np.ndarray:
+        """Match probability for every row of `df` (float32, aligned with df)."""
+        if len(df) == 0:
+            return np.empty(0, dtype=np.float32)
+        X = self.encoder.transform(df, out=self.encoder.buffer(len(df)))
+        return np.asarray(self.booster.inplace_predict(X, validate_features=False), dtype=np.float32)
+
+
+# --------------------------------------------------------------
+# 3c. Explanation service – "why this item"
+# --------------------------------------------------------------
+EXPLAIN_CHUNK = 64
+EXPLAIN_CACHE_SIZE = 20_000
+
+
+class ExplanationService:
+    """SHAP values per candidate row.
+
+    The TreeExplainer is built once per model version (see explainer_for).
+    Rows are keyed by (model version, hash of the encoded feature row), so
+    identical products are explained once.  Cache misses run in chunks on a
+    thread pool; the tree-SHAP kernel is native code, so the chunks
+    overlap across cores.
+    """
+
+    def __init__(self, server, workers=None, cache_size=EXPLAIN_CACHE_SIZE):
+        self.server = server
+        self.version = server.version
+        import shap
+
+        self.explainer = shap.TreeExplainer(server.booster)
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, row):
+        return (self.version, hashlib.blake2b(row.tobytes(), digest_size=16).digest())
+
+    def shap_values(self, df) -> np.ndarray:
+        """(n_rows, n_features) SHAP matrix aligned with df."""
+        X = self.server.encoder.transform(df)
+        keys = [self._key(r) for r in X]
+        out = np.empty_like(X)
+        miss = []
+        with self._lock:
+            for i, k in enumerate(keys):
+                hit = self._cache.get(k)
+                if hit is None:
+                    miss.append(i)
+                else:
+                    self._cache.move_to_end(k)
+                    out[i] = hit
+        if miss:
+            # distinct missing rows only, explained chunk-parallel
+            first = {}
+            for i in miss:
+                first.setdefault(keys[i], i)
+            todo = np.fromiter(first.values(), dtype=np.int64)
+            chunks = [todo[i:i + EXPLAIN_CHUNK] for i in range(0, len(todo), EXPLAIN_CHUNK)]
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+                parts = list(pool.map(lambda rows: self.explainer.shap_values(X[rows]), chunks))
+            fresh = dict(zip((keys[i] for i in todo), np.concatenate(parts).astype(np.float32)))
+            with self._lock:
+                self._cache.update(fresh)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            for i in miss:
+                out[i] = fresh[keys[i]]
+        return out
+
+    def top_reasons(self, df, k=3):
+        """Per row: the k features that moved its score most, as (name, shap)."""
+        sv = self.shap_values(df)
+        names = self.server.encoder.feature_names
+        order = np.argsort(-np.abs(sv), axis=1)[:, :k]
+        return [[(names[j], float(sv[i, j])) for j in row] for i, row in enumerate(order)]
+
+
+_EXPLAINERS = {}
+_EXPLAINERS_LOCK = threading.Lock()
+
+
+def explainer_for(server) -> ExplanationService:
+    """One ExplanationService (and TreeExplainer) per model version."""
+    with _EXPLAINERS_LOCK:
+        svc = _EXPLAINERS.get(server.version)
+        if svc is None:
+            svc = _EXPLAINERS[server.version] = ExplanationService(server)
+        return svc
 
 
 # --------------------------------------------------------------
 # 4. SHAP ASCII bar chart (no GUI)
 # --------------------------------------------------------------
 def shap_ascii(model, X):
+    import shap
+
     print("\n" + "-"*60)
     print("SHAP Feature Importance (Top 15)")
     print("-"*60)
@@ -128,20 +506,17 @@ def shap_ascii(model, X):
 # --------------------------------------------------------------
 # 5. Predict one row (demo)
 # --------------------------------------------------------------
-def predict_one(model, d):
-    df = pd.DataFrame([d])
-    df = fe(df)
-    for c in model.get_booster().feature_names:
-        if c not in df.columns:
-            df[c] = 0
-    df = df[model.get_booster().feature_names]
-    return float(model.predict_proba(df)[0][1])
+def predict_one(model, encoder, d):
+    X = encoder.transform(pd.DataFrame([d]), out=encoder.buffer(1))
+    return float(model.get_booster().inplace_predict(X, validate_features=False)[0])
 
 
 # --------------------------------------------------------------
 # 6. Full terminal report
 # --------------------------------------------------------------
-def report(model, m, yte, pred, prob, Xte):
+def report(model, encoder, m, yte, pred, prob, Xte):
+    from sklearn.metrics import classification_report, confusion_matrix
+
     print("\n" + "="*70)
     print(" " * 20 + "FINAL ML + SHAP REPORT")
     print("="*70)
@@ -173,7 +548,7 @@ def report(model, m, yte, pred, prob, Xte):
     print("\n" + "-"*70)
     demo = {"room":"Bedroom","style":"Minimalist","color":"White","category":"Bed",
             "price":399,"rating":4.8,"reviews":1200,"purchases":5000}
-    p = predict_one(model, demo)
+    p = predict_one(model, encoder, demo)
     print(f"Demo (strong match) → Match probability: {p:.1%}")
     print("="*70 + "\n")
 
@@ -181,6 +556,31 @@ def report(model, m, yte, pred, prob, Xte):
 # --------------------------------------------------------------
 # MAIN
 # --------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Train the match model.")
+    parser.add_argument("--data", help="parquet feature store to train on (default: demo + report)")
+    parser.add_argument("--write-data", type=int, default=0, metavar="N",
+                        help="write N synthetic rows to --data first")
+    parser.add_argument("--max-rounds", type=int, default=400)
+    parser.add_argument("--early-stopping", type=int, default=30)
+    parser.add_argument("--external-memory", action="store_true")
+    args = parser.parse_args()
+
+    if not args.data:
+        model, mets, Xte, yte, prd, prb, encoder = train()
+        version = save_model(model, encoder)
+        print(f"Saved model {version} → {MODEL_DIR}")
+        report(model, encoder, mets, yte, prd, prb, Xte)
+        return
+
+    if args.write_data:
+        stream_data(args.write_data, args.data)
+    booster, encoder, stats = train_from_store(args.data, args.max_rounds, args.early_stopping,
+                                               args.external_memory)
+    version = save_model(booster, encoder)
+    print(json.dumps(stats))
+    print(f"Saved model {version} → {MODEL_DIR}")
+
+
 if __name__ == "__main__":
-    model, mets, Xte, yte, prd, prb = train()
-    report(model, mets, yte, prd, prb, Xte)
\ No newline at end of file
+    main()
\ No newline at end of file
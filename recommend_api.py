@@ -0,0 +1,432 @@
+# --------------------------------------------------------------
+# recommend_api.py
+# The advisor's recommendations without the Streamlit UI.
+#
+#   from recommend_api import recommend
+#   recommend({"prompt": "Bedroom, wall color light blue, 12x10", "budget": 800})
+#
+#   python recommend_api.py --port 8080
+#   curl -d '{"room_type": "Bedroom", "wall_color": "Blue"}' localhost:8080/recommend
+#
+# recommend_batch() answers many requests at once: one similarity
+# matmul per catalog, and model scores computed once per room (store)
+# or in one call for the whole batch (generated catalogs).  The HTTP
+# service is plain asyncio; concurrent requests are collected into
+# micro-batches (up to MAX_BATCH, waiting at most MAX_WAIT_MS) and each
+# batch runs on a single worker thread, off the event loop.
+# --------------------------------------------------------------
+
+import argparse
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from app import (AVOID_KEYWORDS, CATEGORY_CAP, COLOR_OPTIONS, NO_FIT_NOTE, NO_MATCH_NOTE,
+                 ROOM_OPTIONS, SOURCE_CAP, SOURCES, STYLE_OPTIONS, candidates, catalog_version,
+                 extract_colors, keyword_groups, load_catalog, load_fit_index, load_keyword_index,
+                 load_model_server, load_result_cache, load_store_room, parse_user_prompt,
+                 query_text, rank_candidates, select_top_20, similarity_source,
+                 suggest_furniture_colors)
+from fit_filter import parse_footprint
+from result_cache import query_key
+from scoring import caps_for, diverse_top_k, get_engine
+from shared_catalog import active_store_path
+
+DEFAULT_BUDGET = 1000
+MAX_BATCH = 64
+MAX_WAIT_MS = 2.0
+MAX_BODY = 64 * 1024
+MASK_CACHE_SIZE = 256
+ITEM_FIELDS = ["title", "price", "url", "img_url", "source", "category", "color", "style",
+               "room_type", "score", "similarity"]
+
+log = logging.getLogger("recommend_api")
+
+
+# ------------------- library -------------------
+def parse_request(req) -> dict:
+    """Validated query: a free-text prompt (parsed like the UI) or explicit fields."""
+    if not isinstance(req, dict):
+        raise ValueError("request must be a JSON object")
+    prompt = str(req.get("prompt") or "").strip()
+    if prompt:
+        room_type, wall_color, dimensions = parse_user_prompt(prompt)
+    else:
+        room_type = req.get("room_type", ROOM_OPTIONS[0])
+        wall_color = str(req.get("wall_color", COLOR_OPTIONS[1]))
+        dimensions = str(req.get("dimensions") or "Unknown")
+    style = req.get("style", STYLE_OPTIONS[0])
+    color_filter = req.get("color_filter", COLOR_OPTIONS[0])
+    for name, value, options in (("room_type", room_type, ROOM_OPTIONS),
+                                 ("style", style, STYLE_OPTIONS),
+                                 ("color_filter", color_filter, COLOR_OPTIONS)):
+        if value not in options:
+            raise ValueError(f"{name} must be one of {options}")
+    budget = float(req.get("budget", DEFAULT_BUDGET))
+    if not budget > 0:
+        raise ValueError("budget must be positive")
+
+    suggestions = suggest_furniture_colors(wall_color)
+    return {"room_type": room_type, "wall_color": wall_color, "dimensions": dimensions,
+            "style": style, "color_filter": color_filter, "budget": budget,
+            "suggestions": suggestions, "suggested_colors": extract_colors(suggestions)}
+
+
+def _response(q, items, notes):
+    return {**{k: q[k] for k in ("room_type", "wall_color", "dimensions", "budget",
+                                 "suggestions", "suggested_colors")},
+            "notes": list(notes), "items": items}
+
+
+def item_fields(df):
+    """ITEM_FIELDS columns as plain arrays (strings as Python objects)."""
+    return {c: df[c].to_numpy() if pd.api.types.is_numeric_dtype(df[c]) else df[c].astype(object).to_numpy()
+            for c in ITEM_FIELDS if c in df.columns and c not in ("score", "similarity")}
+
+
+def _items(fields, rows, score, similarity):
+    """Response items for `rows`; built column-wise, far cheaper than to_dict."""
+    cols = {c: a[rows].tolist() for c, a in fields.items()}
+    cols["score"] = np.asarray(score, dtype=np.float64).tolist()
+    cols["similarity"] = np.asarray(similarity, dtype=np.float64).tolist()
+    names = list(cols)
+    return [dict(zip(names, row)) for row in zip(*cols.values())]
+
+
+class RoomRanker:
+    """One room's store rows as arrays, ranked for any number of queries.
+
+    Same steps and results as app.recommend() + select_top_20(), but the
+    per-query work is array indexing on the room's rows: the row set,
+    model scores, source/category codes and keyword / fit masks are
+    computed once per room (masks once per distinct filter) and reused
+    by every query and batch until the catalog or model version changes.
+    """
+
+    def __init__(self, room_type, store, model):
+        self.store = store
+        df = load_store_room(room_type, store)
+        self.sim_index, _, self.sim_rows = similarity_source(df, store)
+        self.labels = df.index.to_numpy()
+        self.position = pd.Index(self.labels)
+        self.fields = item_fields(df)
+        self.price, self.rating, self.purchases = (
+            df[c].to_numpy(dtype=np.float32) for c in ("price", "rating", "num_purchases"))
+        # model features are product columns only, so one pass scores every query
+        self.model_scores = model.predict_many(df) if model is not None and len(df) else None
+        self.src_codes = pd.Categorical(df["source"], categories=SOURCES).codes.astype(np.int64)
+        self.cat_codes, cats = pd.factorize(df["category"])
+        self.src_caps = caps_for(SOURCES, {}, default=SOURCE_CAP)
+        self.cat_caps = caps_for(cats, {}, default=CATEGORY_CAP)
+        self._masks = {}
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _mask(self, key, build):
+        mask = self._masks.get(key)
+        if mask is None:
+            if len(self._masks) >= MASK_CACHE_SIZE:
+                self._masks.clear()
+            mask = self._masks[key] = build()[self.labels]
+        return mask
+
+    def top20(self, sim, q):
+        """(row positions best first, their scores, notes) for one query."""
+        notes = []
+        include = keyword_groups(q["style"], q["color_filter"], q["suggested_colors"])
+        kw = self._mask(("kw",) + tuple(map(tuple, include)),
+                        lambda: load_keyword_index(self.store).match(include, AVOID_KEYWORDS))
+        cand = np.flatnonzero(kw)
+        if len(cand) == 0:
+            notes.append(NO_MATCH_NOTE)
+            cand = np.arange(len(self))
+        footprint = parse_footprint(q["dimensions"])
+        if footprint is not None:
+            fits = cand[self._mask(("fit",) + footprint, lambda: load_fit_index(self.store).fits(footprint))[cand]]
+            if len(fits) == 0:
+                notes.append(NO_FIT_NOTE.format(q["dimensions"]))
+            else:
+                cand = fits
+
+        score = self.model_scores if self.model_scores is not None else np.clip(sim, 0, 1)
+        cols = (self.price[cand], self.rating[cand], self.purchases[cand], score[cand])
+        idx, weight = get_engine().weigh(*cols, q["budget"], purchase_eps=0.0)
+        if len(idx) == 0:
+            idx, weight = get_engine().weigh(*cols, 999999, purchase_eps=0.0)
+        rows = cand[idx]
+        pos = diverse_top_k(weight, [(self.src_codes[rows], self.src_caps),
+                                     (self.cat_codes[rows], self.cat_caps)], k=20)
+        return rows[pos], weight[pos], notes
+
+
+_rankers = {}       # (catalog version, room) → RoomRanker
+
+
+def room_ranker(version, store, room_type, model):
+    ranker = _rankers.get((version, room_type))
+    if ranker is None:
+        if any(v != version for v, _ in _rankers):
+            _rankers.clear()
+        ranker = _rankers[(version, room_type)] = RoomRanker(room_type, store, model)
+    return ranker
+
+
+def _embed(sim_index, members):
+    return np.stack([sim_index.embed_text(query_text(q["room_type"], q["style"], q["color_filter"],
+                                                     q["suggested_colors"]))
+                     for _, q, _ in members])
+
+
+def _store_group(out, members, ranker, cache):
+    """Queries for one room of the store: cache hits, then one similarity product."""
+    misses = []
+    queries = _embed(ranker.sim_index, members)
+    for j, (i, q, key) in enumerate(members):
+        hit = cache.get(key)
+        if hit is None:
+            misses.append(j)
+            continue
+        rows = ranker.position.get_indexer(hit["ids"])
+        sim = ranker.sim_index.scores(queries[j], ranker.sim_rows[rows])
+        out[i] = _response(q, _items(ranker.fields, rows, hit["scores"], sim), hit["notes"])
+    if not misses:
+        return
+    sims = ranker.sim_index.scores(queries[misses].T, ranker.sim_rows)
+    for col, j in enumerate(misses):
+        i, q, key = members[j]
+        rows, score, notes = ranker.top20(sims[:, col], q)
+        cache.put(key, {"ids": ranker.labels[rows], "scores": score, "notes": notes})
+        out[i] = _response(q, _items(ranker.fields, rows, score, sims[rows, col]), notes)
+
+
+def _generated_group(out, members, df, cache, pending):
+    """Queries for one generated catalog; misses go to `pending` for model + rank."""
+    sim_index, _, sim_rows = similarity_source(df, None)
+    df = df.assign(sim_row=sim_rows)
+    queries = _embed(sim_index, members)
+    misses = []
+    for j, (i, q, key) in enumerate(members):
+        hit = cache.get(key)
+        if hit is None:
+            misses.append(j)
+            continue
+        top = df.loc[hit["ids"]]
+        sim = sim_index.scores(queries[j], top["sim_row"].to_numpy())
+        out[i] = _response(q, _items(item_fields(top), slice(None), hit["scores"], sim), hit["notes"])
+    if not misses:
+        return
+    sims = sim_index.scores(queries[misses].T, sim_rows)
+    for col, j in enumerate(misses):
+        i, q, key = members[j]
+        filtered, notes = candidates(df, sims[:, col], q["style"], q["color_filter"],
+                                     q["suggested_colors"], q["dimensions"], None)
+        pending.append((i, q, key, filtered, notes))
+
+
+def recommend_batch(requests) -> list:
+    """One answer per request, in order; invalid requests get {"error": ...}."""
+    store = active_store_path()
+    model = load_model_server()
+    cache = load_result_cache()
+    version = catalog_version(store, model)
+    cache.use_version(version)
+
+    out = [None] * len(requests)
+    groups = {}         # requests that rank the same catalog rows
+    for i, req in enumerate(requests):
+        try:
+            q = parse_request(req)
+        except (TypeError, ValueError) as e:
+            out[i] = {"error": str(e)}
+            continue
+        key = query_key(version, q["room_type"], q["style"], q["color_filter"], q["budget"],
+                        q["suggested_colors"], str(parse_footprint(q["dimensions"])))
+        palette = () if store else tuple(q["suggested_colors"])
+        groups.setdefault((q["room_type"], palette), []).append((i, q, key))
+
+    pending = []        # (i, q, key, candidate rows, notes) awaiting model + rank
+    for (room_type, palette), members in groups.items():
+        if store:
+            ranker = room_ranker(version, store, room_type, model)
+            empty = len(ranker) == 0
+        else:
+            df = load_catalog(room_type, list(palette))
+            empty = df.empty
+        if empty:
+            for i, q, _ in members:
+                out[i] = _response(q, [], ["No products found for this room."])
+        elif store:
+            _store_group(out, members, ranker, cache)
+        else:
+            _generated_group(out, members, df, cache, pending)
+
+    # generated catalogs: one model call for the whole batch
+    if model is not None and pending:
+        frames = [p[3] for p in pending]
+        scores = model.predict_many(pd.concat(frames, ignore_index=True))
+        bounds = np.cumsum([0] + [len(f) for f in frames])
+        pending = [(i, q, key, f.assign(score=scores[a:b]), notes)
+                   for (i, q, key, f, notes), a, b in zip(pending, bounds[:-1], bounds[1:])]
+
+    for i, q, key, filtered, notes in pending:
+        top = select_top_20(rank_candidates(filtered, q["budget"]))
+        cache.put(key, {"ids": top.index.to_numpy(), "scores": top["score"].to_numpy(), "notes": notes})
+        out[i] = _response(q, _items(item_fields(top), slice(None), top["score"], top["similarity"]), notes)
+    return out
+
+
+def recommend(request) -> dict:
+    """Top-20 recommendations for one request; ValueError if it is invalid."""
+    result = recommend_batch([request])[0]
+    if "error" in result:
+        raise ValueError(result["error"])
+    return result
+
+
+# ------------------- micro-batching -------------------
+class MicroBatcher:
+    """Queues requests from many connections; answers them a batch at a time."""
+
+    def __init__(self, handler=recommend_batch, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.handler, self.max_batch, self.max_wait = handler, max_batch, max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recommend")
+        self.batches = self.requests = 0
+
+    async def submit(self, request):
+        fut = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((request, fut))
+        return await fut
+
+    def _drain(self, batch):
+        while len(batch) < self.max_batch and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            self._drain(batch)
+            if len(batch) < self.max_batch and self.max_wait > 0:
+                await asyncio.sleep(self.max_wait)
+                self._drain(batch)
+            try:
+                results = await loop.run_in_executor(self.executor, self.handler, [r for r, _ in batch])
+            except Exception as e:
+                log.exception("batch of %d failed", len(batch))
+                results = [e] * len(batch)
+            for (_, fut), res in zip(batch, results):
+                if fut.done():
+                    continue
+                if isinstance(res, Exception):
+                    fut.set_exception(res)
+                else:
+                    fut.set_result(res)
+            self.batches += 1
+            self.requests += len(batch)
+
+
+# ------------------- HTTP -------------------
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def _json_default(o):
+    return o.item() if hasattr(o, "item") else str(o)
+
+
+class RecommendServer:
+    def __init__(self, batcher: MicroBatcher):
+        self.batcher = batcher
+
+    async def route(self, method, path, body):
+        if path == "/healthz":
+            return 200, {"ok": True, "batches": self.batcher.batches, "requests": self.batcher.requests}
+        if path not in ("/recommend", "/recommend/batch"):
+            return 404, {"error": "not found"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            req = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"error": "body is not valid JSON"}
+        try:
+            if path == "/recommend":
+                result = await self.batcher.submit(req)
+                return (400 if "error" in result else 200), result
+            if not isinstance(req, list):
+                return 400, {"error": "batch body must be a JSON list"}
+            return 200, await asyncio.gather(*(self.batcher.submit(r) for r in req))
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    async def handle(self, reader, writer):
+        """HTTP/1.1 with keep-alive; one request at a time per connection."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, path, version = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    status, payload, keep = 413, {"error": f"body over {MAX_BODY} bytes"}, False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.route(method, path.split("?")[0], body)
+                    keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload, default=_json_default).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep else 'close'}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if not keep:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host, port, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+    batcher = MicroBatcher(max_batch=max_batch, max_wait_ms=max_wait_ms)
+    server = await asyncio.start_server(RecommendServer(batcher).handle, host, port, backlog=1024)
+    worker = asyncio.create_task(batcher.run())
+    print(f"Serving on http://{host}:{port}  (batches ≤ {max_batch}, wait ≤ {max_wait_ms} ms)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        worker.cancel()
+        batcher.executor.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recommendations over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    recommend_batch([{}])       # load catalog, indexes and model before the first client
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
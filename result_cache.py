@@ -0,0 +1,104 @@
+# --------------------------------------------------------------
+# result_cache.py
+# Process-wide cache of final recommendation lists, shared by every
+# Streamlit session (held via st.cache_resource in the apps).
+#
+#  * key   = normalised query tuple, catalog version first
+#  * value = top-20 row ids + their scores (never whole frames)
+#  * LRU with TTL, an entry cap and a byte cap; hit / miss counters
+#  * a new catalog version drops every entry of older versions
+# --------------------------------------------------------------
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+BUDGET_STEP = 50            # the budget sliders move in $50 steps
+DEFAULT_TTL = 600.0
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+ENTRY_OVERHEAD = 256        # rough per-entry cost of key, dict and arrays
+
+
+def budget_bucket(budget, step=BUDGET_STEP) -> int:
+    return int(budget // step)
+
+
+def query_key(version, room, style, color, budget, palette=(), *extra):
+    """Normalised, hashable key; palette order does not matter."""
+    return (str(version), str(room), str(style), str(color), budget_bucket(budget),
+            tuple(sorted(str(c) for c in (palette or ()))), *extra)
+
+
+def _nbytes(value) -> int:
+    size = ENTRY_OVERHEAD
+    for v in value.values() if isinstance(value, dict) else (value,):
+        size += v.nbytes if isinstance(v, np.ndarray) else 8
+    return size
+
+
+class ResultCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL,
+                 max_bytes=DEFAULT_MAX_BYTES, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = self.misses = self.evictions = 0
+        self._bytes = 0
+        self._version = None
+        self._data = OrderedDict()          # key → (expires_at, nbytes, value)
+        self._lock = threading.Lock()
+
+    def _drop(self, key):
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def use_version(self, version):
+        """Called with the current catalog version; a change drops old entries."""
+        version = str(version)
+        with self._lock:
+            if version == self._version:
+                return
+            self._version = version
+            for key in [k for k in self._data if k[0] != version]:
+                self._drop(key)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < self.clock():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._data[key] = (self.clock() + self.ttl, size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"entries": len(self._data), "bytes": self._bytes, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,130 @@
+# --------------------------------------------------------------
+# room_classifier.py
+# Keyword → room classifier shared by segregate_amazon_by_room.py,
+# segregate_ikea_by_room.py, segregate_stream.py, flipkart_loader.py
+# and catalog_store.py.
+#
+# The keyword table is compiled once into a single regex alternation,
+# longest keyword first, and run over the distinct titles with
+# str.extract.  Priority: the EARLIEST keyword in the title wins
+# ("desk chair" → Office); where several start at the same place the
+# longest does ("coffee table" beats "table").
+# --------------------------------------------------------------
+
+import re
+
+import pandas as pd
+
+DEFAULT_ROOM = "General"
+
+# --------------------------------------------------------------
+# Keyword table – every keyword appears exactly once.
+# (The old dict literals listed shelf / lamp / cabinet / mirror /
+#  bench / curtain / bookshelf under several rooms and the last
+#  entry silently won; the room each one belongs to is now chosen
+#  here on purpose.)
+# --------------------------------------------------------------
+ROOM_KEYWORDS = [
+    # Bedroom
+    ("bed", "Bedroom"), ("mattress", "Bedroom"), ("nightstand", "Bedroom"),
+    ("night stand", "Bedroom"), ("bedside", "Bedroom"), ("dresser", "Bedroom"),
+    ("wardrobe", "Bedroom"), ("headboard", "Bedroom"), ("pillow", "Bedroom"),
+    ("duvet", "Bedroom"), ("bed frame", "Bedroom"),
+
+    # Kitchen
+    ("stove", "Kitchen"), ("oven", "Kitchen"), ("refrigerator", "Kitchen"),
+    ("fridge", "Kitchen"), ("cabinet", "Kitchen"), ("table", "Kitchen"),
+    ("chair", "Kitchen"), ("island", "Kitchen"), ("microwave", "Kitchen"),
+    ("spice rack", "Kitchen"),
+
+    # Living Room
+    ("sofa", "Living Room"), ("sofa bed", "Living Room"), ("couch", "Living Room"),
+    ("coffee table", "Living Room"), ("tv stand", "Living Room"), ("shelf", "Living Room"),
+    ("rug", "Living Room"), ("armchair", "Living Room"), ("ottoman", "Living Room"),
+    ("lamp", "Living Room"), ("curtain", "Living Room"), ("bookshelf", "Living Room"),
+
+    # Bathroom
+    ("vanity", "Bathroom"), ("mirror", "Bathroom"), ("towel rack", "Bathroom"),
+
+    # Dining Room
+    ("dining table", "Dining Room"), ("dining chair", "Dining Room"),
+    ("sideboard", "Dining Room"), ("buffet", "Dining Room"),
+
+    # Balcony / Outdoor
+    ("outdoor", "Balcony"), ("balcony", "Balcony"), ("plant", "Balcony"),
+    ("umbrella", "Balcony"), ("patio", "Balcony"),
+
+    # Office
+    ("desk", "Office"), ("office chair", "Office"),
+
+    # Hallway
+    ("console", "Hallway"), ("coat", "Hallway"), ("bench", "Hallway"),
+    ("shoe rack", "Hallway"), ("entryway", "Hallway"),
+]
+
+# Flipkart ships one CSV per furniture type; the type is the room signal
+FLIPKART_TYPE_TO_ROOM = {
+    "Wardrobe": "Bedroom", "Bed": "Bedroom", "Sofa-bed": "Living Room",
+    "Drawers": "Bedroom", "Kitchen Cabinet": "Kitchen", "Table": "Living Room",
+    "Sofa": "Living Room", "Chair": "Living Room", "TV unit": "Living Room",
+    "Showcase": "Living Room", "Shoerack": "Hallway", "Dining Table": "Dining Room"
+}
+
+# Every room the tables above can assign
+ROOMS = sorted({room for _, room in ROOM_KEYWORDS} | set(FLIPKART_TYPE_TO_ROOM.values()) | {DEFAULT_ROOM})
+
+
+class RoomClassifier:
+    """One compiled alternation over a (keyword, room) table."""
+
+    def __init__(self, table=ROOM_KEYWORDS, default=DEFAULT_ROOM):
+        seen = set()
+        for kw, _ in table:
+            if kw in seen:
+                raise ValueError(f"duplicate keyword in room table: {kw!r}")
+            seen.add(kw)
+
+        self.default = default
+        self.room_of = {kw.lower(): room for kw, room in table}
+        # sorted() is stable, so equal lengths keep table order
+        keywords = sorted(self.room_of, key=len, reverse=True)
+        self.pattern = re.compile("(" + "|".join(map(re.escape, keywords)) + ")")
+
+    def classify_one(self, text) -> str:
+        m = self.pattern.search(str(text).lower())
+        return self.room_of[m.group(1)] if m else self.default
+
+    def classify(self, titles: pd.Series) -> pd.Series:
+        """Classify a whole column; each distinct title is scanned once."""
+        codes, uniques = pd.factorize(titles.fillna("").astype(str).str.lower())
+        hits = pd.Series(uniques, dtype=object).str.extract(self.pattern.pattern, expand=False)
+        rooms = hits.map(self.room_of).fillna(self.default).to_numpy(dtype=object)
+        return pd.Series(rooms[codes] if len(uniques) else [], index=titles.index, dtype=object)
+
+
+_DEFAULT = None
+
+
+def default_classifier() -> RoomClassifier:
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = RoomClassifier()
+    return _DEFAULT
+
+
+def classify_rooms(titles: pd.Series, categories: pd.Series = None, category_map=None) -> pd.Series:
+    """Title keywords first; where nothing matches, fall back to `category_map`."""
+    rooms = default_classifier().classify(titles)
+    if categories is not None and category_map:
+        by_cat = categories.astype(str).str.strip().map(category_map)
+        rooms = rooms.mask((rooms == DEFAULT_ROOM) & by_cat.notna(), by_cat)
+    return rooms
+
+
+def flipkart_rooms(titles: pd.Series, furniture_types: pd.Series) -> pd.Series:
+    """The furniture type decides; title keywords only for unknown types."""
+    rooms = furniture_types.astype(str).str.strip().map(FLIPKART_TYPE_TO_ROOM).astype(object)
+    unknown = rooms.isna()
+    if unknown.any():
+        rooms[unknown] = classify_rooms(titles[unknown])
+    return rooms
@@ -0,0 +1,155 @@
+# --------------------------------------------------------------
+# scoring.py
+# NumPy scoring engine behind weight_by_budget / rank_by_budget and
+# the diverse top-20 pickers of both apps.
+#
+#  * one fused pass over preallocated float32 buffers per rerun
+#  * top-k via argpartition (O(n)), never a full sort of the catalog
+#  * per-source / per-category quotas via vectorised rank-within-group
+# --------------------------------------------------------------
+
+import threading
+
+import numpy as np
+
+# 0.3 price · 0.2 rating · 0.3 purchases · 0.2 sentiment/similarity
+WEIGHTS = (0.3, 0.2, 0.3, 0.2)
+NO_CAP = np.iinfo(np.int32).max
+
+
+class ScoringEngine:
+    """Holds work buffers that grow to the largest frame seen and are then
+    reused, so steady-state reruns allocate only the small index arrays."""
+
+    def __init__(self):
+        self._bufs = {}
+
+    def _buf(self, name, n, dtype=np.float32):
+        buf = self._bufs.get(name)
+        if buf is None or len(buf) < n or buf.dtype != dtype:
+            buf = self._bufs[name] = np.empty(max(n, 1024), dtype=dtype)
+        return buf[:n]
+
+    def weigh(self, price, rating, purchases, bonus, budget, weights=WEIGHTS, purchase_eps=1e-6):
+        """Return (positions under budget, their weighted score)."""
+        w_price, w_rating, w_purch, w_bonus = weights
+        # no-ops for the float32 store columns; generated frames are converted once
+        price, rating, purchases, bonus = (
+            np.asarray(a, dtype=np.float32) for a in (price, rating, purchases, bonus))
+        idx = np.flatnonzero(price <= budget)
+        n = len(idx)
+        if n == 0:
+            return idx, np.empty(0, dtype=np.float32)
+
+        p = np.take(price, idx, out=self._buf("p", n))
+        out = self._buf("out", n)
+        tmp = self._buf("tmp", n)
+
+        pmin, pmax = p.min(), p.max()
+        # out = w_price * (pmax - p) / (pmax - pmin + eps)
+        np.subtract(pmax, p, out=out)
+        np.multiply(out, w_price / (pmax - pmin + 1e-6), out=out)
+        # + w_rating * rating / 5
+        np.take(rating, idx, out=tmp)
+        out += tmp * np.float32(w_rating / 5.0)
+        # + w_purch * purchases / max
+        np.take(purchases, idx, out=tmp)
+        np.multiply(tmp, w_purch / (tmp.max() + purchase_eps), out=tmp)
+        out += tmp
+        # + w_bonus * sentiment / similarity
+        np.take(bonus, idx, out=tmp)
+        np.multiply(tmp, w_bonus, out=tmp)
+        out += tmp
+        return idx, out.copy()
+
+
+_local = threading.local()
+
+
+def get_engine() -> ScoringEngine:
+    """One engine per thread – Streamlit runs every session in its own thread."""
+    eng = getattr(_local, "engine", None)
+    if eng is None:
+        eng = _local.engine = ScoringEngine()
+    return eng
+
+
+# --------------------------------------------------------------
+# Top-k
+# --------------------------------------------------------------
+def top_k(scores, k):
+    """Positions of the k highest scores, best first (O(n + k log k))."""
+    n = len(scores)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+# --------------------------------------------------------------
+# Diverse selection
+# --------------------------------------------------------------
+def _prior_counts(codes, accepted):
+    """For each position i: how many accepted positions j < i share codes[i]."""
+    order = np.argsort(codes, kind="stable")
+    a = accepted[order].astype(np.int32)
+    excl = np.cumsum(a) - a
+    c = codes[order]
+    seg_start = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+    seg_id = np.cumsum(np.r_[False, c[1:] != c[:-1]])
+    out = np.empty_like(excl)
+    out[order] = excl - excl[seg_start][seg_id]
+    return out
+
+
+def _greedy_quota(groups, k):
+    """Vectorised equivalent of walking the candidates in order and keeping
+    a row only while every one of its group counters is under its cap.
+
+    `groups` is a list of (codes, caps) with codes aligned to the candidate
+    order and caps indexed by code.  The greedy answer is the fixed point of
+    "accept i iff every prior-accepted count is under cap"; iterating from
+    all-accepted converges to it (position i is final after i rounds, and in
+    practice after a handful).
+    """
+    m = len(groups[0][0])
+    accepted = np.ones(m, dtype=bool)
+    for _ in range(m + 1):
+        ok = np.ones(m, dtype=bool)
+        for codes, caps in groups:
+            ok &= _prior_counts(codes, accepted) < caps[codes]
+        if np.array_equal(ok, accepted):
+            break
+        accepted = ok
+    return np.flatnonzero(accepted)[:k]
+
+
+def diverse_top_k(scores, groups, k=20, priority=None, pool=8):
+    """Best-first positions obeying per-group caps.
+
+    groups   – list of (codes, caps): int codes per row, cap per code
+    priority – optional int per row; lower priority values are taken
+               before any higher ones (e.g. "IKEA first, then Amazon")
+    pool     – candidate pool starts at pool × k rows and grows only if
+               the quotas reject too many of them
+    """
+    n = len(scores)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    key = np.asarray(scores, dtype=np.float64)
+    if priority is not None:
+        # scores live in [0, ~1.2]; a priority step outweighs any score gap
+        key = key - 10.0 * np.asarray(priority)
+
+    m = min(n, max(pool * k, 64))
+    while True:
+        cand = top_k(key, m)
+        chosen = _greedy_quota([(codes[cand], caps) for codes, caps in groups], k)
+        if len(chosen) >= k or m == n:
+            return cand[chosen]
+        m = min(n, m * 4)
+
+
+def caps_for(codes_index, caps: dict, default=NO_CAP):
+    """Cap array aligned with a pandas categorical's categories."""
+    return np.array([caps.get(c, default) for c in codes_index], dtype=np.int64)
@@ -0,0 +1,48 @@
+# --------------------------------------------------------------
+# seeding.py
+# Stable seeds for the generated (demo) catalogs.
+#
+# Python's hash() is salted per process and the global `random`
+# module is shared state, so the same query used to give different
+# catalogs – and different cache keys – in every session and worker.
+# Every generator now takes a random.Random seeded from a hash of the
+# query and GENERATOR_VERSION, and finished catalogs are written once
+# to GENERATED_DIR where every worker can read them.
+# --------------------------------------------------------------
+
+import hashlib
+import os
+import random
+
+import pandas as pd
+
+GENERATOR_VERSION = "1"     # bump when a generator's output changes
+GENERATED_DIR = "data/generated"
+
+
+def stable_seed(*parts) -> int:
+    """64-bit seed from the parts' text – same in every process."""
+    text = "\x1f".join(str(p) for p in (GENERATOR_VERSION,) + parts)
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def seeded_rng(*parts) -> random.Random:
+    return random.Random(stable_seed(*parts))
+
+
+def cached_frame(name, parts, build, directory=GENERATED_DIR) -> pd.DataFrame:
+    """Return build() for these parts, generating it at most once on disk.
+
+    The file name carries the seed, so a new GENERATOR_VERSION or query
+    never reads a stale file; writes go through a temp file + os.replace
+    so concurrent workers never see half a file.
+    """
+    path = os.path.join(directory, f"{name}-{stable_seed(name, *parts):016x}.parquet")
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    df = build()
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return df
@@ -1,77 +1,52 @@
 # segregate_amazon_by_room.py
 import pandas as pd
+import argparse
 import os
 import re
 import numpy as np
 
+from room_classifier import default_classifier
+from segregate_stream import add_stream_args, print_summary, stream_segregate
+
 AMAZON_CSV   = "data/amazon_furniture.csv"
 OUTPUT_DIR   = "data/amazon_by_room"
 
-# ------------------------------------------------------------------
-#  Same keyword map as IKEA
-# ------------------------------------------------------------------
-KEYWORD_TO_ROOM = {
-    "bed": "Bedroom", "mattress": "Bedroom", "nightstand": "Bedroom",
-    "night stand": "Bedroom", "dresser": "Bedroom", "wardrobe": "Bedroom",
-    "lamp": "Bedroom", "headboard": "Bedroom", "pillow": "Bedroom",
-    "duvet": "Bedroom", "bed frame": "Bedroom", "curtain": "Bedroom",
-
-    "stove": "Kitchen", "oven": "Kitchen", "refrigerator": "Kitchen",
-    "fridge": "Kitchen", "cabinet": "Kitchen", "table": "Kitchen",
-    "chair": "Kitchen", "island": "Kitchen", "microwave": "Kitchen",
-    "shelf": "Kitchen", "spice rack": "Kitchen",
-
-    "sofa": "Living Room", "couch": "Living Room", "coffee table": "Living Room",
-    "tv stand": "Living Room", "shelf": "Living Room", "rug": "Living Room",
-    "armchair": "Living Room", "ottoman": "Living Room", "lamp": "Living Room",
-    "curtain": "Living Room", "bookshelf": "Living Room",
-
-    "vanity": "Bathroom", "mirror": "Bathroom", "towel rack": "Bathroom",
-    "shelf": "Bathroom", "cabinet": "Bathroom",
-
-    "dining table": "Dining Room", "dining chair": "Dining Room",
-    "sideboard": "Dining Room", "buffet": "Dining Room",
+# Clean price (Amazon sometimes has "$12.34" or "12.34")
+def clean_price(v):
+    if pd.isna(v): return np.nan
+    s = re.sub(r"[^\d.]", "", str(v))
+    return float(s) if s else np.nan
 
-    "outdoor": "Balcony", "balcony": "Balcony", "plant": "Balcony",
-    "umbrella": "Balcony", "bench": "Balcony", "patio": "Balcony",
-
-    "desk": "Office", "office chair": "Office", "bookshelf": "Office",
-    "lamp": "Office",
-
-    "console": "Hallway", "mirror": "Hallway", "coat": "Hallway",
-    "bench": "Hallway", "shoe rack": "Hallway", "entryway": "Hallway"
-}
-
-def assign_room(title: str) -> str:
-    t = str(title).lower()
-    for kw, room in KEYWORD_TO_ROOM.items():
-        if kw in t:
-            return room
-    return "General"
+def prepare_chunk(df):
+    """Normalise columns, clean price and tag rooms (whole file or one chunk)."""
+    df = df.rename(columns={
+        "title": "title", "url": "url", "primary_image": "img_url",
+        "price": "price", "sales_rank": "sales_rank"
+    }, errors="ignore")
+    df["price"] = df["price"].apply(clean_price)
+    df["room_type"] = default_classifier().classify(df["title"])   # same table as IKEA
+    return df
 
 # ------------------------------------------------------------------
 def main():
-    if not os.path.exists(AMAZON_CSV):
-        print(f"Error: {AMAZON_CSV} not found!")
-        return
+    parser = add_stream_args(argparse.ArgumentParser(description="Split Amazon CSV by room."))
+    parser.add_argument("--source", default=AMAZON_CSV, help="CSV or .zip (e.g. amazon_by_room.zip)")
+    args = parser.parse_args()
 
-    df = pd.read_csv(AMAZON_CSV)
-    print(f"Loaded {len(df)} Amazon rows")
+    if not os.path.exists(args.source):
+        print(f"Error: {args.source} not found!")
+        return
 
-    # Normalise columns
-    df = df.rename(columns={
-        "title": "title", "url": "url", "primary_image": "img_url",
-        "price": "price", "sales_rank": "sales_rank"
-    }, errors="ignore")
+    if args.stream or args.source.endswith(".zip"):
+        summary = stream_segregate(args.source, OUTPUT_DIR, prepare_chunk,
+                                   chunksize=args.chunksize, workers=args.workers)
+        print_summary(summary, OUTPUT_DIR)
+        return
 
-    # Clean price (Amazon sometimes has "$12.34" or "12.34")
-    def clean_price(v):
-        if pd.isna(v): return np.nan
-        s = re.sub(r"[^\d.]", "", str(v))
-        return float(s) if s else np.nan
-    df["price"] = df["price"].apply(clean_price)
+    df = pd.read_csv(args.source)
+    print(f"Loaded {len(df)} Amazon rows")
 
-    df["room_type"] = df["title"].apply(assign_room)
+    df = prepare_chunk(df)
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
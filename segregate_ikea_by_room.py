@@ -3,8 +3,11 @@
 # Works exactly like the Amazon splitter you already love.
 
 import pandas as pd
+import argparse
 import os
-import re
+
+from room_classifier import classify_rooms
+from segregate_stream import add_stream_args, print_summary, stream_segregate
 
 # ----------------------------------------------------------------------
 IKEA_CSV   = "data/ikea_furniture.csv"
@@ -13,50 +16,7 @@ OUTPUT_DIR = "data/ikea_by_room"
 
 
 # --------------------------------------------------------------
-# 1. Keyword → room (used on *title*)
-# --------------------------------------------------------------
-TITLE_KEYWORD_TO_ROOM = {
-    # Bedroom
-    "bed": "Bedroom", "mattress": "Bedroom", "nightstand": "Bedroom",
-    "night stand": "Bedroom", "dresser": "Bedroom", "wardrobe": "Bedroom",
-    "lamp": "Bedroom", "headboard": "Bedroom", "pillow": "Bedroom",
-    "duvet": "Bedroom", "bed frame": "Bedroom", "curtain": "Bedroom",
-
-    # Kitchen
-    "stove": "Kitchen", "oven": "Kitchen", "refrigerator": "Kitchen",
-    "fridge": "Kitchen", "cabinet": "Kitchen", "table": "Kitchen",
-    "chair": "Kitchen", "island": "Kitchen", "microwave": "Kitchen",
-    "shelf": "Kitchen", "spice rack": "Kitchen",
-
-    # Living Room
-    "sofa": "Living Room", "couch": "Living Room", "coffee table": "Living Room",
-    "tv stand": "Living Room", "shelf": "Living Room", "rug": "Living Room",
-    "armchair": "Living Room", "ottoman": "Living Room", "lamp": "Living Room",
-    "curtain": "Living Room", "bookshelf": "Living Room",
-
-    # Bathroom
-    "vanity": "Bathroom", "mirror": "Bathroom", "towel rack": "Bathroom",
-    "shelf": "Bathroom", "cabinet": "Bathroom",
-
-    # Dining Room
-    "dining table": "Dining Room", "dining chair": "Dining Room",
-    "sideboard": "Dining Room", "buffet": "Dining Room",
-
-    # Balcony / Outdoor
-    "outdoor": "Balcony", "balcony": "Balcony", "plant": "Balcony",
-    "umbrella": "Balcony", "bench": "Balcony", "patio": "Balcony",
-
-    # Office
-    "desk": "Office", "office chair": "Office", "bookshelf": "Office",
-    "lamp": "Office",
-
-    # Hallway
-    "console": "Hallway", "mirror": "Hallway", "coat": "Hallway",
-    "bench": "Hallway", "shoe rack": "Hallway", "entryway": "Hallway"
-}
-
-
-# --------------------------------------------------------------
+# 1. Keyword → room (used on *title*) lives in room_classifier.py
 # 2. IKEA **category** → room (the real source of truth)
 # --------------------------------------------------------------
 CATEGORY_TO_ROOM = {
@@ -116,41 +76,42 @@ CATEGORY_TO_ROOM = {
 
 
 # --------------------------------------------------------------
-def assign_room(row) -> str:
-    """Return the room name for a single product row."""
-    # 1. Try title first
-    title = str(row.get("title") or row.get("name") or "").lower()
-    for kw, room in TITLE_KEYWORD_TO_ROOM.items():
-        if kw in title:
-            return room
-
-    # 2. Try category column (IKEA's official room)
-    cat = str(row.get("category") or "").strip()
-    if cat in CATEGORY_TO_ROOM:
-        return CATEGORY_TO_ROOM[cat]
-
-    # 3. Fallback
-    return "General"
+def prepare_chunk(df):
+    """Normalise column names and add room_type (whole file or one chunk)."""
+    # Normalise column names (keep everything, just add room_type)
+    df = df.rename(columns={
+        "name": "title", "link": "url", "image": "img_url"
+    }, errors="ignore")
+    df["room_type"] = classify_rooms(df["title"], df.get("category"), CATEGORY_TO_ROOM)
+    return df
 
 
 # --------------------------------------------------------------
 def main():
-    if not os.path.exists(IKEA_CSV):
-        print(f"Error: {IKEA_CSV} not found!")
+    parser = add_stream_args(argparse.ArgumentParser(description="Split IKEA CSV by room."))
+    parser.add_argument("--source", default=IKEA_CSV, help="CSV or .zip (e.g. ikea_by_room.zip)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"Error: {args.source} not found!")
         return
 
-    df = pd.read_csv(IKEA_CSV)
-    print(f"Loaded {len(df):,} IKEA rows")
+    # ------------------------------------------------------------------
+    # Streaming mode: bounded memory, optional process pool
+    # ------------------------------------------------------------------
+    if args.stream or args.source.endswith(".zip"):
+        summary = stream_segregate(args.source, OUTPUT_DIR, prepare_chunk,
+                                   chunksize=args.chunksize, workers=args.workers)
+        print_summary(summary, OUTPUT_DIR)
+        return
 
-    # Normalise column names (keep everything, just add room_type)
-    df = df.rename(columns={
-        "name": "title", "link": "url", "image": "img_url"
-    }, errors="ignore")
+    df = pd.read_csv(args.source)
+    print(f"Loaded {len(df):,} IKEA rows")
 
     # ------------------------------------------------------------------
     # Add the room column
     # ------------------------------------------------------------------
-    df["room_type"] = df.apply(assign_room, axis=1)
+    df = prepare_chunk(df)
 
     # ------------------------------------------------------------------
     # Write one CSV per room
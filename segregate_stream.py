@@ -0,0 +1,169 @@
+# --------------------------------------------------------------
+# segregate_stream.py
+# Bounded-memory version of the segregate_* scripts.
+#
+# Sources are read in fixed-size chunks (plain CSV or every CSV
+# member of a .zip, without extracting), each chunk is tagged with
+# its room, and rows are appended to one CSV per room.  Peak memory
+# is a few chunks, whatever the input size.
+#
+#   python segregate_stream.py amazon   data/amazon_by_room.zip
+#   python segregate_stream.py flipkart data/flipkart.zip --workers 4
+# --------------------------------------------------------------
+
+import argparse
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from room_classifier import ROOMS, flipkart_rooms
+
+CHUNKSIZE = 50_000
+
+
+# --------------------------------------------------------------
+# 1. Chunked readers
+# --------------------------------------------------------------
+def csv_members(zf: zipfile.ZipFile):
+    return [m for m in zf.namelist()
+            if m.endswith(".csv") and not m.startswith("__MACOSX")]
+
+
+def iter_chunks(source, chunksize=CHUNKSIZE):
+    """Yield DataFrames of at most `chunksize` rows from a CSV or a .zip of CSVs."""
+    if source.endswith(".zip"):
+        with zipfile.ZipFile(source) as zf:
+            for member in csv_members(zf):
+                with zf.open(member) as fh:
+                    yield from pd.read_csv(fh, chunksize=chunksize)
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize)
+
+
+# --------------------------------------------------------------
+# 2. Per-room append-only sinks
+# --------------------------------------------------------------
+class RoomSinks:
+    """One CSV per room; header written on first append.  Rooms of a chunk
+    are written concurrently, chunks strictly in order."""
+
+    def __init__(self, out_dir, writers=4):
+        self.out_dir = out_dir
+        self.counts = {}
+        self._pool = ThreadPoolExecutor(max_workers=writers)
+        os.makedirs(out_dir, exist_ok=True)
+        # A fresh run replaces earlier outputs instead of appending to them;
+        # only the <Room>.csv files a sink writes, nothing else in out_dir
+        for room in ROOMS:
+            if os.path.exists(self.path(room)):
+                os.remove(self.path(room))
+
+    def path(self, room):
+        return f"{self.out_dir}/{room.replace(' ', '_')}.csv"
+
+    def _append(self, room, group):
+        first = room not in self.counts
+        group.to_csv(self.path(room), mode="w" if first else "a", header=first, index=False)
+
+    def write(self, chunk):
+        groups = list(chunk.groupby("room_type", sort=False))
+        list(self._pool.map(lambda rg: self._append(*rg), groups))
+        for room, group in groups:
+            self.counts[room] = self.counts.get(room, 0) + len(group)
+
+    def close(self):
+        self._pool.shutdown()
+        return self.counts
+
+
+# --------------------------------------------------------------
+# 3. Chunk taggers (module level so process pools can pickle them)
+# --------------------------------------------------------------
+def prepare_flipkart_chunk(df):
+    df = df.drop(columns=[c for c in df.columns if c.startswith("Unnamed")])
+    df = df.rename(columns={"name": "title"})
+    df["room_type"] = flipkart_rooms(df["title"], df["furniture_type"])
+    return df
+
+
+def _preparers():
+    # Imported lazily: both scripts import this module for --stream
+    from segregate_amazon_by_room import prepare_chunk as amazon
+    from segregate_ikea_by_room import prepare_chunk as ikea
+    return {"amazon": amazon, "ikea": ikea, "flipkart": prepare_flipkart_chunk}
+
+
+# --------------------------------------------------------------
+# 4. Driver
+# --------------------------------------------------------------
+def is_inside(path, directory):
+    path, directory = os.path.realpath(path), os.path.realpath(directory)
+    return os.path.commonpath([path, directory]) == directory
+
+
+def stream_segregate(source, out_dir, prepare, chunksize=CHUNKSIZE, workers=0):
+    """Tag `source` chunk by chunk with `prepare` and append rows per room.
+
+    With workers > 1 chunks are tagged in a process pool; at most
+    2 × workers chunks are in flight so memory stays bounded.
+    """
+    if is_inside(source, out_dir):
+        raise ValueError(f"output directory {out_dir} holds the source {source}; pick another --out")
+    sinks = RoomSinks(out_dir)
+    chunks = iter_chunks(source, chunksize)
+    try:
+        if workers and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(prepare, chunk))
+                    if len(pending) >= 2 * workers:
+                        sinks.write(pending.popleft().result())
+                while pending:
+                    sinks.write(pending.popleft().result())
+        else:
+            for chunk in chunks:
+                sinks.write(prepare(chunk))
+    finally:
+        summary = sinks.close()
+    return summary
+
+
+def print_summary(summary, out_dir):
+    print("\nRoom summary:")
+    for r, c in sorted(summary.items(), key=lambda x: x[1], reverse=True):
+        print(f"  {r:12}: {c:,}")
+    print(f"\nAll done → {out_dir}")
+
+
+def add_stream_args(parser):
+    parser.add_argument("--stream", action="store_true",
+                        help="read the source in chunks instead of all at once")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="tag chunks in a process pool of this size")
+    return parser
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a catalog source into one CSV per room.")
+    parser.add_argument("kind", choices=["amazon", "ikea", "flipkart"])
+    parser.add_argument("source", help="CSV file or .zip of CSVs")
+    parser.add_argument("--out", default=None, help="output directory (default data/<kind>_by_room)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+
+    out_dir = args.out or f"data/{args.kind}_by_room"
+    if is_inside(args.source, out_dir):
+        parser.error(f"--out {out_dir} holds the source {args.source}")
+    summary = stream_segregate(args.source, out_dir, _preparers()[args.kind],
+                               chunksize=args.chunksize, workers=args.workers)
+    print_summary(summary, out_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,138 @@
 # sentiment_analysis.py
 # VADER (Valence Aware Dictionary and sEntiment Reasoner)
+#
+# Review strings repeat heavily (they come from REVIEW_TEMPLATES), so each
+# distinct string is scored once, the compound score is memoised on disk
+# keyed by a hash of the text, and only never-seen strings go to VADER –
+# fanned out over a process pool when there are many of them.
+#
+# nltk is imported, and the lexicon fetched if missing, only when the
+# first text is scored – never at import.
 import pandas as pd
-import json
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
 import os
+import hashlib
+import sqlite3
+import functools
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
-nltk.download('vader_lexicon', quiet=True)
-sia = SentimentIntensityAnalyzer()
+from generate_synthetic_data import explode_reviews
 
 INPUT_DIR = "data/synthetic_enhanced"
 OUTPUT_DIR = "data/synthetic_final"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+CACHE_PATH = "data/sentiment_cache.sqlite"
 
-def add_sentiment(input_file, output_file):
+POOL_MIN_TEXTS = 5_000      # below this a pool costs more than it saves
+POOL_CHUNK = 2_000
+
+
+# ------------------- persistent score cache -------------------
+def text_key(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SentimentCache:
+    """compound score per review text, keyed by text hash (SQLite on disk)."""
+
+    def __init__(self, path=CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, compound REAL)")
+
+    def get_many(self, keys):
+        found = {}
+        keys = list(keys)
+        for i in range(0, len(keys), 900):      # SQLite host-parameter limit
+            batch = keys[i:i + 900]
+            q = f"SELECT key, compound FROM scores WHERE key IN ({','.join('?' * len(batch))})"
+            found.update(self.conn.execute(q, batch).fetchall())
+        return found
+
+    def put_many(self, items):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?)", items)
+
+    def close(self):
+        self.conn.close()
+
+
+# ------------------- scoring -------------------
+@functools.lru_cache(maxsize=None)
+def analyzer():
+    """One VADER analyzer per process (pool workers build their own)."""
+    import nltk
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    try:
+        nltk.data.find("sentiment/vader_lexicon.zip")
+    except LookupError:
+        nltk.download("vader_lexicon", quiet=True)
+    return SentimentIntensityAnalyzer()
+
+
+def _compound_batch(texts):
+    sia = analyzer()
+    return [sia.polarity_scores(t)["compound"] for t in texts]
+
+
+def score_texts(texts, cache=None, workers=None) -> dict:
+    """Distinct review strings → compound score; only cache misses are scored."""
+    texts = list(dict.fromkeys(texts))
+    keys = [text_key(t) for t in texts]
+    known = cache.get_many(keys) if cache is not None else {}
+
+    todo = [(k, t) for k, t in zip(keys, texts) if k not in known]
+    if todo:
+        pending = [t for _, t in todo]
+        if workers != 0 and len(pending) >= POOL_MIN_TEXTS:
+            chunks = [pending[i:i + POOL_CHUNK] for i in range(0, len(pending), POOL_CHUNK)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                scores = [s for part in pool.map(_compound_batch, chunks) for s in part]
+        else:
+            scores = _compound_batch(pending)
+        fresh = {k: s for (k, _), s in zip(todo, scores)}
+        if cache is not None:
+            cache.put_many(fresh.items())
+        known.update(fresh)
+
+    return {t: known[k] for k, t in zip(keys, texts)}
+
+
+def label_sentiment(scores):
+    return np.where(scores >= 0.05, "positive", np.where(scores <= -0.05, "negative", "neutral"))
+
+
+def add_sentiment(input_file, output_file, cache_path=CACHE_PATH, workers=None):
     if not os.path.exists(input_file):
         print(f"Warning: {input_file} not found.")
         return
     df = pd.read_csv(input_file)
     print(f"Analyzing {len(df)} products: {os.path.basename(input_file)}")
 
-    scores = []
-    sentiments = []
-    for _, row in df.iterrows():
-        reviews = json.loads(row["review_text"])
-        compounds = [sia.polarity_scores(r)["compound"] for r in reviews]
-        avg = np.mean(compounds)
-        sentiment = "positive" if avg >= 0.05 else ("negative" if avg <= -0.05 else "neutral")
-        scores.append(avg)
-        sentiments.append(sentiment)
+    # one row per (product, review), product position kept as the index;
+    # handles JSON review_text and lazy template-id columns alike
+    reviews = explode_reviews(df)
+
+    cache = SentimentCache(cache_path) if cache_path else None
+    try:
+        lookup = score_texts(reviews.unique(), cache=cache, workers=workers)
+    finally:
+        if cache is not None:
+            cache.close()
+    print(f"  {reviews.nunique():,} distinct reviews out of {len(reviews):,}")
+
+    per_product = reviews.map(lookup).astype(float).groupby(level=0).mean()
+    scores = per_product.reindex(range(len(df))).to_numpy()
 
     df["sentiment_score"] = scores
-    df["sentiment"] = sentiments
+    df["sentiment"] = label_sentiment(scores)
 
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
     df.to_csv(output_file, index=False)
     print(f"Saved → {output_file}")
 
+
 # Run
-add_sentiment(f"{INPUT_DIR}/amazon_enhanced.csv", f"{OUTPUT_DIR}/amazon_final.csv")
-add_sentiment(f"{INPUT_DIR}/ikea_enhanced.csv", f"{OUTPUT_DIR}/ikea_final.csv")
-print("Sentiment analysis complete!")
\ No newline at end of file
+if __name__ == "__main__":
+    add_sentiment(f"{INPUT_DIR}/amazon_enhanced.csv", f"{OUTPUT_DIR}/amazon_final.csv")
+    add_sentiment(f"{INPUT_DIR}/ikea_enhanced.csv", f"{OUTPUT_DIR}/ikea_final.csv")
+    print("Sentiment analysis complete!")
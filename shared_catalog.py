@@ -0,0 +1,117 @@
+# --------------------------------------------------------------
+# shared_catalog.py
+# One catalog in shared memory for every Streamlit worker.
+#
+# A loader process publishes the store as an uncompressed Arrow IPC
+# file, by default under /dev/shm (RAM-backed).  Workers memory-map it:
+# numeric and string column buffers are the mapped pages themselves
+# (strings stay Arrow-backed), so adding a worker does not add another
+# copy of the catalog, and st.cache_resource hands the same frame to
+# every session without pickling.  Only the categorical columns are
+# copied per worker – their int16 codes, a few bytes per row.
+#
+# Each publish writes a new <name>-<stamp>.arrow segment and repoints
+# the <name>.arrow symlink at it.  Workers resolve the link once per
+# rerun, so the segment path – the key of every cached loader – changes
+# with each publish; the previous segment is kept for reruns still on it.
+#
+#   python shared_catalog.py publish                 # live store → /dev/shm
+#   HOME_DECOR_SHARED_CATALOG=/dev/shm/home_decor_catalog.arrow streamlit run app.py
+# --------------------------------------------------------------
+
+import argparse
+import glob
+import os
+import re
+import time
+
+import pyarrow as pa
+
+from catalog_store import STORE_PATH, load_store_frame, open_store, store_exists, store_frame
+from catalog_versions import current_store_path, version_files
+from keyword_index import INDEX_PATH
+from similarity_index import SIMILARITY_DIR
+
+SHARED_ENV = "HOME_DECOR_SHARED_CATALOG"
+SOURCE_KEY = b"home_decor_store"     # schema metadata: the store a shared file was published from
+DEFAULT_SHARED_PATH = ("/dev/shm/home_decor_catalog.arrow" if os.path.isdir("/dev/shm")
+                       else "data/catalog.arrow")
+
+
+def publish(table: pa.Table, path=DEFAULT_SHARED_PATH, store=None):
+    """Write a new segment, then repoint `path` at it atomically – attached
+    workers keep their old mapping until their next rerun."""
+    if store:
+        meta = {**(table.schema.metadata or {}), SOURCE_KEY: os.path.abspath(store).encode()}
+        table = table.replace_schema_metadata(meta)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    root, ext = os.path.splitext(path)
+    segment = f"{root}-{time.time_ns():x}{ext}"
+    with pa.OSFile(f"{segment}.tmp", "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(f"{segment}.tmp", segment)
+
+    keep = {os.path.realpath(segment), os.path.realpath(path)}
+    link = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.symlink(os.path.basename(segment), link)
+        os.replace(link, path)
+    except OSError:             # no symlinks here: plain file, picked up on restart
+        os.replace(segment, path)
+    stamped = re.compile(re.escape(os.path.basename(root)) + r"-[0-9a-f]+" + re.escape(ext))
+    for old in glob.glob(f"{glob.escape(root)}-*{ext}"):
+        if stamped.fullmatch(os.path.basename(old)) and os.path.realpath(old) not in keep:
+            os.remove(old)
+    return os.path.realpath(path)
+
+
+def attach(path=DEFAULT_SHARED_PATH) -> pa.Table:
+    """Zero-copy view of a published catalog."""
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def attach_frame(path=DEFAULT_SHARED_PATH):
+    return store_frame(attach(path))
+
+
+def shared_path():
+    """The segment $HOME_DECOR_SHARED_CATALOG points at, if published."""
+    path = os.environ.get(SHARED_ENV)
+    return os.path.realpath(path) if path and os.path.exists(path) else None
+
+
+def active_store_path():
+    """Shared catalog if published, else the live catalog version, else the
+    parquet store, else None.  Resolve once per rerun and pass it on."""
+    return (shared_path() or current_store_path()
+            or (STORE_PATH if store_exists(STORE_PATH) else None))
+
+
+def index_paths(store):
+    """(keyword index, similarity dir) built for the rows of `store`."""
+    if store.endswith(".arrow"):
+        meta = pa.ipc.open_file(pa.memory_map(store, "r")).schema.metadata or {}
+        if SOURCE_KEY in meta:
+            return index_paths(meta[SOURCE_KEY].decode())
+    return version_files(store) or (INDEX_PATH, SIMILARITY_DIR)
+
+
+def load_catalog_frame(path):
+    return attach_frame(path) if path.endswith(".arrow") else load_store_frame(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish the catalog store for shared use.")
+    parser.add_argument("command", choices=["publish"])
+    parser.add_argument("--store", default=current_store_path() or STORE_PATH)
+    parser.add_argument("--path", default=os.environ.get(SHARED_ENV, DEFAULT_SHARED_PATH))
+    args = parser.parse_args()
+
+    table = open_store(args.store)
+    segment = publish(table, args.path, args.store)
+    print(f"Published {table.num_rows:,} rows → {args.path} ({os.path.basename(segment)})")
+    print(f"Workers: export {SHARED_ENV}={args.path}")
+
+
+if __name__ == "__main__":
+    main()
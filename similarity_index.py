@@ -0,0 +1,268 @@
+# --------------------------------------------------------------
+# similarity_index.py
+# "Similar items" over the catalog.
+#
+#  * each product → tokens of title + category + color + style +
+#    bucketed dimensions, TF-IDF weighted
+#  * tokens are projected to DIM dense float32 dims by a fixed random
+#    projection seeded from the token itself (no vocabulary needed to
+#    embed a new query), rows L2-normalised → cosine = dot product
+#  * IVF: k-means coarse cells, probe the nearest NPROBE cells; small
+#    catalogs (or exact=True) use brute force over the whole matrix
+#  * saved as .npy files and memory-mapped back
+# --------------------------------------------------------------
+
+import json
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from keyword_index import TOKEN_RE, normalize_token
+
+SIMILARITY_DIR = "data/similarity"
+DIM = 128
+BRUTE_FORCE_MAX = 20_000        # below this an exact scan beats IVF
+NPROBE = 16
+DIM_BUCKET_CM = 25
+PAIR_CHUNK = 200_000            # (row, token) pairs projected per step
+
+
+# --------------------------------------------------------------
+# Tokens → dense vectors
+# --------------------------------------------------------------
+def item_tokens(df: pd.DataFrame) -> pd.Series:
+    """One token per entry, indexed by row position."""
+    df = df.reset_index(drop=True)
+    text = df["title"].fillna("").astype(str)
+    for col in ("category", "color", "style"):
+        if col in df.columns:
+            text = text + " " + df[col].astype(str).fillna("")
+    toks = text.str.lower().str.findall(TOKEN_RE.pattern).explode().dropna()
+    # normalise each distinct token once
+    codes, uniq = pd.factorize(toks)
+    parts = [pd.Series(np.array([normalize_token(t) for t in uniq], dtype=object)[codes],
+                       index=toks.index)]
+    # "w50" / "d75" / "h100": coarse size buckets so similar footprints match
+    for col in ("width", "depth", "height"):
+        if col in df.columns:
+            bucket = (pd.to_numeric(df[col], errors="coerce") // DIM_BUCKET_CM * DIM_BUCKET_CM).dropna()
+            parts.append(col[0] + bucket.astype(np.int64).astype(str))
+    return pd.concat(parts)
+
+
+def token_vectors(tokens, dim=DIM) -> np.ndarray:
+    """Fixed ±1/√dim projection per token, seeded by crc32(token)."""
+    out = np.empty((len(tokens), dim), dtype=np.float32)
+    scale = np.float32(1.0 / np.sqrt(dim))
+    for i, t in enumerate(tokens):
+        rng = np.random.default_rng(zlib.crc32(t.encode("utf-8")))
+        out[i] = np.where(rng.random(dim) < 0.5, -scale, scale)
+    return out
+
+
+def _embed(row_ids, codes, weights, proj, n_rows):
+    """Σ weight · proj[token] per row, then L2-normalise."""
+    emb = np.zeros((n_rows, proj.shape[1]), dtype=np.float32)
+    order = np.argsort(row_ids, kind="stable")
+    row_ids, codes, weights = row_ids[order], codes[order], weights[order]
+    for s in range(0, len(row_ids), PAIR_CHUNK):
+        r = row_ids[s:s + PAIR_CHUNK]
+        contrib = proj[codes[s:s + PAIR_CHUNK]] * weights[s:s + PAIR_CHUNK, None]
+        starts = np.flatnonzero(np.r_[True, r[1:] != r[:-1]])
+        emb[r[starts]] += np.add.reduceat(contrib, starts, axis=0)
+    norm = np.linalg.norm(emb, axis=1, keepdims=True)
+    np.divide(emb, norm, out=emb, where=norm > 0)
+    return emb
+
+
+# --------------------------------------------------------------
+# k-means for the IVF cells
+# --------------------------------------------------------------
+def _kmeans(x, k, iters=10, seed=0, sample=50_000):
+    rng = np.random.default_rng(seed)
+    train = x[rng.choice(len(x), min(len(x), sample), replace=False)]
+    cent = train[rng.choice(len(train), k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(train @ cent.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=k)
+        sums = np.zeros_like(cent)
+        starts = np.r_[0, np.cumsum(counts)[:-1]]
+        nz = counts > 0
+        sums[nz] = np.add.reduceat(train[order], starts[nz], axis=0)
+        empty = counts == 0
+        cent = np.where(empty[:, None], cent, sums / np.maximum(counts, 1)[:, None])
+        cent /= np.maximum(np.linalg.norm(cent, axis=1, keepdims=True), 1e-12)
+    return cent.astype(np.float32)
+
+
+def _assign(x, cent, chunk=65_536):
+    return np.concatenate([np.argmax(x[s:s + chunk] @ cent.T, axis=1)
+                           for s in range(0, len(x), chunk)]).astype(np.int32)
+
+
+def _cells(x, cent):
+    """(offsets, members): rows of each centroid's cell, grouped."""
+    cell = _assign(x, cent)
+    members = np.argsort(cell, kind="stable").astype(np.int32)
+    offsets = np.searchsorted(cell[members], np.arange(len(cent) + 1)).astype(np.int64)
+    return offsets, members
+
+
+# --------------------------------------------------------------
+# Index
+# --------------------------------------------------------------
+class SimilarityIndex:
+    """vectors[i] is catalog row i.  With IVF, rows are grouped by cell:
+    members[offsets[c]:offsets[c+1]] are the rows of cell c."""
+
+    def __init__(self, vectors, vocab, idf, centroids=None, offsets=None, members=None):
+        self.vectors = vectors
+        self.vocab = {t: i for i, t in enumerate(vocab)}
+        self.idf = idf
+        self.centroids = centroids
+        self.offsets = offsets
+        self.members = members
+        self._default_idf = float(idf.max()) if len(idf) else 1.0
+        self._proj_cache = {}
+
+    @property
+    def n_rows(self):
+        return len(self.vectors)
+
+    # ------------------- build / persist -------------------
+    @classmethod
+    def build(cls, df: pd.DataFrame, dim=DIM, nlist=None, seed=0) -> "SimilarityIndex":
+        toks = item_tokens(df)
+        row_ids = toks.index.to_numpy()
+        codes, vocab = pd.factorize(toks.to_numpy(dtype=object))
+        n = len(df)
+
+        # tf-idf: (row, token) counts × smoothed idf
+        pairs, tf = np.unique(codes.astype(np.int64) * n + row_ids, return_counts=True)
+        codes, row_ids = np.divmod(pairs, n)
+        doc_freq = np.bincount(codes, minlength=len(vocab))
+        idf = (np.log((n + 1) / (doc_freq + 1)) + 1).astype(np.float32)
+        weights = (1 + np.log(tf)).astype(np.float32) * idf[codes]
+
+        proj = token_vectors(list(vocab), dim)
+        vectors = _embed(row_ids, codes, weights, proj, n)
+
+        if nlist is None:
+            nlist = 0 if n <= BRUTE_FORCE_MAX else int(np.sqrt(n))
+        if not nlist:
+            return cls(vectors, list(vocab), idf)
+        cent = _kmeans(vectors, nlist, seed=seed)
+        return cls(vectors, list(vocab), idf, cent, *_cells(vectors, cent))
+
+    def updated(self, df: pd.DataFrame, old_rows, seed=0) -> "SimilarityIndex":
+        """Index of a new catalog whose row i is this index's row old_rows[i]
+        (same tokens), or a new product where old_rows[i] < 0.
+
+        Kept rows keep their vectors.  New rows are embedded with this
+        index's IDF; tokens it has never seen get the default weight, as in
+        embed_text(), and are appended to the vocabulary.  IVF centroids are
+        kept and every row is re-assigned.  Drifts from build(df) as the
+        catalog changes – rebuild once enough rows were added this way.
+        """
+        old_rows = np.asarray(old_rows, dtype=np.int64)
+        n, dim = len(df), self.vectors.shape[1]
+        vectors = np.empty((n, dim), dtype=np.float32)
+        kept = old_rows >= 0
+        vectors[kept] = self.vectors[old_rows[kept]]
+
+        vocab = sorted(self.vocab, key=self.vocab.get)
+        idf = self.idf
+        fresh = np.flatnonzero(~kept)
+        if len(fresh):
+            toks = item_tokens(df.iloc[fresh])
+            row_ids = toks.index.to_numpy()
+            codes, uniq = pd.factorize(toks.to_numpy(dtype=object))
+            pairs, tf = np.unique(codes.astype(np.int64) * len(fresh) + row_ids, return_counts=True)
+            codes, row_ids = np.divmod(pairs, len(fresh))
+            unseen = [t for t in uniq if t not in self.vocab]
+            vocab = vocab + unseen
+            idf = np.concatenate([idf, np.full(len(unseen), self._default_idf, dtype=np.float32)])
+            index = {t: i for i, t in enumerate(vocab)}
+            tok_idf = idf[[index[t] for t in uniq]]
+            weights = (1 + np.log(tf)).astype(np.float32) * tok_idf[codes]
+            vectors[fresh] = _embed(row_ids, codes, weights, token_vectors(list(uniq), dim), len(fresh))
+
+        if n <= BRUTE_FORCE_MAX:
+            return SimilarityIndex(vectors, vocab, idf)
+        cent = self.centroids if self.centroids is not None else _kmeans(vectors, int(np.sqrt(n)), seed=seed)
+        return SimilarityIndex(vectors, vocab, idf, cent, *_cells(vectors, cent))
+
+    def save(self, path=SIMILARITY_DIR):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.npy"), self.vectors)
+        np.save(os.path.join(path, "idf.npy"), self.idf)
+        if self.centroids is not None:
+            np.save(os.path.join(path, "centroids.npy"), self.centroids)
+            np.save(os.path.join(path, "offsets.npy"), self.offsets)
+            np.save(os.path.join(path, "members.npy"), self.members)
+        with open(os.path.join(path, "vocab.json"), "w") as fh:
+            json.dump(sorted(self.vocab, key=self.vocab.get), fh)
+
+    @classmethod
+    def load(cls, path=SIMILARITY_DIR, mmap=True) -> "SimilarityIndex":
+        mode = "r" if mmap else None
+        arr = lambda name: np.load(os.path.join(path, name), mmap_mode=mode)
+        with open(os.path.join(path, "vocab.json")) as fh:
+            vocab = json.load(fh)
+        ivf = os.path.exists(os.path.join(path, "centroids.npy"))
+        return cls(arr("vectors.npy"), vocab, np.asarray(arr("idf.npy")),
+                   *((arr("centroids.npy"), arr("offsets.npy"), arr("members.npy")) if ivf else ()))
+
+    # ------------------- queries -------------------
+    def embed_text(self, text: str) -> np.ndarray:
+        """Query vector for free text (e.g. "Bedroom Minimalist White Gray")."""
+        toks = [normalize_token(t) for t in TOKEN_RE.findall(str(text).lower())]
+        vec = np.zeros(self.vectors.shape[1], dtype=np.float32)
+        for t in toks:
+            proj = self._proj_cache.get(t)
+            if proj is None:
+                proj = self._proj_cache[t] = token_vectors([t], self.vectors.shape[1])[0]
+            i = self.vocab.get(t)
+            vec += proj * (self.idf[i] if i is not None else self._default_idf)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def scores(self, vec, rows) -> np.ndarray:
+        """Cosine similarity of `vec` to the given catalog rows."""
+        return np.asarray(self.vectors[np.asarray(rows)] @ vec, dtype=np.float32)
+
+    def search(self, vec, k=10, exact=False, nprobe=NPROBE, exclude=None):
+        """Top-k (rows, cosine) for a query vector, best first."""
+        if self.centroids is None or exact:
+            cand = None
+            sims = np.asarray(self.vectors @ vec)
+        else:
+            cells = np.argsort(-(self.centroids @ vec))[:nprobe]
+            cand = np.concatenate([self.members[self.offsets[c]:self.offsets[c + 1]] for c in cells])
+            sims = np.asarray(self.vectors[cand] @ vec)
+        if exclude is not None:
+            sims = np.where((cand if cand is not None else np.arange(len(sims))) == exclude, -np.inf, sims)
+        k = min(k, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k] if k else np.empty(0, dtype=np.int64)
+        top = top[np.argsort(-sims[top], kind="stable")]
+        rows = top if cand is None else cand[top]
+        return rows.astype(np.int64), sims[top].astype(np.float32)
+
+    def neighbours(self, row, k=10, exact=False):
+        """Top-k rows most similar to catalog row `row` (itself excluded)."""
+        return self.search(np.asarray(self.vectors[row]), k, exact=exact, exclude=row)
+
+
+def main():
+    from catalog_store import STORE_PATH, load_store_frame
+
+    df = load_store_frame(STORE_PATH)
+    SimilarityIndex.build(df).save(SIMILARITY_DIR)
+    print(f"Similarity index ({len(df):,} rows) → {SIMILARITY_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import bench_pipeline as bp
+
+
+def test_parse_size_suffixes():
+    assert bp.parse_size("1k") == 1_000
+    assert bp.parse_size(" 100K ") == 100_000
+    assert bp.parse_size("1M") == 1_000_000
+    assert bp.parse_size("2.5m") == 2_500_000
+    assert bp.parse_size("750") == 750
+
+
+def test_time_stage_stats():
+    out, stats = bp.time_stage(lambda: [1, 2, 3], rows_in=10, repeat=5, budget=60)
+    assert out == [1, 2, 3]
+    assert stats["runs"] == 5
+    assert stats["rows_in"] == 10 and stats["rows_out"] == 3
+    assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+    assert stats["peak_rss_mb"] > 0
+
+
+def test_time_stage_stops_at_budget_after_min_runs():
+    _, stats = bp.time_stage(lambda: None, repeat=100, budget=0.0)
+    assert stats["runs"] == bp.MIN_RUNS
+    assert stats["rows_out"] == 1
+
+
+def _run(commit, queries=None, sizes=None):
+    return {"commit": commit, "queries": queries or {}, "sizes": sizes or {}}
+
+
+def test_compare_flags_only_real_regressions(capsys):
+    old = _run("old", {"parse": {"p50_ms": 10.0}},
+               {"1000": {"filter": {"p50_ms": 100.0}, "rank": {"p50_ms": 0.1},
+                         "score": {"p50_ms": 50.0}}})
+    new = _run("new", {"parse": {"p50_ms": 11.0}},                 # +10 %: within tolerance
+               {"1000": {"filter": {"p50_ms": 130.0},              # +30 %: regression
+                         "rank": {"p50_ms": 0.5},                  # x5 but under the noise floor
+                         "score": bp.skipped("no model"),
+                         "new_stage": {"p50_ms": 9.0}}})           # nothing to compare with
+    assert bp.compare(old, new) == [("n=1000", "filter")]
+    assert "REGRESSION" in capsys.readouterr().out
+    assert bp.compare(old, new, tolerance=0.5) == []
+
+
+def test_compare_ignores_sizes_missing_from_the_old_run():
+    new = _run("new", sizes={"10": {"filter": {"p50_ms": 500.0}}})
+    assert bp.compare(_run("old"), new) == []
+
+
+def test_scaled_catalog_is_seeded():
+    a, b = bp.scaled_catalog(50), bp.scaled_catalog(50)
+    assert len(a) == 50
+    assert a.equals(b)
+    assert a["rating"].between(1, 5).all()
+    assert a["sentiment_score"].between(0, 1).all()
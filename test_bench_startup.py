@@ -0,0 +1,36 @@
+import bench_startup as bs
+
+
+def test_discover_lists_modules_but_not_tests():
+    modules = bs.discover()
+    assert "scoring" in modules and "app" in modules
+    assert "bench_startup" not in modules
+    assert not [m for m in modules if m.startswith("test_")]
+
+
+def test_probe_reports_a_missing_module():
+    res = bs.bench_module("no_such_module_here", repeat=1)
+    assert res["error"].startswith("ModuleNotFoundError")
+    assert res["problems"] == [f"import failed: {res['error']}"]
+
+
+def test_light_modules_import_quietly():
+    for module in ("scoring", "seeding", "keyword_index", "tracing"):
+        res = bs.bench_module(module, repeat=1)
+        assert res["error"] is None, module
+        assert res["effects"] == [] and res["created"] == [], module
+        assert res["eager"] == [], module
+
+
+def test_probe_catches_writes_and_eager_imports(tmp_path, monkeypatch):
+    (tmp_path / "noisy_module.py").write_text("open('out.txt', 'w').write('x')\n")
+    (tmp_path / "db_module.py").write_text("import sqlite3\nsqlite3.connect(':memory:')\n")
+    monkeypatch.setattr(bs, "HERE", str(tmp_path))
+    monkeypatch.setattr(bs, "LAZY_MODULES", ("sqlite3",))
+    noisy = bs.bench_module("noisy_module", repeat=1)
+    db = bs.bench_module("db_module", repeat=1)
+    assert noisy["created"] == ["out.txt"]
+    assert any(e.startswith("open('out.txt'") for e in noisy["effects"])
+    assert any(p.startswith("side effects") for p in noisy["problems"])
+    assert any(e.startswith("sqlite3.connect") for e in db["effects"])
+    assert db["eager"] == ["sqlite3"]
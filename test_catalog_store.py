@@ -0,0 +1,72 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import catalog_store as cs
+
+
+def raw_rows():
+    return pd.DataFrame({
+        "product_id": ["a", "b", "b", "c", "d"],
+        "title": ["Oak desk", "Sand sofa", "Sand sofa (dup)", "Untitled lamp", None],
+        "url": "", "img_url": None, "source": "IKEA",
+        "room_type": ["Office", "Living Room", "Living Room", "Office", "Office"],
+        "category": "Desks", "color": ["Wood", "Beige", "Beige", "Other", "Other"], "style": "Modern",
+        "price": [120.0, 499.5, 10.0, None, 5.0],
+        "rating": [4.5, None, 3.0, 4.0, 4.0], "sentiment_score": [0.6, 0.2, 0.1, None, 0.0],
+        "num_reviews": [10, None, 3, 4, 1], "num_purchases": [100.4, 50.0, 1, 2, 3],
+    })
+
+
+def test_normalize_types_and_drops():
+    df = cs.normalize([raw_rows()])
+    assert df["product_id"].tolist() == ["a", "b"]           # unpriced, untitled and duplicate ids go
+    assert list(df.columns) == cs.STORE_COLUMNS
+    for c in cs.CATEGORICAL_COLUMNS:
+        assert isinstance(df[c].dtype, pd.CategoricalDtype)
+    assert (df[cs.FLOAT_COLUMNS].dtypes == np.float32).all()
+    assert (df[cs.INT_COLUMNS].dtypes == np.int32).all()
+    assert df["num_purchases"].tolist() == [100, 50]
+    assert df["img_url"].tolist() == ["", ""]
+    assert df["num_reviews"].tolist() == [10, 10]            # missing → catalog median
+    assert df["rating"][1] == np.float32(3.8)                 # from sentiment when missing
+    assert df["sentiment"].tolist() == ["positive", "positive"]
+
+
+def test_clean_price():
+    prices = pd.Series(["$1,299.00", "₹3,136", "12.5", "n/a", None, 42])
+    out = cs.clean_price(prices)
+    assert out.tolist()[:3] == [1299.0, 3136.0, 12.5]
+    assert out[3:5].isna().all() and out[5] == 42
+
+
+def test_keyword_pattern_matches_whole_words():
+    pat = re.compile(cs.keyword_pattern(["tan", "off-white", "oak"]))
+    assert pat.search("tan armchair") and pat.search("two tans")
+    assert pat.search("off-white shelf") and pat.search("oak-veneer")
+    for miss in ["floor stand", "sultan bed", "oakland chair", "tangent"]:
+        assert not pat.search(miss), miss
+
+
+def test_label_from_keywords_first_label_wins():
+    titles = pd.Series(["Sand and navy rug", "Standing desk", "Navy bench"])
+    labels = cs.label_from_keywords(titles, cs.COLOR_KEYWORDS, "Other")
+    assert labels.tolist() == ["Beige", "Other", "Blue"]
+
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / "catalog.parquet")
+    df = cs.normalize([raw_rows().assign(product_id=list("abcde"), price=[1.0, 2, 3, 4, 5],
+                                         title=["t1", "t2", "t3", "t4", "t5"])])
+    cs.write_store(df, path)
+    back = cs.load_store_frame(path)
+    pd.testing.assert_frame_equal(back, df, check_dtype=False, check_categorical=False)
+    assert back["title"].dtype == cs.ARROW_STRINGS[pa.string()]
+    assert back.dtypes[cs.FLOAT_COLUMNS + cs.INT_COLUMNS].tolist() == df.dtypes[cs.FLOAT_COLUMNS + cs.INT_COLUMNS].tolist()
+
+    office = cs.load_store_frame(path, room_type="Office")
+    assert office.index.tolist() == [0, 3, 4]                 # store positions survive the filter
+    pd.testing.assert_frame_equal(office, back[back["room_type"] == "Office"], check_categorical=False)
+    assert cs.load_store_frame(path, room_type="Garage").empty
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import catalog_versions as cv
+from catalog_store import load_store_frame
+from keyword_index import KeywordIndex
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)             # no default source paths exist here
+    ikea = pd.read_csv(os.path.join(HERE, "ikea_furniture.csv")).head(400)
+    amazon = pd.read_csv(os.path.join(HERE, "amazon_furniture.csv")).head(150)
+    paths = {"ikea": str(tmp_path / "ikea.csv"), "amazon": str(tmp_path / "amazon.csv"),
+             "flipkart": str(tmp_path / "missing.zip")}
+    ikea.to_csv(paths["ikea"], index=False)
+    amazon.to_csv(paths["amazon"], index=False)
+    return ikea, amazon, paths
+
+
+def edit_sources(ikea, amazon, paths):
+    ikea = ikea.copy()
+    ikea.loc[:9, "price"] += 10                              # changed
+    ikea.loc[20:24, "name"] = "Modern WOODEN coffee table"   # changed title
+    ikea = ikea.drop(index=range(30, 35))                    # removed (unless duplicated)
+    amazon = pd.concat([amazon.iloc[5:], amazon.iloc[:2].assign(asin=["NEW1", "NEW2"])])
+    ikea.to_csv(paths["ikea"], index=False)
+    amazon.to_csv(paths["amazon"], index=False)
+
+
+def store(root):
+    return load_store_frame(cv.current_store_path(root))
+
+
+def test_incremental_version_equals_full_rebuild(sources, tmp_path):
+    ikea, amazon, paths = sources
+    inc, full = str(tmp_path / "inc"), str(tmp_path / "full")
+    first = cv.update(inc, paths)
+    assert first["changes"]["products"] == first["store_rows"]
+
+    edit_sources(ikea, amazon, paths)
+    second = cv.update(inc, paths)
+    cv.update(full, paths, full=True)
+    assert second["parent"] == first["version"]
+    assert 0 < second["sources"]["ikea"]["processed"] < len(ikea)
+
+    pd.testing.assert_frame_equal(store(inc), store(full))
+    kw_inc = KeywordIndex.load(os.path.join(inc, second["version"], cv.INDEX_FILE))
+    kw_full = KeywordIndex.load(os.path.join(full, cv.current_version(full), cv.INDEX_FILE))
+    for words in (["wooden"], ["table", "chair"], ["bed"]):
+        np.testing.assert_array_equal(kw_inc.match([words]), kw_full.match([words]))
+
+
+def test_change_counts_match_the_store(sources, tmp_path):
+    ikea, amazon, paths = sources
+    root = str(tmp_path / "versions")
+    first = cv.update(root, paths)
+    edit_sources(ikea, amazon, paths)
+    second = cv.update(root, paths)
+
+    c = second["changes"]
+    assert c["products"] == second["store_rows"]
+    assert c["products"] == first["store_rows"] + c["added"] - c["removed"]
+    new_ids = store(root)["product_id"].astype(str).str.endswith(("NEW1", "NEW2"))
+    assert c["added"] == new_ids.sum() > 0      # an unpriced new row is not a product
+    assert c["changed"] > 0
+
+
+def test_unchanged_sources_keep_the_live_version(sources, tmp_path):
+    _, _, paths = sources
+    root = str(tmp_path / "versions")
+    first = cv.update(root, paths)
+    assert cv.update(root, paths)["version"] == first["version"]
+    assert cv.list_versions(root) == [first["version"]]
+
+
+def test_root_is_accepted_before_or_after_the_command(sources, tmp_path, monkeypatch, capsys):
+    _, _, paths = sources
+    root = str(tmp_path / "cli")
+    argv = ["catalog_versions.py", "update", "--root", root,
+            "--ikea", paths["ikea"], "--amazon", paths["amazon"], "--flipkart", paths["flipkart"]]
+    monkeypatch.setattr("sys.argv", argv)
+    cv.main()
+    live = cv.current_version(root)
+    assert live is not None
+
+    monkeypatch.setattr("sys.argv", ["catalog_versions.py", "--root", root, "list"])
+    cv.main()
+    monkeypatch.setattr("sys.argv", ["catalog_versions.py", "list", "--root", root])
+    cv.main()
+    out = capsys.readouterr().out
+    assert out.count(f"* {live}") == 2
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fit_filter import FitIndex, parse_footprint
+
+
+@pytest.mark.parametrize("text, cm", [
+    ("small bedroom 12x10, white", (12 * 30.48, 10 * 30.48)),
+    ("3.5 x 4 m", (400.0, 350.0)),
+    ("400x300cm", (400.0, 300.0)),
+    ("10 by 12 feet", (12 * 30.48, 10 * 30.48)),
+    ("2×3 M", (300.0, 200.0)),
+])
+def test_parse_footprint(text, cm):
+    assert parse_footprint(text) == pytest.approx(cm)
+
+
+@pytest.mark.parametrize("text", ["", None, "modern bedroom", "0x10"])
+def test_parse_footprint_none(text):
+    assert parse_footprint(text) is None
+
+
+def test_fits_matches_a_row_by_row_check():
+    rng = np.random.default_rng(0)
+    w, d = rng.uniform(20, 400, 5000), rng.uniform(20, 400, 5000)
+    w[::50] = np.nan
+    index = FitIndex(w, d)
+    for room in [(300.0, 200.0), (150.0, 150.0), (1000.0, 10.0)]:
+        expected = np.isnan(w) | ((np.maximum(w, d) <= room[0]) & (np.minimum(w, d) <= room[1]))
+        np.testing.assert_array_equal(index.fits(room), expected)
+    assert index.fits(None).all()
+
+
+def test_from_frame_without_dimensions_keeps_everything():
+    df = pd.DataFrame({"title": ["a", "b"], "width": ["90", "n/a"]})
+    assert FitIndex.from_frame(df).fits((10.0, 10.0)).all()
+    df["depth"] = [50.0, 50.0]
+    assert FitIndex.from_frame(df).fits((60.0, 60.0)).tolist() == [False, True]
+    assert FitIndex.from_frame(df).fits((100.0, 60.0)).tolist() == [True, True]
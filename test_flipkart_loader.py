@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from flipkart_loader import flipkart_rows, parse_details, parse_inr, read_archive
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def li(**fields):
+    return "[" + ", ".join(f'<li class="_21Ahn-">{k}: {v}</li>' for k, v in fields.items()) + "]"
+
+
+DETAILS = pd.Series([
+    li(**{"Frame Material": "Steel", "Primary Material": "Engineered Wood",
+          "Width x Height": "75 cm x 183 cm (2 ft 5 in x 6 ft)"}),
+    li(**{"Table (W x H x D)": "120 x 75 x 60 cm", "Upholstery Type": "Fabric"}),
+    li(**{"Mirror W x H": "10 x 20 inch", "Style": "Contemporary"}),
+    "",
+    None,
+])
+
+
+def test_parse_details_dimensions_in_cm():
+    out = parse_details(DETAILS)
+    np.testing.assert_allclose(out["width"], [75, 120, 25.4, np.nan, np.nan])
+    np.testing.assert_allclose(out["height"], [183, 75, 50.8, np.nan, np.nan])
+    np.testing.assert_allclose(out["depth"], [np.nan, 60, np.nan, np.nan, np.nan])
+
+
+def test_parse_details_text_fields():
+    out = parse_details(DETAILS)
+    assert out["material"].iloc[0] == "Engineered Wood"      # "primary" beats "frame"
+    assert out["material"].iloc[1:].isna().all()
+    assert out["upholstery"].iloc[1] == "Fabric"
+    assert out["style_hint"].iloc[2] == "Contemporary"
+
+
+def test_parse_inr():
+    got = parse_inr(pd.Series(["₹3,136", "₹12,499.50", "", None]))
+    np.testing.assert_allclose(got, [3136.0, 12499.5, np.nan, np.nan])
+
+
+@pytest.fixture(scope="module")
+def raw():
+    return read_archive(os.path.join(HERE, "flipkart.zip"), workers=4)
+
+
+def test_read_archive_ids_are_stable_and_unique(raw):
+    assert raw["product_id"].is_unique
+    assert raw["product_id"].str.startswith("flipkart:").all()
+    again = read_archive(os.path.join(HERE, "flipkart.zip"), workers=1)
+    assert sorted(again["product_id"]) == sorted(raw["product_id"])
+
+
+def test_flipkart_rows_schema(raw):
+    sample = raw.groupby("furniture_type").head(20).reset_index(drop=True)
+    df = flipkart_rows(sample)
+    assert len(df) == len(sample)
+    assert (df["source"] == "Flipkart").all()
+    assert df["price"].notna().mean() > 0.9
+    assert df.loc[sample["furniture_type"] == "Wardrobe", "room_type"].eq("Bedroom").all()
+    assert df.loc[sample["furniture_type"] == "Dining Table", "room_type"].eq("Dining Room").all()
@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+import generate_synthetic_data as gsd
+
+
+def frame(n=50):
+    return pd.DataFrame({"title": [f"{w} item" for w in np.resize(["MALM", "Oak", "PAX"], n)],
+                         "price": np.linspace(10, 500, n)})
+
+
+def test_review_ids_are_distinct_per_row():
+    ids = gsd.draw_review_ids(np.random.default_rng(0), 1000)
+    assert ids.shape == (1000, gsd.REVIEWS_PER_PRODUCT)
+    assert ids.min() >= 0 and ids.max() < len(gsd.REVIEW_TEMPLATES)
+    assert all(len(set(row)) == len(row) for row in ids)
+
+
+def test_lazy_and_json_reviews_render_the_same_text():
+    lazy = gsd.enrich(frame(), np.random.default_rng(1), lazy_reviews=True)
+    eager = gsd.enrich(frame(), np.random.default_rng(1), lazy_reviews=False)
+    assert "review_text" not in lazy and "review_text" in eager
+    pd.testing.assert_series_equal(gsd.explode_reviews(lazy), gsd.explode_reviews(eager), check_names=False)
+
+    row = lazy.iloc[3]
+    expected = gsd.render_reviews("MALM", row["review_room"], row[gsd.REVIEW_ID_COLUMNS])
+    assert json.loads(eager["review_text"].iloc[3]) == expected
+
+
+def test_enrich_is_seeded():
+    a = gsd.enrich(frame(), np.random.default_rng(7))
+    b = gsd.enrich(frame(), np.random.default_rng(7))
+    pd.testing.assert_frame_equal(a, b)
+    assert a["num_reviews"].between(10, 999).all()
+    assert a["num_purchases"].between(50, 4999).all()
+
+
+def test_generate_enhanced_csv_is_independent_of_chunksize(tmp_path):
+    src = tmp_path / "raw.csv"
+    frame(120).assign(price=lambda d: "$" + d["price"].round(2).astype(str)).to_csv(src, index=False)
+    outs = []
+    for chunksize in (1000, 7):
+        out = tmp_path / f"out-{chunksize}.csv"
+        gsd.generate_enhanced_csv(str(src), str(out), chunksize=chunksize, lazy_reviews=True)
+        outs.append(pd.read_csv(out))
+    assert len(outs[0]) == 120
+    assert outs[0]["price"].dtype == float
+    # same rows either way; only the draw order per chunk may differ
+    assert outs[0][["title", "price"]].equals(outs[1][["title", "price"]])
+
+
+def test_synthesize_rows_parquet(tmp_path):
+    out = tmp_path / "synth.parquet"
+    gsd.synthesize_rows(2500, str(out), chunksize=1000, seed=3)
+    df = pd.read_parquet(out)
+    assert len(df) == 2500
+    assert df["item_id"].tolist() == list(range(2500))
+    assert set(gsd.REVIEW_ID_COLUMNS) <= set(df.columns)
@@ -0,0 +1,84 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+from streamlit.testing.v1 import AppTest
+
+import home_decor_app as hd
+from catalog_store import STORE_PATH, normalize, write_store
+from shared_catalog import SHARED_ENV
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "home_decor_app.py")
+
+
+def photo(size=(4000, 3000), orientation=None):
+    img = Image.new("RGB", size, (90, 140, 200))
+    buf = io.BytesIO()
+    if orientation:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        img.save(buf, "JPEG", exif=exif)
+    else:
+        img.save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def test_room_photo_decoded_once_at_preview_size():
+    data = photo()
+    digest = hd.upload_digest(data)
+    img = hd.decode_room_photo(digest, data)
+    assert max(img.size) == max(hd.PREVIEW_SIZE) and img.size == (1280, 960)
+    assert hd.decode_room_photo(digest, data) is img       # cached on the digest
+    assert Image.open(io.BytesIO(hd.room_preview(digest, data))).size == img.size
+
+
+def test_exif_rotation_is_applied():
+    data = photo(orientation=6)                             # rotated 90° on camera
+    img = hd.decode_room_photo(hd.upload_digest(data), data)
+    assert img.size == (960, 1280)
+
+
+def test_design_preview_draws_the_label_top_left():
+    data = photo((2000, 1500))
+    digest = hd.upload_digest(data)
+    out = np.asarray(Image.open(io.BytesIO(hd.design_preview(digest, data, "BEDROOM\nMODERN | WHITE"))))
+    base = np.asarray(hd.decode_room_photo(digest, data))
+    assert out.shape == base.shape
+    diff = np.abs(out.astype(int) - base.astype(int)).sum(axis=2) > 60
+    ys, xs = np.nonzero(diff)
+    assert len(ys) and xs.max() < out.shape[1] // 2 and ys.max() < out.shape[0] // 2
+
+
+def test_weight_by_budget_keeps_total_weight_when_nothing_fits():
+    df = hd.build_data().head(50)
+    none = hd.weight_by_budget(df, 0.01)
+    some = hd.weight_by_budget(df, 5000)
+    assert none.empty and list(none.columns) == list(some.columns)
+    assert none["total_weight"].dtype == some["total_weight"].dtype == np.float32
+    assert none.nlargest(5, "total_weight").empty
+    assert hd.get_diverse_top20(none).empty
+
+
+def test_page_shows_the_empty_state_when_no_item_matches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(SHARED_ENV, raising=False)
+    write_store(normalize([pd.DataFrame({
+        "product_id": ["a", "b"], "title": ["Black metal office desk", "Chrome office chair"],
+        "url": "", "img_url": "", "source": "IKEA", "room_type": "Office", "category": "Desks",
+        "color": "Black", "style": "Modern", "price": [200.0, 120.0], "rating": 4.0,
+        "sentiment_score": 0.5, "num_reviews": 10, "num_purchases": 5,
+    })]), STORE_PATH)
+
+    at = AppTest.from_file(APP, default_timeout=60).run()
+    at.file_uploader[0].upload("room.jpg", photo((64, 48)), "image/jpeg").run()
+    at.selectbox[0].select("Office")
+    at.selectbox[1].select("Boho")
+    at.selectbox[2].select("Wood")
+    at.slider[0].set_value(50)
+    for _ in range(2):                                  # computed, then served from the result cache
+        at.run()
+        assert not at.exception
+        assert [i.value for i in at.info][-1].startswith("No Boho / Wood items for **Office**")
+        assert not at.subheader
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import home_decor_app as hd
+from keyword_index import KeywordIndex, scan_match
+
+TITLES = pd.Series([
+    "Minimalist Oak Shelf",
+    "Minimal white desk",
+    "Wooden Shoe Stand",
+    "Modern kitchen cabinet, metallic finish",
+    "Screws and bolts kit",
+    "Rattan chairs (set of 2)",
+    "Tan leather sofa",
+    "Washing basket",
+    "Teak wood waste bin",
+    "",
+    None,
+])
+
+
+@pytest.fixture(scope="module")
+def index():
+    return KeywordIndex.build(TITLES)
+
+
+def matched(index, include=(), exclude=()):
+    return TITLES[index.match(include, exclude)].tolist()
+
+
+def test_style_keywords_match_derived_forms(index):
+    minimal = matched(index, [hd.STYLE_KEYWORDS["Minimalist"]])
+    assert minimal == ["Minimalist Oak Shelf", "Minimal white desk"]
+    assert "Modern kitchen cabinet, metallic finish" in matched(index, [hd.STYLE_KEYWORDS["Modern"]])
+
+
+def test_color_keywords_match_whole_words_only(index):
+    assert matched(index, [hd.COLOR_KEYWORDS["Wood"]]) == [
+        "Minimalist Oak Shelf", "Wooden Shoe Stand", "Teak wood waste bin"]
+    # 'tan' must not hit 'Stand', 'ash' must not hit 'Washing'
+    assert matched(index, [hd.COLOR_KEYWORDS["Beige"]]) == ["Tan leather sofa"]
+    assert matched(index, [hd.COLOR_KEYWORDS["Gray"]]) == []
+
+
+def test_avoid_keywords(index):
+    kept = matched(index, exclude=hd.AVOID_KEYWORDS)
+    assert "Modern kitchen cabinet, metallic finish" in kept   # not 'kit', not 'bin'
+    assert "Screws and bolts kit" not in kept
+    assert "Washing basket" not in kept
+    assert "Teak wood waste bin" not in kept
+
+
+def test_plurals_and_multi_word_keywords(index):
+    assert matched(index, [["chair"]]) == ["Rattan chairs (set of 2)"]
+    assert matched(index, [["waste bin"]]) == ["Teak wood waste bin"]
+    assert matched(index, [["bin waste"]]) == ["Teak wood waste bin"]
+
+
+@pytest.mark.parametrize("style", list(hd.STYLE_KEYWORDS) + [None])
+@pytest.mark.parametrize("color", list(hd.COLOR_KEYWORDS) + [None])
+def test_scan_agrees_with_index(index, style, color):
+    include = [hd.STYLE_KEYWORDS[style]] if style else []
+    include += [hd.COLOR_KEYWORDS[color]] if color else []
+    np.testing.assert_array_equal(scan_match(TITLES, include, hd.AVOID_KEYWORDS),
+                                  index.match(include, hd.AVOID_KEYWORDS))
+
+
+def test_save_load_round_trip(index, tmp_path):
+    path = tmp_path / "index.npz"
+    index.save(path)
+    loaded = KeywordIndex.load(path)
+    np.testing.assert_array_equal(loaded.match([["wood", "oak"]]), index.match([["wood", "oak"]]))
+
+
+def test_updated_equals_build(index):
+    titles = pd.Series(["Wooden Shoe Stand", "Brand new glass table", "Tan leather sofa"])
+    old_rows = [2, -1, 6]
+    assert index.updated(titles, old_rows).match([["glass", "tan", "wood"]]).tolist() == \
+        KeywordIndex.build(titles).match([["glass", "tan", "wood"]]).tolist()
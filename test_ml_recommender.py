@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ml_recommender as ml
+
+
+@pytest.fixture(scope="module")
+def data():
+    return ml.generate_data(3000, seed=0)
+
+
+@pytest.fixture(scope="module")
+def server(data, tmp_path_factory):
+    xgb = pytest.importorskip("xgboost")
+    encoder = ml.FeatureEncoder.fit(data)
+    dtrain = xgb.DMatrix(encoder.transform(data), label=data["label"], feature_names=encoder.feature_names)
+    booster = xgb.train(dict(ml.TRAIN_PARAMS, nthread=1), dtrain, num_boost_round=20)
+    model_dir = str(tmp_path_factory.mktemp("model"))
+    version = ml.save_model(booster, encoder, model_dir)
+    loaded = ml.ModelServer.load(model_dir)
+    assert loaded.version == version
+    return booster, loaded
+
+
+# ------------------- model artifact -------------------
+def test_model_round_trip(data, server):
+    booster, loaded = server
+    expected = booster.inplace_predict(ml.FeatureEncoder.fit(data).transform(data), validate_features=False)
+    np.testing.assert_allclose(loaded.predict_many(data), expected, rtol=1e-6)
+    assert loaded.predict_many(data.iloc[:0]).shape == (0,)
+
+
+def test_model_scores_catalog_frames(data, server):
+    _, loaded = server
+    catalog = data.rename(columns=ml.FRAME_ALIASES).head(50)
+    np.testing.assert_array_equal(loaded.predict_many(catalog), loaded.predict_many(data.head(50)))
+
+
+def test_model_exists(tmp_path):
+    assert not ml.model_exists(str(tmp_path))
+
+
+# ------------------- feature encoder -------------------
+def test_encoder_layout_and_scaling(data):
+    enc = ml.FeatureEncoder.fit(data)
+    X = enc.transform(data)
+    assert X.dtype == np.float32 and X.shape == (len(data), enc.n_features)
+    assert enc.feature_names[:4] == ml.NUM_COLUMNS
+    assert X[:, :4].min() >= 0 and X[:, :4].max() <= 1
+    # exactly one hot per categorical column
+    for c in ml.CAT_COLUMNS:
+        cols = [i for i, name in enumerate(enc.feature_names) if name.startswith(f"{c}_")]
+        assert (X[:, cols].sum(axis=1) == 1).all()
+    row = X[0]
+    assert row[enc.feature_names.index(f"room_{data['room'].iloc[0]}")] == 1
+
+
+def test_encoder_round_trips_through_json(data):
+    import json
+
+    enc = ml.FeatureEncoder.fit(data)
+    again = ml.FeatureEncoder.from_dict(json.loads(json.dumps(enc.to_dict())))
+    assert again.feature_names == enc.feature_names
+    np.testing.assert_array_equal(again.transform(data), enc.transform(data))
+
+
+def test_encoder_accepts_strings_aliases_and_unknowns(data):
+    enc = ml.FeatureEncoder.fit(data)
+    head = data.head(20)
+    as_str = head.astype({c: str for c in ml.CAT_COLUMNS})
+    np.testing.assert_array_equal(enc.transform(as_str), enc.transform(head))
+    np.testing.assert_array_equal(enc.transform(head.rename(columns=ml.FRAME_ALIASES)), enc.transform(head))
+
+    odd = as_str.assign(category="Hammock")
+    X = enc.transform(odd)
+    cat_cols = [i for i, name in enumerate(enc.feature_names) if name.startswith("category_")]
+    assert not X[:, cat_cols].any()
+
+
+def test_encoder_buffer_is_reused(data):
+    enc = ml.FeatureEncoder.fit(data)
+    buf = enc.buffer(10)
+    out = enc.transform(data.head(10), out=buf)
+    assert out is buf
+    assert np.shares_memory(enc.buffer(5), buf)
+    np.testing.assert_array_equal(enc.transform(data.head(3), out=enc.buffer(3)), enc.transform(data.head(3)))
+
+
+# ------------------- explanations -------------------
+@pytest.fixture(scope="module")
+def explainer(server):
+    pytest.importorskip("shap")
+    return ml.ExplanationService(server[1], workers=2, cache_size=100)
+
+
+def test_shap_values_add_up_to_the_margin(data, server, explainer):
+    rows = data.head(40)
+    sv = explainer.shap_values(rows)
+    assert sv.shape == (40, server[1].encoder.n_features)
+    X = server[1].encoder.transform(rows)
+    margin = server[0].inplace_predict(X, predict_type="margin", validate_features=False)
+    base = np.ravel(explainer.explainer.expected_value)[0]
+    np.testing.assert_allclose(sv.sum(axis=1) + base, margin, atol=1e-3)
+
+
+def test_shap_cache_explains_each_distinct_row_once(data, explainer, monkeypatch):
+    explained = []
+    real = explainer.explainer.shap_values
+    monkeypatch.setattr(explainer.explainer, "shap_values", lambda X: explained.append(len(X)) or real(X))
+    rows = pd.concat([data.iloc[100:110]] * 3)
+    first = explainer.shap_values(rows)
+    assert sum(explained) == 10
+    np.testing.assert_array_equal(explainer.shap_values(rows.iloc[:10]), first[:10])
+    assert sum(explained) == 10
+    explainer.shap_values(data.iloc[200:400])
+    assert len(explainer._cache) == explainer.cache_size
+
+
+def test_top_reasons(data, explainer):
+    reasons = explainer.top_reasons(data.head(5), k=3)
+    assert len(reasons) == 5 and all(len(r) == 3 for r in reasons)
+    for r in reasons:
+        assert [abs(v) for _, v in r] == sorted((abs(v) for _, v in r), reverse=True)
+
+
+def test_one_explainer_per_model_version(server):
+    pytest.importorskip("shap")
+    assert ml.explainer_for(server[1]) is ml.explainer_for(server[1])
+
+
+# ------------------- parquet feature store -------------------
+@pytest.fixture
+def store(data, tmp_path):
+    path = str(tmp_path / "training.parquet")
+    ml.write_training_data(data, path, row_group_size=700)
+    return path
+
+
+def test_encoder_from_row_group_stats_equals_fit(data, store):
+    fitted, from_stats = ml.FeatureEncoder.fit(data), ml.fit_encoder_from_parquet(store)
+    assert from_stats.to_dict() == fitted.to_dict()
+
+
+def test_parquet_batches_split_by_position(data, store):
+    pytest.importorskip("xgboost")
+    seen = {}
+    for split in ("train", "val"):
+        it = ml.parquet_batches(store, ml.FeatureEncoder.fit(data), split, batch_rows=700)
+        labels = []
+        while it.next(lambda data, label, feature_names: labels.append(label)):
+            pass
+        seen[split] = np.concatenate(labels)
+    val_pos = np.arange(len(data)) % ml.VAL_EVERY == 0
+    np.testing.assert_array_equal(seen["val"], data["label"].to_numpy()[val_pos])
+    np.testing.assert_array_equal(seen["train"], data["label"].to_numpy()[~val_pos])
+
+
+def test_train_from_store(store):
+    pytest.importorskip("xgboost")
+    booster, encoder, stats = ml.train_from_store(store, max_rounds=30, early_stopping=5,
+                                                  params={"nthread": 1}, batch_rows=700)
+    assert stats["rows"] == 3000
+    assert 1 <= stats["rounds"] <= 30
+    assert booster.num_features() == encoder.n_features
+
+
+# ------------------- synthetic data -------------------
+def test_generate_data_is_seeded_and_categorical():
+    a, b = ml.generate_data(5000, seed=1), ml.generate_data(5000, seed=1)
+    pd.testing.assert_frame_equal(a, b)
+    assert not a.equals(ml.generate_data(5000, seed=2))
+    for c, vocab in ml.VOCABULARIES.items():
+        assert list(a[c].cat.categories) == vocab
+    assert a["price"].between(15, 800).all() and a["rating"].between(3.5, 5.0).all()
+    assert 0.03 < a["label"].mean() < 0.2
+
+
+def test_stream_data_is_reproducible_across_runs(tmp_path):
+    a, b = str(tmp_path / "a.parquet"), str(tmp_path / "b.parquet")
+    ml.stream_data(2500, a, shard_rows=1000, seed=5)
+    ml.stream_data(2500, b, shard_rows=1000, seed=5)
+    df = pd.read_parquet(a)
+    assert len(df) == 2500
+    pd.testing.assert_frame_equal(df, pd.read_parquet(b))
+    # shards draw from independent child seeds
+    assert not df.iloc[:1000].reset_index(drop=True).equals(df.iloc[1000:2000].reset_index(drop=True))
@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+import pytest
+
+import recommend_api as api
+
+
+def test_parse_request_from_a_prompt():
+    q = api.parse_request({"prompt": "Bedroom, wall color light blue, 12x10", "budget": 800})
+    assert (q["room_type"], q["wall_color"], q["dimensions"]) == ("Bedroom", "Light Blue", "12x10")
+    assert q["budget"] == 800.0
+    assert q["suggestions"] and q["suggested_colors"]
+
+
+def test_parse_request_defaults_and_fields():
+    q = api.parse_request({})
+    assert q["room_type"] == api.ROOM_OPTIONS[0]
+    assert q["budget"] == api.DEFAULT_BUDGET and q["dimensions"] == "Unknown"
+    q = api.parse_request({"room_type": "Kitchen", "style": "Boho", "color_filter": "Wood",
+                           "budget": "250"})
+    assert (q["room_type"], q["style"], q["color_filter"], q["budget"]) == ("Kitchen", "Boho", "Wood", 250.0)
+
+
+@pytest.mark.parametrize("req, message", [
+    ([], "JSON object"),
+    ({"room_type": "Garage"}, "room_type"),
+    ({"style": "Gothic"}, "style"),
+    ({"color_filter": "Purple"}, "color_filter"),
+    ({"budget": 0}, "budget"),
+    ({"budget": "nan"}, "budget"),
+])
+def test_parse_request_rejects(req, message):
+    with pytest.raises(ValueError, match=message):
+        api.parse_request(req)
+
+
+def test_parse_request_rejects_non_numeric_budget():
+    with pytest.raises(ValueError):
+        api.parse_request({"budget": "cheap"})
+
+
+# ------------------- micro-batching -------------------
+async def _with_batcher(handler, body, **kwargs):
+    batcher = api.MicroBatcher(handler=handler, **kwargs)
+    worker = asyncio.create_task(batcher.run())
+    try:
+        return await body(batcher)
+    finally:
+        worker.cancel()
+        batcher.executor.shutdown(wait=True)
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    sizes = []
+
+    def handler(reqs):
+        sizes.append(len(reqs))
+        return [{"echo": r} for r in reqs]
+
+    async def body(batcher):
+        out = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        return out, batcher.batches, batcher.requests
+
+    out, batches, requests = asyncio.run(_with_batcher(handler, body, max_batch=2, max_wait_ms=1))
+    assert out == [{"echo": i} for i in range(5)]
+    assert sizes == [2, 2, 1]
+    assert (batches, requests) == (3, 5)
+
+
+def test_micro_batcher_fails_the_whole_batch_on_a_handler_error():
+    def handler(reqs):
+        raise RuntimeError("model crashed")
+
+    async def body(batcher):
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    out = asyncio.run(_with_batcher(handler, body, max_wait_ms=0))
+    assert all(isinstance(e, RuntimeError) for e in out)
+
+
+# ------------------- HTTP -------------------
+class FakeBatcher:
+    batches = requests = 0
+
+    async def submit(self, req):
+        if req.get("room_type") == "Garage":
+            return {"error": "room_type must be one of ..."}
+        return {"items": [], "room_type": req.get("room_type", "Bedroom")}
+
+
+def _route(method, path, body=b""):
+    return asyncio.run(api.RecommendServer(FakeBatcher()).route(method, path, body))
+
+
+def test_route_status_codes():
+    assert _route("GET", "/healthz")[0] == 200
+    assert _route("GET", "/nope")[0] == 404
+    assert _route("GET", "/recommend")[0] == 405
+    assert _route("POST", "/recommend", b"{not json")[0] == 400
+    assert _route("POST", "/recommend", b'{"room_type": "Garage"}')[0] == 400
+    assert _route("POST", "/recommend", b'{"room_type": "Kitchen"}') == (200, {"items": [], "room_type": "Kitchen"})
+    assert _route("POST", "/recommend/batch", b"{}")[0] == 400
+    status, out = _route("POST", "/recommend/batch", b'[{"room_type": "Office"}, {}]')
+    assert status == 200 and [r["room_type"] for r in out] == ["Office", "Bedroom"]
+
+
+def test_handle_keeps_the_connection_alive_and_caps_the_body():
+    async def body():
+        server = await asyncio.start_server(api.RecommendServer(FakeBatcher()).handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        async def call(request):
+            writer.write(request)
+            status = (await reader.readline()).split()[1]
+            headers = {}
+            while (line := await reader.readline()) != b"\r\n":
+                k, _, v = line.decode().partition(":")
+                headers[k.lower()] = v.strip()
+            payload = json.loads(await reader.readexactly(int(headers["content-length"])))
+            return int(status), headers["connection"], payload
+
+        data = b'{"room_type": "Kitchen"}'
+        first = await call(b"POST /recommend HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(data), data))
+        second = await call(b"GET /healthz HTTP/1.1\r\n\r\n")
+        third = await call(b"POST /recommend HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (api.MAX_BODY + 1))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return first, second, third
+
+    first, second, third = asyncio.run(body())
+    assert first == (200, "keep-alive", {"items": [], "room_type": "Kitchen"})
+    assert second[:2] == (200, "keep-alive")
+    assert third[:2] == (413, "close")
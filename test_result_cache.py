@@ -0,0 +1,68 @@
+import numpy as np
+
+from result_cache import ENTRY_OVERHEAD, ResultCache, query_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def value(n=20):
+    return {"ids": np.arange(n, dtype=np.int64), "scores": np.ones(n, dtype=np.float32)}
+
+
+def test_query_key_normalises():
+    a = query_key("v1", "Bedroom", "Modern", "White", 520, ["Gray", "White"])
+    b = query_key("v1", "Bedroom", "Modern", "White", 549.99, ("White", "Gray"))
+    assert a == b
+    assert a != query_key("v1", "Bedroom", "Modern", "White", 550, ["Gray", "White"])
+    assert a != query_key("v2", "Bedroom", "Modern", "White", 520, ["Gray", "White"])
+    assert query_key("v1", "Bedroom", "Modern", "White", 500, None, "12x10")[-1] == "12x10"
+
+
+def test_hit_miss_and_ttl():
+    clock = Clock()
+    cache = ResultCache(ttl=10, clock=clock)
+    key = query_key("v1", "Office", "All Styles", "All Colors", 300)
+    assert cache.get(key) is None
+    cache.put(key, value())
+    assert cache.get(key)["ids"].tolist() == list(range(20))
+    clock.now = 11
+    assert cache.get(key) is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (0, 1, 2)
+    assert stats["hit_rate"] == 1 / 3
+
+
+def test_lru_entry_cap():
+    cache = ResultCache(max_entries=2)
+    for k in "abc":
+        cache.put(("v", k), value())
+        if k == "b":
+            cache.get(("v", "a"))           # a becomes most recent
+    assert cache.get(("v", "a")) is not None and cache.get(("v", "b")) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_cap():
+    size = ENTRY_OVERHEAD + value()["ids"].nbytes + value()["scores"].nbytes
+    cache = ResultCache(max_bytes=3 * size)
+    for i in range(5):
+        cache.put(("v", i), value())
+    assert cache.stats()["entries"] == 3 and cache.stats()["bytes"] == 3 * size
+    cache.put(("v", "huge"), value(100_000))
+    assert cache.get(("v", "huge")) is None
+
+
+def test_new_catalog_version_drops_old_entries():
+    cache = ResultCache()
+    cache.use_version("v1")
+    cache.put(("v1", "x"), value())
+    cache.use_version("v1")
+    assert cache.get(("v1", "x")) is not None
+    cache.use_version("v2")
+    assert cache.get(("v1", "x")) is None and cache.stats()["bytes"] == 0
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from room_classifier import DEFAULT_ROOM, RoomClassifier, classify_rooms, default_classifier, flipkart_rooms
+
+
+@pytest.mark.parametrize("title, room", [
+    ("Glass coffee table", "Living Room"),      # longest keyword at the same position
+    ("Oak dining table", "Dining Room"),
+    ("Classic MOLTE Desk chair", "Office"),     # earliest keyword wins
+    ("Sofa bed with storage", "Living Room"),
+    ("KURA Bed tent with curtain", "Bedroom"),
+    ("Shoe rack, 3 tiers", "Hallway"),
+    ("Ceramic vase", DEFAULT_ROOM),
+    ("", DEFAULT_ROOM),
+])
+def test_classify_one(title, room):
+    assert default_classifier().classify_one(title) == room
+
+
+def test_classify_column_matches_classify_one():
+    titles = pd.Series(["Desk chair", None, "DESK CHAIR", "Bath mirror", "Vase"], index=[5, 3, 9, 1, 0])
+    rooms = default_classifier().classify(titles)
+    assert rooms.index.tolist() == [5, 3, 9, 1, 0]
+    assert rooms.tolist() == [default_classifier().classify_one(t or "") for t in titles]
+    assert default_classifier().classify(pd.Series([], dtype=object)).empty
+
+
+def test_duplicate_keywords_rejected():
+    with pytest.raises(ValueError):
+        RoomClassifier([("bed", "Bedroom"), ("bed", "Living Room")])
+
+
+def test_category_fallback_only_for_unmatched_titles():
+    titles = pd.Series(["Oak bed", "KALLAX unit"])
+    cats = pd.Series(["Bookcases", "Bookcases"])
+    assert classify_rooms(titles, cats, {"Bookcases": "Living Room"}).tolist() == ["Bedroom", "Living Room"]
+
+
+def test_flipkart_type_beats_title():
+    titles = pd.Series(["Engineered wood bed", "Wooden study table", "Bean bag"], index=[7, 8, 9])
+    types = pd.Series(["Sofa", "Table", "Beanbag"], index=[7, 8, 9])
+    assert flipkart_rooms(titles, types).tolist() == ["Living Room", "Living Room", DEFAULT_ROOM]
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from scoring import NO_CAP, caps_for, diverse_top_k, get_engine, top_k
+
+
+def greedy(scores, groups, k, priority=None):
+    """The loop diverse_top_k replaces: walk best-first, keep a row while
+    every group counter is under its cap."""
+    key = np.asarray(scores, dtype=np.float64)
+    if priority is not None:
+        key = key - 10.0 * np.asarray(priority)
+    counts = [dict() for _ in groups]
+    out = []
+    for i in np.argsort(-key, kind="stable"):
+        if all(counts[g].get(codes[i], 0) < caps[codes[i]] for g, (codes, caps) in enumerate(groups)):
+            for g, (codes, _) in enumerate(groups):
+                counts[g][codes[i]] = counts[g].get(codes[i], 0) + 1
+            out.append(i)
+            if len(out) == k:
+                break
+    return np.array(out, dtype=np.int64)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_diverse_top_k_matches_greedy(seed):
+    rng = np.random.default_rng(seed)
+    n = 3000
+    scores = rng.random(n).astype(np.float32)
+    source = rng.integers(0, 3, n)
+    category = rng.integers(0, 40, n)
+    groups = [(source, np.array([8, 12, NO_CAP])), (category, np.full(40, 2))]
+    np.testing.assert_array_equal(diverse_top_k(scores, groups, k=20), greedy(scores, groups, 20))
+
+
+def test_quotas_hold_and_grow_the_pool():
+    # the 500 best rows share one category: the pool has to grow past them
+    scores = np.r_[np.linspace(2, 1, 500), np.linspace(1, 0, 500)]
+    category = np.r_[np.zeros(500, int), np.arange(1, 501)]
+    chosen = diverse_top_k(scores, [(category, np.full(501, 3))], k=20, pool=2)
+    assert len(chosen) == 20
+    assert (category[chosen] == 0).sum() == 3
+    assert list(chosen[:3]) == [0, 1, 2]
+
+
+def test_priority_takes_lower_values_first():
+    scores = np.array([0.9, 0.8, 0.1, 0.2])
+    priority = np.array([1, 1, 0, 0])
+    groups = [(np.zeros(4, int), np.array([NO_CAP]))]
+    assert diverse_top_k(scores, groups, k=3, priority=priority).tolist() == [3, 2, 0]
+
+
+def test_fewer_rows_than_k_and_empty():
+    groups = [(np.array([0, 0, 1]), np.array([1, 1]))]
+    assert diverse_top_k(np.array([0.3, 0.2, 0.1]), groups, k=20).tolist() == [0, 2]
+    assert diverse_top_k(np.array([]), [(np.array([], int), np.array([1]))]).size == 0
+
+
+def test_top_k_is_sorted_best_first():
+    scores = np.random.default_rng(0).random(1000)
+    assert top_k(scores, 10).tolist() == np.argsort(-scores)[:10].tolist()
+    assert top_k(scores[:5], 10).tolist() == np.argsort(-scores[:5]).tolist()
+
+
+def test_caps_for_aligns_with_categories():
+    assert caps_for(["IKEA", "Amazon", "Flipkart"], {"IKEA": 12, "Amazon": 8}).tolist() == [12, 8, NO_CAP]
+
+
+def test_weigh_matches_the_formula():
+    rng = np.random.default_rng(1)
+    price, rating = rng.uniform(10, 900, 200), rng.uniform(1, 5, 200)
+    purchases, bonus = rng.integers(0, 5000, 200), rng.random(200)
+    idx, score = get_engine().weigh(price, rating, purchases, bonus, budget=500)
+    np.testing.assert_array_equal(idx, np.flatnonzero(price.astype(np.float32) <= 500))
+    p = price[idx]
+    expected = (0.3 * (p.max() - p) / (p.max() - p.min() + 1e-6) + 0.2 * rating[idx] / 5
+                + 0.3 * purchases[idx] / (purchases[idx].max() + 1e-6) + 0.2 * bonus[idx])
+    np.testing.assert_allclose(score, expected, rtol=1e-4, atol=1e-5)
+    assert get_engine().weigh(price, rating, purchases, bonus, budget=1)[0].size == 0
@@ -0,0 +1,89 @@
+import io
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+import segregate_stream as ss
+from segregate_ikea_by_room import prepare_chunk as prepare_ikea
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FLIPKART_ZIP = os.path.join(HERE, "flipkart.zip")
+
+
+@pytest.fixture
+def ikea_csv(tmp_path):
+    path = tmp_path / "src" / "ikea.csv"
+    path.parent.mkdir()
+    pd.read_csv(os.path.join(HERE, "ikea_furniture.csv"), nrows=400).to_csv(path, index=False)
+    return str(path)
+
+
+def whole_file(source):
+    """The source read in one go, as the non-streaming scripts did."""
+    if source.endswith(".zip"):
+        with zipfile.ZipFile(source) as zf:
+            return pd.concat([pd.read_csv(zf.open(m)) for m in ss.csv_members(zf)], ignore_index=True)
+    return pd.read_csv(source)
+
+
+def check_matches_whole_file(source, out_dir, prepare, summary):
+    expected = prepare(whole_file(source))
+    assert summary == expected["room_type"].value_counts().to_dict()
+    for room, group in expected.groupby("room_type"):
+        path = os.path.join(out_dir, room.replace(" ", "_") + ".csv")
+        with open(path) as fh:
+            header = fh.readline()
+            assert header not in fh.read()               # header written once
+        written = pd.read_csv(path)
+        assert len(written) == summary[room]
+        buf = io.StringIO()
+        group.to_csv(buf, index=False)
+        buf.seek(0)
+        pd.testing.assert_frame_equal(written, pd.read_csv(buf))
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_csv_stream_matches_whole_file(ikea_csv, tmp_path, workers):
+    out = str(tmp_path / "out")
+    summary = ss.stream_segregate(ikea_csv, out, prepare_ikea, chunksize=64, workers=workers)
+    check_matches_whole_file(ikea_csv, out, prepare_ikea, summary)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_zip_stream_matches_whole_file(tmp_path, workers):
+    out = str(tmp_path / "out")
+    summary = ss.stream_segregate(FLIPKART_ZIP, out, ss.prepare_flipkart_chunk,
+                                  chunksize=500, workers=workers)
+    check_matches_whole_file(FLIPKART_ZIP, out, ss.prepare_flipkart_chunk, summary)
+    assert not [c for c in pd.read_csv(os.path.join(out, "Bedroom.csv"), nrows=1) if c.startswith("Unnamed")]
+
+
+def test_iter_chunks_skips_macos_metadata():
+    sizes = [len(c) for c in ss.iter_chunks(FLIPKART_ZIP, chunksize=1000)]
+    assert max(sizes) <= 1000
+    assert sum(sizes) == len(whole_file(FLIPKART_ZIP))
+
+
+def test_rerun_replaces_room_files_only(ikea_csv, tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "Office.csv").write_text("stale\n")           # a room this source no longer has
+    (out / "notes.csv").write_text("keep me\n")          # not a room file: left alone
+    first = ss.stream_segregate(ikea_csv, str(out), prepare_ikea, chunksize=100)
+    second = ss.stream_segregate(ikea_csv, str(out), prepare_ikea, chunksize=100)
+    assert first == second and "Office" not in second
+    assert not (out / "Office.csv").exists()
+    assert (out / "notes.csv").read_text() == "keep me\n"
+    for room, n in second.items():
+        assert len(pd.read_csv(out / (room.replace(" ", "_") + ".csv"))) == n
+
+
+def test_refuses_an_output_directory_holding_the_source(ikea_csv):
+    src_dir = os.path.dirname(ikea_csv)
+    with pytest.raises(ValueError, match="holds the source"):
+        ss.stream_segregate(ikea_csv, src_dir, prepare_ikea)
+    with pytest.raises(ValueError, match="holds the source"):
+        ss.stream_segregate(ikea_csv, os.path.dirname(src_dir), prepare_ikea)
+    assert os.listdir(src_dir) == ["ikea.csv"]
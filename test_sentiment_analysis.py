@@ -0,0 +1,68 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import sentiment_analysis as sa
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    """Replace VADER with a length-based score and record what gets scored."""
+    calls = []
+
+    def fake_batch(texts):
+        calls.extend(texts)
+        return [len(t) / 100 for t in texts]
+
+    monkeypatch.setattr(sa, "_compound_batch", fake_batch)
+    return calls
+
+
+def test_score_texts_dedups_and_uses_the_cache(scored, tmp_path):
+    cache = sa.SentimentCache(str(tmp_path / "cache.sqlite"))
+    try:
+        first = sa.score_texts(["good", "bad", "good"], cache=cache)
+        assert first == {"good": 0.04, "bad": 0.03}
+        assert scored == ["good", "bad"]
+        second = sa.score_texts(["bad", "fine"], cache=cache)
+        assert second == {"bad": 0.03, "fine": 0.04}
+        assert scored == ["good", "bad", "fine"]     # only the miss was scored
+    finally:
+        cache.close()
+    reopened = sa.SentimentCache(str(tmp_path / "cache.sqlite"))
+    assert reopened.get_many([sa.text_key("good")]) == {sa.text_key("good"): 0.04}
+    reopened.close()
+
+
+def test_cache_lookups_past_the_parameter_limit(tmp_path):
+    cache = sa.SentimentCache(str(tmp_path / "cache.sqlite"))
+    items = [(sa.text_key(str(i)), i / 3000) for i in range(2500)]
+    cache.put_many(items)
+    assert cache.get_many(k for k, _ in items) == dict(items)
+    cache.close()
+
+
+def test_label_sentiment_thresholds():
+    labels = sa.label_sentiment(np.array([0.5, 0.05, 0.0, -0.05, -0.4]))
+    assert labels.tolist() == ["positive", "positive", "neutral", "negative", "negative"]
+
+
+def test_add_sentiment_averages_reviews_per_product(scored, tmp_path):
+    src, out = tmp_path / "in.csv", tmp_path / "out" / "final.csv"
+    pd.DataFrame({"title": ["a", "b"],
+                  "review_text": [json.dumps(["xx", "xxxx"]), json.dumps(["xxxxxx"])]}).to_csv(src, index=False)
+    sa.add_sentiment(str(src), str(out), cache_path=None, workers=0)
+    df = pd.read_csv(out)
+    np.testing.assert_allclose(df["sentiment_score"], [0.03, 0.06])
+    assert df["sentiment"].tolist() == ["neutral", "positive"]
+
+
+def test_vader_polarity():
+    pytest.importorskip("nltk")
+    try:
+        scores = sa._compound_batch(["I love this sturdy table", "Broke after a week, terrible"])
+    except LookupError:
+        pytest.skip("VADER lexicon not available")
+    assert scores[0] > 0.05 > -0.05 > scores[1]
@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import catalog_versions as cv
+import shared_catalog as sc
+from catalog_store import STORE_PATH, ikea_rows, load_store_frame, normalize, store_frame, write_store
+from keyword_index import INDEX_PATH
+from similarity_index import SIMILARITY_DIR
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(sc.SHARED_ENV, raising=False)
+    return tmp_path
+
+
+def small_store(path):
+    raw = pd.read_csv(os.path.join(HERE, "ikea_furniture.csv")).head(60)
+    write_store(normalize([ikea_rows(raw)]), str(path))
+    return str(path)
+
+
+def test_publish_and_attach_zero_copy(workdir):
+    store = small_store(workdir / "catalog.parquet")
+    shared = str(workdir / "shm" / "catalog.arrow")
+    sc.publish(sc.open_store(store), shared, store)
+
+    before = pa.total_allocated_bytes()
+    table = sc.attach(shared)
+    assert pa.total_allocated_bytes() - before < table.nbytes // 10     # mapped, not copied
+    pd.testing.assert_frame_equal(sc.load_catalog_frame(shared), load_store_frame(store))
+    assert table.schema.metadata[sc.SOURCE_KEY] == os.path.abspath(store).encode()
+
+    frame = store_frame(table)                                          # what attach_frame builds
+    title = frame["title"].array._pa_array.chunk(0)                     # strings stay in the mapping
+    assert title.buffers()[2].address == table["title"].chunk(0).buffers()[2].address
+    price = frame["price"].to_numpy()
+    assert price.__array_interface__["data"][0] == table["price"].chunk(0).buffers()[1].address
+
+
+def test_republish_changes_the_cache_key(workdir, monkeypatch):
+    store = small_store(workdir / "catalog.parquet")
+    shared = str(workdir / "shm" / "catalog.arrow")
+    (workdir / "shm").mkdir()
+    (workdir / "shm" / "catalog-notes.arrow").write_text("not a segment")
+    monkeypatch.setenv(sc.SHARED_ENV, shared)
+
+    table = sc.open_store(store)
+    segments = [sc.publish(table.slice(0, n), shared, store) for n in (10, 20, 30)]
+    assert len(set(segments)) == 3
+    assert sc.active_store_path() == segments[-1]
+    assert len(sc.load_catalog_frame(sc.active_store_path())) == 30
+    assert len(sc.attach_frame(shared)) == 30
+    # the previous segment stays for reruns still on it; older ones go
+    assert sorted(os.listdir(workdir / "shm")) == sorted(
+        ["catalog.arrow", "catalog-notes.arrow"] + [os.path.basename(p) for p in segments[1:]])
+    assert len(sc.attach(segments[1])) == 20
+
+
+def test_active_store_path_precedence(workdir, monkeypatch):
+    assert sc.active_store_path() is None
+    small_store(STORE_PATH)
+    assert sc.active_store_path() == STORE_PATH
+
+    os.makedirs(os.path.join(cv.VERSIONS_DIR, "v000001-x"))
+    with open(os.path.join(cv.VERSIONS_DIR, cv.CURRENT_FILE), "w") as fh:
+        fh.write("v000001-x")
+    assert sc.active_store_path() == cv.current_store_path()
+
+    shared = str(workdir / "catalog.arrow")
+    sc.publish(sc.open_store(STORE_PATH), shared)
+    monkeypatch.setenv(sc.SHARED_ENV, shared)
+    assert sc.active_store_path() == os.path.realpath(shared)
+
+
+def test_index_paths_follow_the_published_store(workdir):
+    root = str(workdir / "versions")
+    folder = os.path.join(root, "v000001-x")
+    os.makedirs(folder)
+    store = small_store(os.path.join(folder, cv.STORE_FILE))
+    with open(os.path.join(folder, cv.MANIFEST_FILE), "w") as fh:
+        fh.write("{}")
+    expected = (os.path.join(folder, cv.INDEX_FILE), os.path.join(folder, cv.SIMILARITY_SUBDIR))
+    assert sc.index_paths(store) == expected
+
+    shared = str(workdir / "catalog.arrow")
+    sc.publish(sc.open_store(store), shared, store)
+    assert sc.index_paths(shared) == tuple(os.path.abspath(p) for p in expected)
+
+    plain = small_store(workdir / "plain.parquet")
+    assert sc.index_paths(plain) == (INDEX_PATH, SIMILARITY_DIR)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from similarity_index import SimilarityIndex, item_tokens
+
+WORDS = ["oak", "walnut", "glass", "steel", "velvet", "rattan", "white", "black", "compact", "storage"]
+KINDS = ["bed", "sofa", "desk", "chair", "shelf", "lamp", "table", "wardrobe"]
+
+
+def catalog(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "title": [f"{a} {b} {k}" for a, b, k in zip(rng.choice(WORDS, n), rng.choice(WORDS, n), rng.choice(KINDS, n))],
+        "category": rng.choice(KINDS, n),
+        "color": rng.choice(["White", "Black", "Wood"], n),
+        "style": rng.choice(["Modern", "Boho"], n),
+        "width": rng.uniform(30, 200, n), "depth": rng.uniform(30, 100, n), "height": rng.uniform(40, 200, n),
+    })
+
+
+@pytest.fixture(scope="module")
+def df():
+    return catalog(3000)
+
+
+@pytest.fixture(scope="module")
+def exact(df):
+    return SimilarityIndex.build(df)
+
+
+def test_item_tokens_include_size_buckets():
+    toks = item_tokens(catalog(1).assign(title="Oak beds", width=80.0, depth=np.nan, height=120.0))
+    assert {"oak", "bed", "w75", "h100"} <= set(toks)
+    assert not any(t.startswith("d") and t[1:].isdigit() for t in toks)
+
+
+def test_vectors_are_unit_length_and_self_nearest(exact):
+    np.testing.assert_allclose(np.linalg.norm(exact.vectors, axis=1), 1, rtol=1e-5)
+    rows, sims = exact.search(exact.vectors[42], k=1)
+    assert sims[0] == pytest.approx(1, abs=1e-5)
+    rows, sims = exact.neighbours(42, k=5)
+    assert 42 not in rows and np.all(np.diff(sims) <= 0)
+
+
+def test_query_text_finds_matching_titles(df, exact):
+    rows, _ = exact.search(exact.embed_text("velvet sofa"), k=10)
+    titles = df["title"].iloc[rows]
+    assert titles.str.contains("velvet").all() and titles.str.contains("sofa").mean() >= 0.5
+
+
+def test_ivf_recall_against_exact_search(df, exact):
+    ivf = SimilarityIndex.build(df, nlist=32)
+    assert sorted(ivf.members.tolist()) == list(range(len(df)))
+    recall = []
+    for row in range(0, 3000, 150):
+        truth, _ = exact.neighbours(row, k=10)
+        got, _ = ivf.neighbours(row, k=10)
+        recall.append(len(set(truth) & set(got)) / 10)
+    assert np.mean(recall) >= 0.8
+    np.testing.assert_array_equal(ivf.neighbours(7, k=10, exact=True)[0], exact.neighbours(7, k=10)[0])
+
+
+def test_save_and_memory_mapped_load(df, tmp_path):
+    ivf = SimilarityIndex.build(df, nlist=16)
+    ivf.save(str(tmp_path))
+    loaded = SimilarityIndex.load(str(tmp_path))
+    assert isinstance(loaded.vectors, np.memmap)
+    vec = ivf.embed_text("black steel desk")
+    np.testing.assert_array_equal(loaded.embed_text("black steel desk"), vec)
+    np.testing.assert_array_equal(loaded.search(vec, k=10)[0], ivf.search(vec, k=10)[0])
+
+
+def test_updated_keeps_old_rows_and_embeds_new_ones(df, exact):
+    new = pd.concat([df.iloc[10:], catalog(20, seed=9)], ignore_index=True)
+    old_rows = np.r_[np.arange(10, len(df)), np.full(20, -1)]
+    up = exact.updated(new, old_rows)
+    np.testing.assert_array_equal(up.vectors[:-20], exact.vectors[10:])
+    rebuilt = SimilarityIndex.build(new)
+    cos = np.sum(up.vectors[-20:] * rebuilt.vectors[-20:], axis=1)
+    assert cos.min() > 0.9      # same tokens, only the IDF is frozen
@@ -0,0 +1,130 @@
+import asyncio
+import io
+import os
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from thumbnails import FAILED, ThumbnailCache, read_source
+
+
+def write_image(path, color, size=(800, 600)):
+    Image.new("RGB", size, color).save(path, "JPEG")
+    return str(path)
+
+
+class CountingSource:
+    """Filesystem source that counts reads and can fail or stall per URL."""
+
+    def __init__(self, fail=(), stall=()):
+        self.calls, self.fail, self.stall = [], set(fail), set(stall)
+        self.release = threading.Event()
+
+    def __call__(self, url):
+        self.calls.append(url)
+        if url in self.fail:
+            raise OSError("unreachable")
+        if url in self.stall:
+            self.release.wait(10)
+        return read_source(url)
+
+
+@pytest.fixture
+def images(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    return [write_image(src / f"{i}.jpg", (40 * i, 90, 200)) for i in range(4)]
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "thumbs")
+
+
+def test_fetch_then_cache_hit(images, cache_dir):
+    source = CountingSource()
+    cache = ThumbnailCache(cache_dir, size=(64, 64), fetch=source)
+    paths = asyncio.run(cache.fetch_many(images + images[:1]))
+    assert source.calls == images
+    assert paths[0] == paths[-1] != cache.placeholder
+    assert Image.open(paths[0]).size == (64, 48)
+
+    again = ThumbnailCache(cache_dir, size=(64, 64), fetch=source)
+    assert again.thumbnails(images) == paths[:-1]
+    assert len(source.calls) == len(images)     # served from disk
+
+
+def test_identical_images_share_a_blob(tmp_path, cache_dir):
+    a = write_image(tmp_path / "a.jpg", (10, 20, 30))
+    b = write_image(tmp_path / "b.jpg", (10, 20, 30))
+    cache = ThumbnailCache(cache_dir, size=(64, 64))
+    pa, pb = asyncio.run(cache.fetch_many([a, b]))
+    assert pa == pb
+    assert len(os.listdir(os.path.join(cache_dir, "blobs"))) == 1
+
+
+def test_failures_fall_back_and_are_negative_cached(images, cache_dir):
+    source = CountingSource(fail=[images[1]])
+    cache = ThumbnailCache(cache_dir, size=(64, 64), fetch=source)
+    paths = asyncio.run(cache.fetch_many(images[:2] + ["", "/no/such/file.jpg"]))
+    assert paths[0] != cache.placeholder
+    assert paths[1:] == [cache.placeholder] * 3
+    assert cache.cached(images[1]) == cache.placeholder
+    asyncio.run(cache.fetch_many(images[:2]))
+    assert source.calls.count(images[1]) == 1   # not retried within FAIL_TTL
+
+
+def test_deadline_fails_in_flight_fetches(images, cache_dir):
+    source = CountingSource(stall=[images[0]])
+    cache = ThumbnailCache(cache_dir, size=(64, 64), fetch=source, concurrency=1)
+
+    async def fetch():
+        t0 = time.perf_counter()
+        try:
+            return await cache.fetch_many(images[:2], deadline=0.3), time.perf_counter() - t0
+        finally:
+            source.release.set()    # let asyncio.run join the stalled worker
+
+    paths, took = asyncio.run(fetch())
+    assert took < 2
+    assert paths == [cache.placeholder] * 2
+    with open(cache._ref_path(images[0])) as fh:
+        assert fh.read() == FAILED              # was in flight → negative-cached
+    assert cache.cached(images[1]) is None      # never started → retried later
+
+
+def test_thumbnails_do_not_wait_for_the_fetch(images, cache_dir):
+    source = CountingSource(stall=images[:2])
+    cache = ThumbnailCache(cache_dir, size=(64, 64), fetch=source)
+    try:
+        t0 = time.perf_counter()
+        assert cache.thumbnails(images[:2]) == [cache.placeholder] * 2
+        assert time.perf_counter() - t0 < 1
+        assert cache.prefetch(images[:2]) is None          # already queued
+        source.release.set()
+        future = cache.prefetch(images[2:])
+        future.result(timeout=10)
+        deadline = time.time() + 10
+        while any(cache.cached(u) is None for u in images) and time.time() < deadline:
+            time.sleep(0.02)
+        assert cache.placeholder not in cache.thumbnails(images)
+    finally:
+        source.release.set()
+        cache.close()
+
+
+def test_eviction_keeps_the_cache_under_its_cap(tmp_path, cache_dir):
+    srcs = [write_image(tmp_path / f"n{i}.png", (i * 60, 0, 0), size=(300, 300)) for i in range(4)]
+    cache = ThumbnailCache(cache_dir, size=(128, 128))
+    first = asyncio.run(cache.fetch_many(srcs[:1]))[0]
+    blob_size = os.path.getsize(first)
+    cache.max_bytes = blob_size * 2 + blob_size // 2
+    old = time.time() - 100
+    os.utime(first, (old, old))
+    asyncio.run(cache.fetch_many(srcs[1:]))
+    blobs = os.listdir(os.path.join(cache_dir, "blobs"))
+    assert len(blobs) == 2
+    assert not os.path.exists(first)
+    assert cache.cached(srcs[0]) is None        # evicted → fetched again next time
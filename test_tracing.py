@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+import tracing
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(tracing, "ENABLED", True)
+    monkeypatch.setattr(tracing, "_histograms", {})
+    monkeypatch.delenv(tracing.PORT_ENV, raising=False)
+
+
+def test_histogram_buckets_and_quantiles():
+    h = tracing.Histogram()
+    for ms in [0.5, 3, 3, 4, 40, 20000]:
+        h.observe(ms)
+    d = h.to_dict()
+    assert d["count"] == 6 and d["max_ms"] == 20000
+    assert d["buckets"]["1"] == 1 and d["buckets"]["5"] == 3 and d["buckets"]["+Inf"] == 1
+    assert h.quantile(0.5) == 5
+    assert h.quantile(0.8) == 50
+    assert h.quantile(0.99) == 20000        # overflow bucket reports the max seen
+    assert tracing.Histogram().quantile(0.5) == 0.0
+
+
+def test_disabled_tracing_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(tracing, "ENABLED", False)
+
+    def f():
+        return 1
+    assert tracing.traced()(f) is f
+    assert tracing.trace_rerun("app")(f) is f
+    assert tracing.span("x") is tracing.span("y")
+
+
+def test_spans_feed_the_histograms(enabled):
+    @tracing.traced("scoring")
+    def score(x):
+        return x * 2
+
+    with tracing.span("load"):
+        pass
+    assert score(2) == 4 and score(3) == 6
+    snap = tracing.snapshot()
+    assert list(snap) == ["load", "scoring"]
+    assert snap["scoring"]["count"] == 2
+
+
+def test_trace_rerun_collects_nested_spans(enabled, monkeypatch, tmp_path):
+    log_path = tmp_path / "trace.jsonl"
+    monkeypatch.setenv(tracing.LOG_ENV, str(log_path))
+    shown = []
+    monkeypatch.setattr(tracing, "debug_sidebar", lambda run, total: shown.append(run.spans))
+
+    @tracing.trace_rerun("app")
+    def main():
+        with tracing.span("filter"):
+            with tracing.span("keywords"):
+                pass
+        return "done"
+
+    assert main() == "done"
+    line = json.loads(log_path.read_text())
+    assert line["app"] == "app" and line["finished"]
+    assert [(s["name"], s["depth"]) for s in line["spans"]] == [("filter", 0), ("keywords", 1)]
+    assert len(shown) == 1
+    assert "rerun" in tracing.snapshot()
+
+
+def test_trace_rerun_logs_early_exits_without_the_panel(enabled, monkeypatch, tmp_path):
+    log_path = tmp_path / "trace.jsonl"
+    monkeypatch.setenv(tracing.LOG_ENV, str(log_path))
+    shown = []
+    monkeypatch.setattr(tracing, "debug_sidebar", lambda run, total: shown.append(run))
+
+    @tracing.trace_rerun("app")
+    def main():
+        raise RuntimeError("stopped")
+
+    with pytest.raises(RuntimeError):
+        main()
+    assert json.loads(log_path.read_text())["finished"] is False
+    assert shown == []
+
+
+def test_prometheus_text_is_cumulative(enabled):
+    for ms in [1, 3, 7]:
+        tracing.observe("rank", ms)
+    text = tracing.prometheus_text()
+    assert text.startswith(f"# TYPE {tracing.METRIC} histogram\n")
+    assert f'{tracing.METRIC}_bucket{{stage="rank",le="1"}} 1' in text
+    assert f'{tracing.METRIC}_bucket{{stage="rank",le="5"}} 2' in text
+    assert f'{tracing.METRIC}_bucket{{stage="rank",le="+Inf"}} 3' in text
+    assert f'{tracing.METRIC}_count{{stage="rank"}} 3' in text
+    assert f'{tracing.METRIC}_sum{{stage="rank"}} 11' in text
@@ -0,0 +1,249 @@
+# --------------------------------------------------------------
+# thumbnails.py
+# Card-sized product thumbnails served from a local disk cache.
+#
+#  * a page never waits: missing images get the placeholder now and
+#    are fetched on a background asyncio loop (urllib / file reads in
+#    worker threads, CONCURRENCY at a time), ready on the next rerun
+#  * fetches still running at the batch deadline count as failures
+#  * PIL draft() + thumbnail() to CARD_SIZE, stored as JPEG
+#  * content-addressed: blobs/<sha>.jpg holds the bytes, refs/<url key>
+#    names the blob, so identical images are stored once
+#  * size-capped: oldest blobs are evicted past MAX_BYTES
+#  * any failure → a generated placeholder (retried after FAIL_TTL)
+# --------------------------------------------------------------
+
+import asyncio
+import hashlib
+import io
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw
+
+THUMB_DIR = "data/thumbnails"
+CARD_SIZE = (320, 320)
+MAX_BYTES = 200 * 1024 * 1024
+CONCURRENCY = 8
+FETCH_TIMEOUT = 4.0         # per image
+BATCH_DEADLINE = 6.0        # whole batch; images still in flight count as failed
+FAIL_TTL = 3600             # seconds before a failed URL is tried again
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+USER_AGENT = "Mozilla/5.0 (home-decor thumbnail fetcher)"
+FAILED = "failed"
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def read_source(src, timeout=FETCH_TIMEOUT) -> bytes:
+    """Raw bytes from an http(s) URL, a file:// URL or a local path."""
+    if src.startswith(("http://", "https://")):
+        req = urllib.request.Request(src, headers={"User-Agent": USER_AGENT})
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.read(MAX_SOURCE_BYTES)
+    path = src[len("file://"):] if src.startswith("file://") else src
+    with open(path, "rb") as fh:
+        return fh.read(MAX_SOURCE_BYTES)
+
+
+def make_thumbnail(data: bytes, size=CARD_SIZE) -> bytes:
+    img = Image.open(io.BytesIO(data))
+    img.draft("RGB", size)              # JPEG: decode at reduced scale
+    img = img.convert("RGB")
+    img.thumbnail(size)
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=85, optimize=True)
+    return out.getvalue()
+
+
+class ThumbnailCache:
+    def __init__(self, root=THUMB_DIR, size=CARD_SIZE, max_bytes=MAX_BYTES,
+                 concurrency=CONCURRENCY, fetch=read_source):
+        self.root, self.size, self.max_bytes = root, tuple(size), max_bytes
+        self.concurrency = concurrency
+        self.fetch = fetch
+        self.blobs = os.path.join(root, "blobs")
+        self.refs = os.path.join(root, "refs")
+        os.makedirs(self.blobs, exist_ok=True)
+        os.makedirs(self.refs, exist_ok=True)
+        self.placeholder = self._placeholder()
+        self._lock = threading.Lock()
+        self._inflight = set()      # URLs queued on the background loop
+        self._loop = None
+
+    # ------------------- disk layout -------------------
+    def _ref_path(self, url):
+        key = _sha(f"{self.size[0]}x{self.size[1]}|{url}".encode("utf-8"))
+        return os.path.join(self.refs, key)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blobs, f"{digest}.jpg")
+
+    @staticmethod
+    def _write(path, data):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+
+    def _placeholder(self):
+        path = os.path.join(self.root, f"placeholder-{self.size[0]}x{self.size[1]}.jpg")
+        if not os.path.exists(path):
+            img = Image.new("RGB", self.size, (236, 236, 236))
+            draw = ImageDraw.Draw(img)
+            w, h = self.size
+            draw.rectangle([w // 4, h // 3, 3 * w // 4, 2 * h // 3], outline=(190, 190, 190), width=3)
+            draw.text((w // 2, h // 2), "no image", fill=(150, 150, 150), anchor="mm")
+            buf = io.BytesIO()
+            img.save(buf, "JPEG", quality=80)
+            self._write(path, buf.getvalue())
+        return path
+
+    # ------------------- lookups -------------------
+    def cached(self, url):
+        """Thumbnail path, placeholder for a recent failure, or None (not fetched yet)."""
+        if not url:
+            return self.placeholder
+        ref = self._ref_path(url)
+        try:
+            with open(ref) as fh:
+                digest = fh.read().strip()
+            age = time.time() - os.path.getmtime(ref)
+        except OSError:
+            return None
+        if digest == FAILED:
+            return self.placeholder if age < FAIL_TTL else None
+        blob = self._blob_path(digest)
+        return blob if os.path.exists(blob) else None
+
+    def _store(self, url, thumb):
+        digest = _sha(thumb)
+        blob = self._blob_path(digest)
+        if not os.path.exists(blob):
+            self._write(blob, thumb)
+        self._write(self._ref_path(url), digest.encode())
+        return blob
+
+    def _fail(self, url):
+        self._write(self._ref_path(url), FAILED.encode())
+        return self.placeholder
+
+    # ------------------- fetching -------------------
+    async def _one(self, sem, url, started):
+        async with sem:
+            started.add(url)
+            try:
+                data = await asyncio.wait_for(asyncio.to_thread(self.fetch, url), FETCH_TIMEOUT)
+                thumb = await asyncio.to_thread(make_thumbnail, data, self.size)
+            except Exception:
+                return self._fail(url)
+            return self._store(url, thumb)
+
+    async def fetch_many(self, urls, deadline=BATCH_DEADLINE):
+        """Fetch every uncached URL concurrently.  Fetches still running at
+        the deadline are cancelled and negative-cached; URLs that never got
+        a slot are left uncached.  Either way they get the placeholder."""
+        paths = {u: self.cached(u) for u in dict.fromkeys(urls)}
+        todo = [u for u, p in paths.items() if p is None]
+        if todo:
+            sem, started = asyncio.Semaphore(self.concurrency), set()
+            tasks = {asyncio.ensure_future(self._one(sem, u, started)): u for u in todo}
+            done, pending = await asyncio.wait(tasks, timeout=deadline)
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for t, u in tasks.items():
+                if t in done:
+                    paths[u] = t.result()
+                else:
+                    paths[u] = self._fail(u) if u in started else self.placeholder
+            self.evict()
+        return [paths[u] for u in urls]
+
+    def _background(self):
+        """The loop misses are fetched on; started on first use."""
+        if self._loop is None:
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency,
+                                                         thread_name_prefix="thumbnails"))
+            threading.Thread(target=self._serve, args=(loop,), name="thumbnails", daemon=True).start()
+            self._loop = loop
+        return self._loop
+
+    @staticmethod
+    def _serve(loop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+        # stopped by close(): cancel what is left and wait for it
+        tasks = asyncio.all_tasks(loop)
+        for t in tasks:
+            t.cancel()
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.close()
+
+    async def _fill(self, urls, deadline):
+        try:
+            await self.fetch_many(urls, deadline)
+        finally:
+            with self._lock:
+                self._inflight.difference_update(urls)
+
+    def prefetch(self, urls, deadline=BATCH_DEADLINE):
+        """Queue uncached URLs on the background loop; returns a
+        concurrent.futures.Future, or None if there was nothing to queue."""
+        with self._lock:
+            todo = [u for u in dict.fromkeys(urls) if u not in self._inflight and self.cached(u) is None]
+            if not todo:
+                return None
+            self._inflight.update(todo)
+            loop = self._background()
+        return asyncio.run_coroutine_threadsafe(self._fill(todo, deadline), loop)
+
+    def thumbnails(self, urls, wait=0.0):
+        """For Streamlit scripts: cached thumbnails now, the placeholder for
+        the rest, which are fetched in the background.  Cached URLs cost a
+        stat; `wait` > 0 gives the fetch that long before falling back."""
+        urls = [u if isinstance(u, str) else "" for u in urls]
+        paths = [self.cached(u) for u in urls]
+        misses = [u for u, p in zip(urls, paths) if p is None]
+        if misses:
+            future = self.prefetch(misses)
+            if future is not None and wait > 0:
+                try:
+                    future.result(timeout=wait)
+                except Exception:
+                    pass
+                paths = [self.cached(u) for u in urls]
+        return [p or self.placeholder for p in paths]
+
+    def close(self):
+        """Stop the background loop; queued fetches are dropped."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+
+    def evict(self):
+        """Drop least-recently-written blobs until the cache fits MAX_BYTES."""
+        entries = []
+        for name in os.listdir(self.blobs):
+            try:
+                st = os.stat(os.path.join(self.blobs, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.blobs, name))
+            except OSError:
+                pass
+            total -= size
+        return total
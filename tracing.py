@@ -0,0 +1,240 @@
+# --------------------------------------------------------------
+# tracing.py
+# Per-stage timings for the Streamlit apps.
+#
+#   with span("load_data"): ...          # time a block
+#   @traced()                            # time every call of a function
+#   @trace_rerun("app")                  # wraps main(): one trace per rerun
+#
+# Every span feeds a process-wide latency histogram.  A rerun's spans
+# are shown in a "Stage timings" sidebar panel, appended as one JSON
+# line to $HOME_DECOR_TRACE_LOG, and the histograms are served in
+# Prometheus text format on 127.0.0.1:$HOME_DECOR_METRICS_PORT/metrics.
+#
+# Off unless one of those variables (or HOME_DECOR_TRACE=1) is set:
+# span() then returns a shared no-op context manager and the
+# decorators return the function unchanged.
+# --------------------------------------------------------------
+
+import bisect
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRACE_ENV = "HOME_DECOR_TRACE"
+LOG_ENV = "HOME_DECOR_TRACE_LOG"
+PORT_ENV = "HOME_DECOR_METRICS_PORT"
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+METRIC = "home_decor_stage_ms"
+
+ENABLED = (os.environ.get(TRACE_ENV, "").lower() in ("1", "true", "yes", "on")
+           or bool(os.environ.get(LOG_ENV) or os.environ.get(PORT_ENV)))
+
+log = logging.getLogger(__name__)
+_NULL = contextlib.nullcontext()
+_lock = threading.Lock()
+_histograms = {}
+_current = contextvars.ContextVar("trace_run", default=None)
+_server = None
+
+
+# ------------------- histograms -------------------
+class Histogram:
+    """Fixed-bucket latency histogram (milliseconds)."""
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count, self.total, self.max = 0, 0.0, 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation."""
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max
+        return 0.0
+
+    def to_dict(self):
+        return {"count": self.count, "sum_ms": round(self.total, 3), "max_ms": round(self.max, 3),
+                "p50_ms": self.quantile(0.5), "p95_ms": self.quantile(0.95),
+                "p99_ms": self.quantile(0.99), "buckets": dict(zip(map(str, BUCKETS_MS + ("+Inf",)),
+                                                                    self.counts))}
+
+
+def observe(name, ms):
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.observe(ms)
+
+
+def snapshot():
+    with _lock:
+        return {name: h.to_dict() for name, h in sorted(_histograms.items())}
+
+
+# ------------------- spans -------------------
+class _Run:
+    __slots__ = ("app", "t0", "depth", "spans")
+
+    def __init__(self, app):
+        self.app, self.t0, self.depth, self.spans = app, time.perf_counter(), 0, []
+
+
+class _Span:
+    __slots__ = ("name", "t0", "depth", "run")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.run = _current.get()
+        self.depth = self.run.depth if self.run else 0
+        if self.run:
+            self.run.depth += 1
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter()
+        ms = (t1 - self.t0) * 1000
+        observe(self.name, ms)
+        if self.run:
+            self.run.depth -= 1
+            self.run.spans.append((self.name, self.depth, (self.t0 - self.run.t0) * 1000, ms))
+        return False
+
+
+def span(name):
+    return _Span(name) if ENABLED else _NULL
+
+
+def traced(name=None):
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with _Span(label):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def trace_rerun(app):
+    """Decorator for a Streamlit main(): collects its spans, then exports them."""
+    def wrap(main):
+        if not ENABLED:
+            return main
+
+        @functools.wraps(main)
+        def inner(*args, **kwargs):
+            _ensure_server()
+            run = _Run(app)
+            token = _current.set(run)
+            finished = False
+            try:
+                result = main(*args, **kwargs)
+                finished = True
+                return result
+            finally:
+                _current.reset(token)
+                total = (time.perf_counter() - run.t0) * 1000
+                observe("rerun", total)
+                _write_log(run, total, finished)
+                if finished:        # st.stop() / st.rerun() end the script early
+                    debug_sidebar(run, total)
+        return inner
+    return wrap
+
+
+# ------------------- export -------------------
+def _write_log(run, total, finished):
+    path = os.environ.get(LOG_ENV)
+    if not path:
+        return
+    line = json.dumps({
+        "ts": time.time(), "app": run.app, "total_ms": round(total, 3), "finished": finished,
+        "spans": [{"name": n, "depth": d, "start_ms": round(s, 3), "ms": round(ms, 3)}
+                  for n, d, s, ms in sorted(run.spans, key=lambda x: x[2])],
+    })
+    with _lock, open(path, "a") as fh:
+        fh.write(line + "\n")
+
+
+def prometheus_text():
+    lines = [f"# TYPE {METRIC} histogram"]
+    for name, h in snapshot().items():
+        cumulative = 0
+        for le, c in h["buckets"].items():
+            cumulative += c
+            lines.append(f'{METRIC}_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'{METRIC}_sum{{stage="{name}"}} {h["sum_ms"]}')
+        lines.append(f'{METRIC}_count{{stage="{name}"}} {h["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, ctype = prometheus_text(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, ctype = json.dumps(snapshot()), "application/json"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _ensure_server():
+    """Start the metrics endpoint once per process (first rerun, not import)."""
+    global _server
+    port = os.environ.get(PORT_ENV)
+    if not port or _server is not None:
+        return
+    with _lock:
+        if _server is not None:
+            return
+        try:
+            _server = ThreadingHTTPServer(("127.0.0.1", int(port)), _MetricsHandler)
+        except OSError as e:        # another worker already serves this port
+            log.warning("metrics endpoint on port %s not started: %s", port, e)
+            _server = False
+            return
+        threading.Thread(target=_server.serve_forever, name="trace-metrics", daemon=True).start()
+
+
+def debug_sidebar(run, total):
+    import streamlit as st
+    hists = snapshot()
+    rows = [{"stage": "· " * d + n, "ms": round(ms, 1),
+             "p50 ms": hists[n]["p50_ms"], "p95 ms": hists[n]["p95_ms"], "calls": hists[n]["count"]}
+            for n, d, _, ms in sorted(run.spans, key=lambda x: x[2])]
+    with st.sidebar.expander(f"⏱ Stage timings – {total:.0f} ms"):
+        st.dataframe(rows, hide_index=True)
+        st.caption("p50/p95: bucket upper bounds over this process's reruns")